@@ -0,0 +1,14 @@
+"""
+python -m quickstarts: see cli.py.
+
+The quickstart modules import each other as top-level modules (they are
+also run as plain scripts), so this directory goes on sys.path first.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main  # noqa: E402
+
+sys.exit(main())
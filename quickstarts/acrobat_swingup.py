@@ -0,0 +1,48 @@
+import numpy as np
+from functools import partial
+from controllers import acrobot_linearized_matrices, lqr_solve, acrobot_lqr_controller
+from dynamics import ACROBOT_PARAMS, acrobot_dynamics
+from ilqr import acrobot_swingup, tracking_controller
+from integrators import rk4_step
+from simulation import simulate
+from viewer import show_acrobot
+
+###############################################################################
+#                        PARAMETERS AND CONSTANTS                             #
+###############################################################################
+dt = 0.05     # Time step (also the iLQR discretization)
+T_swing = 4.0 # Swing-up horizon
+T = 8.0       # Total simulation time
+
+# Same model as acrobat.py
+params = ACROBOT_PARAMS._replace(torque_limit=5.0)
+m1, m2, I1, I2, L1, L2, g, torque_limit = params
+dynamics = partial(acrobot_dynamics, params=params)
+reference_state = np.array([np.pi, 0.0, 0.0, 0.0])  # Upright equilibrium
+
+###############################################################################
+#                       SWING-UP TRAJECTORY (iLQR)                            #
+###############################################################################
+# Open-loop torques plus time-varying feedback gains from hanging to upright
+swingup = acrobot_swingup(params, T=T_swing, dt=dt)
+solve_time = sum(it.linearize_time + it.backward_time + it.forward_time for it in swingup.iterations)
+print(f"iLQR: {len(swingup.iterations)} iterations, {solve_time * 1e3:.0f} ms, "
+      f"final state {np.round(swingup.x[-1], 3)}")
+
+###############################################################################
+#                       BALANCING AFTER THE HORIZON (LQR)                     #
+###############################################################################
+A_lin, B_lin = acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g)
+K_lqr, _ = lqr_solve(A_lin, B_lin, np.diag([10.0, 10.0, 1.0, 1.0]), np.array([[1.0]]))
+
+def balance(t, state):
+    return acrobot_lqr_controller(state, reference_state, K_lqr)
+
+###############################################################################
+#                           SIMULATION / ANIMATION                            #
+###############################################################################
+controller = tracking_controller(swingup, dt, fallback=balance)
+result = simulate(dynamics, controller, rk4_step, np.zeros(4), dt, T)
+print("Final state:", np.round(result.x[-1], 4))
+
+show_acrobot(result, L1, L2, title="Acrobot Swing-Up (iLQR) + LQR Balancing")
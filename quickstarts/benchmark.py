@@ -0,0 +1,354 @@
+"""
+Benchmark suite for integrators, dynamics and controllers.
+
+Measures steps per second and dynamics evaluations per second for every
+system/integrator pair, single-state and batched, plus linearization and
+controller evaluation rates, per-step allocations, vectorized env
+throughput and LQR design time.
+Runs headless.
+
+    python benchmark.py --save baseline.json
+    python benchmark.py --compare baseline.json --threshold 0.10
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from functools import partial
+
+import numpy as np
+
+import controllers
+from controllers import (acrobot_linearized_matrices, acrobot_lqr_controller,
+                         energy_controller_acrobat, lqr_solve, pendulum_swingup_controller)
+from dynamics import (ACROBOT_PARAMS, PENDULUM_PARAMS, SPRING_PARAMS, acrobot_dynamics,
+                      acrobot_dynamics_into, acrobot_jacobians, double_integrator_dynamics,
+                      finite_difference_jacobians, pendulum_dynamics, pendulum_dynamics_into,
+                      spring_dynamics)
+from integrators import (RK4Workspace, euler_step, leapfrog_step, rk4_step, semi_implicit_euler_step,
+                         velocity_verlet_step, yoshida4_step)
+from linear import double_integrator_linear_system, spring_linear_system, zoh_step
+
+# name -> (step function, dynamics evaluations per step)
+INTEGRATORS = {
+    "euler": (euler_step, 1),
+    "semi_implicit_euler": (semi_implicit_euler_step, 1),
+    "leapfrog": (leapfrog_step, 1),
+    "velocity_verlet": (velocity_verlet_step, 2),
+    "yoshida4": (yoshida4_step, 3),
+    "rk4": (rk4_step, 4),
+}
+
+# name -> (dynamics, initial state, exact linear model or None)
+SYSTEMS = {
+    "pendulum": (partial(pendulum_dynamics, params=PENDULUM_PARAMS),
+                 np.array([np.pi / 4, 0.0]), None),
+    "spring": (partial(spring_dynamics, params=SPRING_PARAMS),
+               np.array([1.0, 0.0]), spring_linear_system(*SPRING_PARAMS)),
+    "double_integrator": (double_integrator_dynamics,
+                          np.array([-1.0, 0.5]), double_integrator_linear_system()),
+    "acrobot": (partial(acrobot_dynamics, params=ACROBOT_PARAMS),
+                np.array([np.pi + 0.1, 0.0, 0.0, 0.0]), None),
+}
+
+# "single" is an unbatched (state_dim,) state; integers are (N, state_dim) batches
+SIZES = ("single", 1, 100, 10000)
+
+
+def time_rate(func, min_time=0.2, repeats=3):
+    """
+    Calls per second of func(), best of `repeats` timed runs.
+
+    The number of calls per run is calibrated so that each run takes about
+    min_time / repeats seconds.
+    """
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeats / 4:
+            break
+        calls *= 4
+    calls = max(1, int(calls * (min_time / repeats) / elapsed))
+
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return calls / best
+
+
+def rollout_case(system, integrator, x0, size, dt=0.01):
+    """ A closure advancing one (possibly batched) state by one step per call. """
+    if size == "single":
+        state, u = x0.copy(), 0.0
+    else:
+        state, u = np.tile(x0, (size, 1)), np.zeros((size, 1))
+    holder = [state]
+
+    def step():
+        holder[0] = integrator(system, 0.0, holder[0], u, dt)
+    return step
+
+
+def benchmark_rollouts(sizes=SIZES, min_time=0.2):
+    """ Steps/s and evaluations/s for every system, integrator and batch size. """
+    results = {}
+    for system_name, (dynamics, x0, linear_model) in SYSTEMS.items():
+        cases = [(name, step, evals, dynamics) for name, (step, evals) in INTEGRATORS.items()]
+        if linear_model is not None:
+            cases.append(("zoh", zoh_step, 0, linear_model))
+        for integrator_name, integrator, evals_per_step, system in cases:
+            for size in sizes:
+                batch = 1 if size == "single" else size
+                with np.errstate(all="ignore"):
+                    rate = time_rate(rollout_case(system, integrator, x0, size), min_time)
+                results[f"rollout/{system_name}/{integrator_name}/N={size}"] = {
+                    "steps_per_sec": rate,
+                    "env_steps_per_sec": rate * batch,
+                    "evals_per_sec": rate * batch * evals_per_step,
+                }
+    return results
+
+
+def benchmark_dynamics(sizes=SIZES, min_time=0.2):
+    """ Raw dynamics evaluations/s (state rows evaluated per second). """
+    results = {}
+    for system_name, (dynamics, x0, _) in SYSTEMS.items():
+        for size in sizes:
+            if size == "single":
+                state, u, batch = x0, 0.0, 1
+            else:
+                state, u, batch = np.tile(x0, (size, 1)), np.zeros((size, 1)), size
+            rate = time_rate(lambda: dynamics(0.0, state, u), min_time)
+            results[f"dynamics/{system_name}/N={size}"] = {"evals_per_sec": rate * batch}
+    return results
+
+
+def benchmark_jacobians(sizes=SIZES, min_time=0.2):
+    """ Acrobot linearizations/s, closed form vs central finite differences. """
+    dynamics, x0, _ = SYSTEMS["acrobot"]
+    jacobians = partial(acrobot_jacobians, params=ACROBOT_PARAMS)
+    results = {}
+    for size in sizes:
+        if size == "single":
+            state, u, batch = x0, 0.0, 1
+        else:
+            state, u, batch = np.tile(x0, (size, 1)), np.zeros((size, 1)), size
+        for name, func in (("analytic", lambda: jacobians(state, u)),
+                           ("finite_difference", lambda: finite_difference_jacobians(dynamics, state, u))):
+            rate = time_rate(func, min_time)
+            results[f"jacobians/acrobot/{name}/N={size}"] = {"evals_per_sec": rate * batch}
+    return results
+
+
+def benchmark_controllers(min_time=0.2):
+    """ Controller evaluations/s on representative single states and one batch. """
+    m1, m2, I1, I2, L1, L2, g, _ = ACROBOT_PARAMS
+    m, L, g_p, _ = PENDULUM_PARAMS
+    A, B = acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g)
+    K, _ = lqr_solve(A, B, np.diag([10.0, 10.0, 1.0, 1.0]), np.array([[1.0]]))
+    state = np.array([np.pi + 0.05, -0.02, 0.1, 0.0])
+    reference_state = np.array([np.pi, 0.0, 0.0, 0.0])
+    E_desired = m1*g*L1 + m2*g*L2
+    # A batch of 1000 pendulum states, as in a vectorized rollout
+    thetas = np.linspace(-np.pi / 2, np.pi / 2, 1000)
+    omegas = np.zeros_like(thetas)
+
+    cases = {
+        "controller/acrobot_lqr": lambda: acrobot_lqr_controller(state, reference_state, K),
+        "controller/energy_acrobat": lambda: energy_controller_acrobat(
+            m1, m2, L1, L2, 0.1, 0.0, g, 0.3, -0.1, E_desired, [1.0, 1.0, 1.0]),
+        "controller/pendulum_swingup": lambda: pendulum_swingup_controller(
+            0.3, 0.1, m, L, g_p, m * g_p * L, 10.0, 5.0, 10.0),
+        "controller/pendulum_swingup/N=1000": lambda: pendulum_swingup_controller(
+            thetas, omegas, m, L, g_p, m * g_p * L, 10.0, 5.0, 10.0),
+    }
+    return {name: {"evals_per_sec": time_rate(func, min_time)} for name, func in cases.items()}
+
+
+def peak_bytes_per_call(func, calls=100):
+    """
+    Largest transient heap allocation (tracemalloc peak above the starting
+    level) over `calls` calls of func(); 0 for an allocation-free func.
+    """
+    func()
+    tracemalloc.start()
+    try:
+        peak = 0
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            start, _ = tracemalloc.get_traced_memory()
+            func()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - start)
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def benchmark_allocations(sizes=SIZES, min_time=0.2):
+    """
+    Classic rk4_step vs the preallocated RK4Workspace: steps/s and peak
+    transient bytes allocated per step, for the pendulum and the acrobot.
+    """
+    cases = {
+        "pendulum": (partial(pendulum_dynamics, params=PENDULUM_PARAMS),
+                     partial(pendulum_dynamics_into, params=PENDULUM_PARAMS), SYSTEMS["pendulum"][1]),
+        "acrobot": (partial(acrobot_dynamics, params=ACROBOT_PARAMS),
+                    partial(acrobot_dynamics_into, params=ACROBOT_PARAMS), SYSTEMS["acrobot"][1]),
+    }
+    results = {}
+    for system_name, (dynamics, dynamics_into, x0) in cases.items():
+        for size in sizes:
+            if size == "single":
+                state, u, batch = x0.copy(), np.zeros(1), 1
+            else:
+                state, u, batch = np.tile(x0, (size, 1)), np.zeros((size, 1)), size
+            workspace = RK4Workspace(dynamics_into, state.shape)
+            out = np.empty_like(state)
+            steps = {
+                "rk4_step": lambda: rk4_step(dynamics, 0.0, state, u, 0.01),
+                "rk4_workspace": lambda: workspace.step(state, u, 0.01, out),
+            }
+            for name, step in steps.items():
+                rate = time_rate(step, min_time)
+                results[f"allocations/{system_name}/{name}/N={size}"] = {
+                    "steps_per_sec": rate,
+                    "env_steps_per_sec": rate * batch,
+                    "peak_bytes_per_step": peak_bytes_per_call(step),
+                }
+    return results
+
+
+def benchmark_envs(sizes=SIZES, min_time=0.2):
+    """ Env-steps/s of the vectorized envs (integration, rewards and auto-reset) with fixed actions. """
+    from envs import AcrobotEnv, PendulumEnv
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for env_class in (PendulumEnv, AcrobotEnv):
+        for size in sizes:
+            if size == "single":
+                continue
+            env = env_class(size, seed=0)
+            env.reset()
+            actions = rng.uniform(-1.0, 1.0, size) * env.action_limit
+            rate = time_rate(lambda: env.step(actions), min_time)
+            results[f"envs/{env_class.__name__}/N={size}"] = {
+                "steps_per_sec": rate,
+                "env_steps_per_sec": rate * size,
+            }
+    return results
+
+
+def benchmark_lqr(min_time=0.2):
+    """ LQR design time, with the design cache bypassed and on a cache hit. """
+    m1, m2, I1, I2, L1, L2, g, _ = ACROBOT_PARAMS
+    A, B = acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g)
+    Q = np.diag([10.0, 10.0, 1.0, 1.0])
+    R = np.array([[1.0]])
+
+    controllers.configure_lqr_cache(maxsize=0)
+    try:
+        uncached = time_rate(lambda: lqr_solve(A, B, Q, R), min_time)
+    finally:
+        controllers.configure_lqr_cache()
+    lqr_solve(A, B, Q, R)
+    cached = time_rate(lambda: lqr_solve(A, B, Q, R), min_time)
+    return {
+        "lqr/acrobot/solve": {"evals_per_sec": uncached, "seconds": 1.0 / uncached},
+        "lqr/acrobot/cached": {"evals_per_sec": cached, "seconds": 1.0 / cached},
+    }
+
+
+def run_benchmarks(sizes=SIZES, min_time=0.2, pattern=None):
+    """ Run the whole suite and return a JSON-serializable report. """
+    results = {}
+    results.update(benchmark_rollouts(sizes, min_time))
+    results.update(benchmark_dynamics(sizes, min_time))
+    results.update(benchmark_jacobians(sizes, min_time))
+    results.update(benchmark_controllers(min_time))
+    results.update(benchmark_allocations(sizes, min_time))
+    results.update(benchmark_envs(sizes, min_time))
+    results.update(benchmark_lqr(min_time))
+    if pattern is not None:
+        results = {name: value for name, value in results.items() if pattern in name}
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Compare two reports on every shared rate metric (higher is better).
+
+    Returns:
+        regressions: List of (name, metric, baseline, current, change) where
+                     the rate dropped by more than threshold (fractional)
+    """
+    regressions = []
+    for name, metrics in current["results"].items():
+        base_metrics = baseline["results"].get(name)
+        if base_metrics is None:
+            continue
+        for metric, value in metrics.items():
+            if not metric.endswith("_per_sec") or metric not in base_metrics:
+                continue
+            change = value / base_metrics[metric] - 1.0
+            if change < -threshold:
+                regressions.append((name, metric, base_metrics[metric], value, change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark integrators, dynamics and controllers.")
+    parser.add_argument("--save", help="Write the results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Fractional slowdown flagged as a regression (default 0.10)")
+    parser.add_argument("--filter", help="Only keep benchmarks whose name contains this")
+    parser.add_argument("--sizes", nargs="+", default=[str(size) for size in SIZES],
+                        help="Batch sizes, 'single' for an unbatched state")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per benchmark")
+    args = parser.parse_args(argv)
+
+    sizes = [size if size == "single" else int(size) for size in args.sizes]
+    report = run_benchmarks(sizes, args.min_time, args.filter)
+
+    for name, metrics in report["results"].items():
+        summary = "  ".join(f"{metric}={value:.4g}" for metric, value in metrics.items())
+        print(f"{name:<55}{summary}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {len(report['results'])} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+            for name, metric, old, new, change in regressions:
+                print(f"  {name} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
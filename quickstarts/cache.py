@@ -0,0 +1,422 @@
+import functools
+import hashlib
+import operator
+import os
+import tempfile
+import types
+import weakref
+from collections import OrderedDict, namedtuple
+from itertools import repeat
+
+import numpy as np
+
+
+class CacheInfo(namedtuple("CacheInfo", ["hits", "misses", "disk_hits", "size", "maxsize",
+                                         "bytes", "max_bytes", "evictions"])):
+    """ Counters of an LRUCache; bytes is the memory held by the entries. """
+    __slots__ = ()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def fingerprint(*arrays):
+    """
+    Content hash of a sequence of arrays.
+
+    Dtype and shape are part of the key, so e.g. a (4, 1) and a (1, 4) B
+    matrix with the same bytes do not collide.
+    """
+    digest = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+###############################################################################
+#                         CONFIGURATION FINGERPRINTS                          #
+###############################################################################
+# Digest of each code object, which never changes once compiled
+_code_digests = {}
+
+# Mutable bookkeeping that functions read but that never changes a result
+# (id()-keyed or call-counting caches), registered with runtime_state()
+_runtime_state = {}
+
+# Memoized function digests, see _feed_function
+_function_digests = weakref.WeakKeyDictionary()
+
+_MISSING = object()
+
+# Values a tuple may hold for it to be hashed in one go by its repr
+_SCALAR_TYPES = frozenset({type(None), bool, int, float, complex, str, bytes})
+
+
+def runtime_state(value):
+    """
+    Register a module-level object (e.g. a plain dict used as a cache) as
+    runtime state: config_fingerprint counts it by type only. Returns value.
+    LRUCache instances are always treated this way.
+    """
+    _runtime_state[id(value)] = value
+    return value
+
+
+def _is_runtime_state(value):
+    return isinstance(value, LRUCache) or _runtime_state.get(id(value)) is value
+
+
+def _code_digest(code):
+    digest = _code_digests.get(code)
+    if digest is None:
+        h = hashlib.sha256(code.co_code)
+        h.update(repr(code.co_names).encode())
+        for const in code.co_consts:
+            h.update(_code_digest(const) if isinstance(const, types.CodeType) else repr(const).encode())
+        digest = _code_digests[code] = h.digest()
+    return digest
+
+
+def _global_names(code):
+    """ Names a code object (and the functions nested in it) may read as globals. """
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return tuple(sorted(names))
+
+
+class _Walk:
+    """
+    State of one fingerprint traversal.
+
+    At the top level arrays are hashed as they are met. While a function is
+    being digested for the memo (collect=True), array contents are deferred
+    to `arrays`, every binding read (global, closure cell, function
+    attribute) is listed in `bindings` as (holder, keys, values), and `frozen`
+    turns False on anything mutable in place (lists, dicts, plain objects)
+    whose change would not show up in those bindings.
+    """
+    __slots__ = ("seen", "collect", "arrays", "bindings", "frozen", "recursive")
+
+    def __init__(self, seen, collect):
+        self.seen = seen
+        self.collect = collect
+        self.arrays = []
+        self.bindings = []
+        self.frozen = True
+        self.recursive = set()
+
+
+def _feed_array(digest, array):
+    array = np.ascontiguousarray(array)
+    digest.update(f"array{array.dtype.str}{array.shape};".encode())
+    digest.update(array.tobytes())
+
+
+def _feed(digest, value, walk):
+    """ Add one configuration value to digest, recursing into containers and functions. """
+    if _is_runtime_state(value):
+        digest.update(f"state:{type(value).__qualname__};".encode())
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, np.ndarray):
+        if walk.collect:
+            digest.update(b"<array>")
+            walk.arrays.append(value)
+        else:
+            _feed_array(digest, value)
+    elif isinstance(value, np.generic):
+        _feed_array(digest, value)
+    elif isinstance(value, tuple) and all(type(item) in _SCALAR_TYPES for item in value):
+        # Parameter namedtuples and other flat tuples of numbers
+        digest.update(f"{type(value).__qualname__}:{value!r};".encode())
+    elif isinstance(value, tuple) and hasattr(value, "_fields"):
+        digest.update(f"{type(value).__qualname__}(".encode())
+        for item in value:
+            _feed(digest, item, walk)
+        digest.update(b")")
+    elif isinstance(value, (tuple, list)):
+        walk.frozen &= isinstance(value, tuple)
+        digest.update(f"{type(value).__name__}[".encode())
+        for item in value:
+            _feed(digest, item, walk)
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        walk.frozen = False
+        digest.update(b"dict{")
+        for key in sorted(value, key=repr):
+            _feed(digest, key, walk)
+            _feed(digest, value[key], walk)
+        digest.update(b"}")
+    elif isinstance(value, functools.partial):
+        # func, args and keywords of a partial cannot be rebound
+        digest.update(b"partial(")
+        _feed(digest, value.func, walk)
+        _feed(digest, value.args, walk)
+        _feed(digest, tuple(sorted(value.keywords.items())), walk)
+        digest.update(b")")
+    elif isinstance(value, types.MethodType):
+        digest.update(b"method(")
+        _feed(digest, value.__self__, walk)
+        _feed(digest, value.__func__, walk)
+        digest.update(b")")
+    elif isinstance(value, types.FunctionType):
+        _feed_function(digest, value, walk)
+    elif isinstance(value, (type, types.ModuleType, types.BuiltinFunctionType, np.ufunc)):
+        digest.update(f"{type(value).__name__}:{getattr(value, '__module__', '')}."
+                      f"{getattr(value, '__qualname__', value.__name__)};".encode())
+    elif hasattr(type(value), "__slots__") or hasattr(value, "__dict__"):
+        # Plain objects (e.g. models.Model) are identified by type and state
+        walk.frozen = False
+        if id(value) in walk.seen:
+            digest.update(b"<cycle>")
+            return
+        walk.seen.add(id(value))
+        digest.update(f"{type(value).__module__}.{type(value).__qualname__}(".encode())
+        slots = [name for cls in type(value).__mro__ for name in getattr(cls, "__slots__", ())]
+        state = {name: getattr(value, name) for name in slots if hasattr(value, name)}
+        state.update(getattr(value, "__dict__", {}))
+        _feed(digest, state, walk)
+        digest.update(b")")
+    else:
+        raise TypeError(f"Cannot fingerprint {type(value).__name__} objects")
+
+
+_FUNCTION_ATTRIBUTES = ("__code__", "__defaults__", "__kwdefaults__")
+
+
+def _bindings_hold(func, bindings):
+    """ Whether every (holder, keys, values) binding still holds the same objects. """
+    for holder, keys, values in bindings:
+        if holder is None:
+            holder = func
+        if isinstance(holder, dict):
+            if not all(map(operator.is_, map(holder.get, keys, repeat(_MISSING)), values)):
+                return False
+        elif not all(_read_binding(holder, key) is value for key, value in zip(keys, values)):
+            return False
+    return True
+
+
+def _read_binding(holder, key):
+    if isinstance(holder, dict):
+        return holder.get(key, _MISSING)
+    if isinstance(holder, types.CellType):
+        try:
+            return holder.cell_contents
+        except ValueError:  # Cell not assigned yet
+            return _MISSING
+    return getattr(holder, key)
+
+
+def _digest_function(func, walk):
+    """
+    Structure digest of a function: its qualified name and bytecode plus
+    everything it reads (defaults, closure cells and the module globals its
+    code names), with array contents left to the caller. Runtime state and
+    globals that cannot be fingerprinted (open files, locks, ...) count by
+    type only.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"function:{func.__module__}.{func.__qualname__};".encode())
+    # Bindings on the function itself use holder None, so the memo entry
+    # does not keep its own (weak) key alive
+    attributes = (func.__code__, func.__defaults__, func.__kwdefaults__)
+    walk.bindings.append((None, _FUNCTION_ATTRIBUTES, attributes))
+    digest.update(_code_digest(func.__code__))
+    _feed(digest, func.__defaults__, walk)
+    _feed(digest, func.__kwdefaults__, walk)
+    for cell in func.__closure__ or ():
+        value = _read_binding(cell, None)
+        walk.bindings.append((cell, (None,), (value,)))
+        if value is _MISSING:
+            digest.update(b"<empty cell>")
+        else:
+            _feed(digest, value, walk)
+    module_globals = func.__globals__
+    names = _global_names(func.__code__)
+    values = tuple(module_globals.get(name, _MISSING) for name in names)
+    walk.bindings.append((module_globals, names, values))
+    for name, value in zip(names, values):
+        if value is _MISSING:
+            continue
+        digest.update(f"global {name}=".encode())
+        try:
+            _feed(digest, value, walk)
+        except TypeError:
+            digest.update(type(value).__qualname__.encode())
+    return digest.digest()
+
+
+def _feed_function(digest, func, walk):
+    """
+    Feed a function, reusing its memoized structure digest while every
+    binding it read still holds the same object; only the contents of the
+    arrays it reaches are hashed again. Functions that read lists, dicts or
+    other objects mutable in place are digested afresh on every call.
+    """
+    if id(func) in walk.seen:
+        digest.update(f"<recursive {func.__qualname__}>".encode())
+        walk.recursive.add(func)
+        return
+
+    memo = _function_digests.get(func)
+    if memo is not None and _bindings_hold(func, memo[1]):
+        structure, bindings, arrays = memo
+    else:
+        inner = _Walk(walk.seen | {id(func)}, collect=True)
+        structure = _digest_function(func, inner)
+        bindings, arrays = inner.bindings, inner.arrays
+        # Mutual recursion leaves the other function's content out of this
+        # digest, and a closure over itself would keep its memo key alive
+        if (inner.frozen and inner.recursive <= {func}
+                and not any(value is func for _, _, values in bindings for value in values)):
+            _function_digests[func] = (structure, bindings, arrays)
+        walk.frozen &= inner.frozen
+        walk.recursive |= inner.recursive - {func}
+
+    digest.update(structure)
+    if walk.collect:
+        walk.bindings.extend((func if holder is None else holder, keys, values)
+                             for holder, keys, values in bindings)
+        walk.arrays.extend(arrays)
+    else:
+        for array in arrays:
+            _feed_array(digest, array)
+
+
+def config_fingerprint(*parts):
+    """
+    Content hash of a whole run configuration.
+
+    Accepts numbers, strings, arrays, containers, namedtuples, objects with
+    __slots__ or __dict__ (e.g. models.Model), functools.partial and plain
+    functions. Functions are hashed by bytecode together with the values
+    they close over and the globals they read, so changing a gain that a
+    controller captures (or a module-level K it refers to) changes the key,
+    while re-creating an identical closure does not. LRUCache instances and
+    objects registered with runtime_state() count by type only.
+    """
+    digest = hashlib.sha256()
+    _feed(digest, parts, _Walk(set(), collect=False))
+    return digest.hexdigest()
+
+
+###############################################################################
+#                                 LRU CACHE                                   #
+###############################################################################
+class LRUCache:
+    """
+    Least-recently-used cache of tuples of arrays, keyed by fingerprint()
+    or config_fingerprint().
+
+    Entries live in memory up to maxsize entries and max_bytes of array
+    data, evicting the least recently used first. With a directory, every
+    entry is also written there as an .npz file and misses fall back to it,
+    so the cache survives across processes and script runs; max_disk_bytes
+    bounds that directory, dropping the least recently used files.
+
+    With copy=False, get() returns the stored arrays themselves, marked
+    read-only, so a hit costs no copy.
+    """
+
+    def __init__(self, maxsize=256, directory=None, max_bytes=None, max_disk_bytes=None, copy=True):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.copy = copy
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _output(self, value):
+        return tuple(array.copy() for array in value) if self.copy else value
+
+    def get(self, key):
+        """ Return the cached arrays for key (copies unless copy=False), or None on a miss. """
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._output(value)
+
+        if self.directory is not None and os.path.exists(self._path(key)):
+            with np.load(self._path(key)) as data:
+                value = tuple(data[f"arr_{i}"] for i in range(len(data.files)))
+            os.utime(self._path(key))  # Recently used, for max_disk_bytes
+            self._store(key, value)
+            self.hits += 1
+            self.disk_hits += 1
+            return self._output(self._entries.get(key, value))
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """ Store a tuple of arrays under key (and on disk if configured). """
+        value = tuple(np.array(array) for array in value)
+        self._store(key, value)
+        if self.directory is not None:
+            # Write-then-rename so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, *value)
+            os.replace(tmp_path, self._path(key))
+            if self.max_disk_bytes is not None:
+                self._prune_disk()
+
+    def _store(self, key, value):
+        if not self.copy:
+            for array in value:
+                array.flags.writeable = False
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= sum(array.nbytes for array in old)
+        self._entries[key] = value
+        self.bytes += sum(array.nbytes for array in value)
+        while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self.bytes > self.max_bytes and self._entries):
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= sum(array.nbytes for array in evicted)
+            self.evictions += 1
+
+    def _prune_disk(self):
+        """ Remove the least recently used files until the directory fits max_disk_bytes. """
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # Pruned by another process
+                pass
+            total -= size
+
+    def clear(self):
+        """ Drop the in-memory entries and reset the counters. """
+        self._entries.clear()
+        self.hits = self.misses = self.disk_hits = self.evictions = 0
+        self.bytes = 0
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.disk_hits, len(self._entries), self.maxsize,
+                         self.bytes, self.max_bytes, self.evictions)
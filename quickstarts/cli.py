@@ -0,0 +1,291 @@
+"""
+Command-line entry point for the quickstart systems.
+
+    python -m quickstarts list
+    python -m quickstarts run pendulum --controller swingup --headless
+    python -m quickstarts run acrobot --controller ilqr --T 8 --save run.npz
+    python -m quickstarts run pendulum --param m=2.0 --param b=0.0 --video swing.gif
+    python -m quickstarts imports
+
+Systems and controllers are looked up in SYSTEMS and CONTROLLERS. Only
+what a run needs is imported: SciPy when an LQR gain is designed, the iLQR
+solver for --controller ilqr and matplotlib only to show or export an
+animation, so a headless run or a sweep worker starts on NumPy alone.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from models import Acrobot, DoubleIntegrator, MassSpring, Pendulum
+
+System = namedtuple("System", [
+    "model",       # Model class from models.py
+    "x0",          # Default initial state
+    "dt",          # Default time step
+    "T",           # Default duration
+    "goal",        # Equilibrium the controllers regulate to
+    "Q",           # Diagonal LQR state weights
+    "controller",  # Default controller name
+    "scene",       # scene(params) -> viewer.Scene, called only when drawing
+])
+
+Controller = namedtuple("Controller", [
+    "build",       # build(system, model) -> controller(t, state) or None
+    "x0",          # System name -> initial state, None for the system default
+    "params",      # Parameter defaults for this controller, if the model has them
+    "help",
+])
+
+# A resolved `run` command: registry entries, model and settings
+RunSetup = namedtuple("RunSetup", ["system", "name", "spec", "model", "x0", "dt", "T", "integrator"])
+
+
+def _pendulum_scene(params):
+    from viewer import pendulum_scene
+    return pendulum_scene(params.L)
+
+
+def _acrobot_scene(params):
+    from viewer import acrobot_scene
+    return acrobot_scene(params.L1, params.L2)
+
+
+def _spring_scene(params):
+    from viewer import slider_scene
+    return slider_scene((-1.5, 1.5), (-0.5, 0.5), anchor=-1.5)
+
+
+def _double_integrator_scene(params):
+    from viewer import slider_scene
+    return slider_scene((-15, 15), (-5, 5), markersize=8)
+
+
+SYSTEMS = {
+    "pendulum": System(Pendulum, [np.pi / 16, 0.0], 0.01, 20.0, [np.pi, 0.0], [10.0, 1.0],
+                       "swingup", _pendulum_scene),
+    "spring": System(MassSpring, [1.0, 0.0], 0.01, 20.0, [0.0, 0.0], [1.0, 1.0],
+                     "none", _spring_scene),
+    "double_integrator": System(DoubleIntegrator, [-10.0, 1.0], 0.01, 10.0, [0.0, 0.0], [1.0, 1.0],
+                                "bang_bang", _double_integrator_scene),
+    "acrobot": System(Acrobot, [np.pi + 0.01, 0.0, 0.0, 0.0], 0.01, 10.0, [np.pi, 0.0, 0.0, 0.0],
+                      [10.0, 10.0, 1.0, 1.0], "lqr", _acrobot_scene),
+}
+
+
+###############################################################################
+#                              CONTROLLERS                                    #
+###############################################################################
+def _no_control(system, model):
+    return None
+
+
+def _lqr(system, model):
+    from controllers import lqr_controller, lqr_solve, saturate
+
+    goal = np.asarray(system.goal, dtype=float)
+    A, B = model.jacobians(goal, 0.0)
+    K, _ = lqr_solve(A, B, np.diag(system.Q), np.eye(B.shape[1]))
+    limit = getattr(model.params, "torque_limit", np.inf)
+
+    def controller(t, state):
+        return saturate(lqr_controller(state, goal, K), limit)
+    return controller
+
+
+def _pendulum_swingup(system, model):
+    from controllers import pendulum_swingup_controller
+
+    m, L, g, _ = model.params
+    E_desired = m * g * L
+
+    def controller(t, state):
+        return pendulum_swingup_controller(state[..., 0], state[..., 1], m, L, g, E_desired,
+                                           k=10.0, Kp=5.0, Kd=10.0)
+    return controller
+
+
+def _bang_bang(system, model):
+    from controllers import bang_bang_controller
+
+    def controller(t, state):
+        return bang_bang_controller(state[..., 0], state[..., 1], u_max=1.0)
+    return controller
+
+
+def _ilqr(system, model):
+    import ilqr
+
+    plan_dt = 0.05
+    if isinstance(model, Acrobot):
+        result = ilqr.acrobot_swingup(model.params, dt=plan_dt)
+    else:
+        result = ilqr.pendulum_swingup(model.params, dt=plan_dt)
+    print(f"iLQR: {len(result.iterations)} iterations, converged={result.converged}")
+    return ilqr.tracking_controller(result, plan_dt, fallback=_lqr(system, model))
+
+
+CONTROLLERS = {
+    "none": Controller(_no_control, dict.fromkeys(SYSTEMS), {}, "Unforced (u = 0)"),
+    "lqr": Controller(_lqr, {"pendulum": [np.pi - 0.3, 0.0], "spring": None,
+                             "double_integrator": None, "acrobot": None}, {},
+                      "LQR about the goal, saturated to the torque limit"),
+    "swingup": Controller(_pendulum_swingup, {"pendulum": None}, {},
+                          "Energy swing-up with PD stabilization"),
+    "bang_bang": Controller(_bang_bang, {"double_integrator": None}, {},
+                            "Minimum-time bang-bang to the origin"),
+    "ilqr": Controller(_ilqr, {"pendulum": [0.0, 0.0], "acrobot": [0.0, 0.0, 0.0, 0.0]},
+                       {"torque_limit": 5.0},
+                       "iLQR swing-up from hanging, then LQR balancing"),
+}
+
+INTEGRATORS = ("euler", "semi_implicit_euler", "rk4", "leapfrog", "velocity_verlet", "yoshida4")
+
+
+###############################################################################
+#                                COMMANDS                                     #
+###############################################################################
+def _parse_params(assignments):
+    params = {}
+    for assignment in assignments:
+        name, sep, value = assignment.partition("=")
+        if not sep:
+            raise ValueError(f"--param expects name=value, got {assignment!r}")
+        params[name] = float(value)
+    return params
+
+
+def resolve_run(args):
+    """
+    Look up the system, controller, parameters and integrator of a run.
+    Raises ValueError for arguments that do not fit the registries.
+    """
+    import integrators
+
+    system = SYSTEMS[args.system]
+    name = args.controller or system.controller
+    spec = CONTROLLERS[name]
+    if args.system not in spec.x0:
+        raise ValueError(f"controller {name!r} does not support {args.system!r} "
+                         f"(supported: {', '.join(spec.x0)})")
+
+    fields = system.model.Params._fields
+    overrides = {key: value for key, value in spec.params.items() if key in fields}
+    overrides.update(_parse_params(args.param))
+    unknown = set(overrides) - set(fields)
+    if unknown:
+        raise ValueError(f"unknown parameters for {args.system}: {sorted(unknown)} "
+                         f"(expected {', '.join(fields) or 'none'})")
+    model = system.model(**overrides)
+
+    x0 = args.x0 or spec.x0[args.system] or system.x0
+    if len(x0) != model.state_dim:
+        raise ValueError(f"--x0 needs {model.state_dim} values for {args.system}, got {len(x0)}")
+    integrator = getattr(integrators, f"{args.integrator}_step")
+    return RunSetup(system, name, spec, model, x0, args.dt or system.dt, args.T or system.T,
+                    integrator)
+
+
+def run(args, setup=None):
+    """ Simulate one system/controller pair; returns the SimulationResult. """
+    from simulation import simulate
+
+    system, name, spec, model, x0, dt, T, integrator = setup or resolve_run(args)
+    controller = spec.build(system, model)
+
+    start = time.perf_counter()
+    result = simulate(model, controller, integrator, x0, dt, T)
+    elapsed = time.perf_counter() - start
+
+    steps = len(result.t) - 1
+    error = np.linalg.norm(result.x[-1] - np.asarray(system.goal))
+    print(f"{args.system} / {name} / {args.integrator}: {steps} steps in {elapsed * 1e3:.1f} ms "
+          f"({steps / elapsed:.3g} steps/s)")
+    print(f"Final state {np.round(result.x[-1], 4)}, distance to goal {error:.3g}, "
+          f"max |u| {np.max(np.abs(result.u)) if result.u.size else 0.0:.3g}")
+
+    if args.save:
+        np.savez(args.save, t=result.t, x=result.x, u=result.u)
+        print(f"Saved trajectory to {args.save}")
+    title = f"{args.system} ({name})"
+    if args.video:
+        from viewer import export
+        export(result, system.scene(model.params), args.video, title=title)
+        print(f"Wrote {args.video}")
+    if not args.headless and not args.video:
+        from viewer import replay
+        replay(result, system.scene(model.params), title=title)
+    return result
+
+
+def list_registry(args):
+    print("Systems:")
+    for name, system in SYSTEMS.items():
+        print(f"  {name:<20}params {', '.join(system.model.Params._fields) or '-'}; "
+              f"default controller {system.controller}")
+    print("Controllers:")
+    for name, spec in CONTROLLERS.items():
+        print(f"  {name:<20}{spec.help} [{', '.join(spec.x0)}]")
+
+
+def import_times(args):
+    """
+    Cold import time of each module in a fresh interpreter, from the
+    cumulative figure of `python -X importtime`.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in args.modules:
+        process = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                 cwd=directory, capture_output=True, text=True)
+        lines = [line for line in process.stderr.splitlines() if line.startswith("import time:")]
+        if process.returncode != 0 or not lines:
+            print(f"  {module:<20}failed")
+            continue
+        cumulative_us = int(lines[-1].split("|")[1])
+        print(f"  {module:<20}{cumulative_us / 1e3:8.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m quickstarts",
+                                     description="Run the quickstart systems from the command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Simulate a system")
+    run_parser.add_argument("system", choices=list(SYSTEMS))
+    run_parser.add_argument("--controller", choices=list(CONTROLLERS),
+                            help="Defaults to the system's usual controller")
+    run_parser.add_argument("--integrator", choices=INTEGRATORS, default="rk4")
+    run_parser.add_argument("--dt", type=float, help="Time step")
+    run_parser.add_argument("--T", type=float, help="Duration")
+    run_parser.add_argument("--x0", type=float, nargs="+", help="Initial state")
+    run_parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                            help="Override a physical parameter (repeatable)")
+    run_parser.add_argument("--headless", action="store_true", help="Do not open a window")
+    run_parser.add_argument("--save", help="Write t, x, u to this .npz file")
+    run_parser.add_argument("--video", help="Export an animation (.mp4, .gif or a frame directory)")
+    run_parser.set_defaults(func=run)
+
+    list_parser = commands.add_parser("list", help="List systems and controllers")
+    list_parser.set_defaults(func=list_registry)
+
+    imports_parser = commands.add_parser("imports", help="Measure cold import times")
+    imports_parser.add_argument("modules", nargs="*", default=[
+        "numpy", "dynamics", "integrators", "controllers", "linear", "simulation", "models",
+        "cli", "scipy.linalg", "matplotlib.pyplot"])
+    imports_parser.set_defaults(func=import_times)
+
+    args = parser.parse_args(argv)
+    if args.command != "run":
+        args.func(args)
+        return 0
+    # Only bad arguments are usage errors; failures inside the run keep their traceback
+    try:
+        setup = resolve_run(args)
+    except ValueError as error:
+        parser.error(str(error))
+    run(args, setup)
+    return 0
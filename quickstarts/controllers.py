@@ -1,31 +1,118 @@
+import os
 import numpy as np
-import scipy.linalg
+from cache import LRUCache, fingerprint
+from dynamics import AcrobotParams, PendulumParams, acrobot_jacobians, pendulum_jacobians
+
+# Riccati solutions keyed on the bytes of (A, B, Q, R). Set LQR_CACHE_DIR to
+# also keep them on disk across runs.
+_lqr_cache = LRUCache(maxsize=256, directory=os.environ.get("LQR_CACHE_DIR"))
+
+def configure_lqr_cache(maxsize=256, directory=None):
+    """
+    Replace the LQR design cache.
+    
+    Parameters:
+        maxsize: Number of designs kept in memory (LRU eviction)
+        directory: Optional directory for the on-disk store
+    """
+    global _lqr_cache
+    _lqr_cache = LRUCache(maxsize=maxsize, directory=directory)
+
+def lqr_cache_info():
+    """ Hit/miss counters of the LQR design cache. """
+    return _lqr_cache.info()
 
 def basic_controller(theta, omega, target_theta, Kd: float = 5.0, Kp: float = 10.0):
     return -Kd * (theta - target_theta) - Kp * omega
 
 def energy_controller_pendulum(m, L, omega, g, theta, E_desired, k):
-    # Compute total energy
+    # Compute total energy (elementwise, so theta and omega may be (N,) arrays)
     E = 0.5 * m * L**2 * omega**2 - m * g * L * np.cos(theta)
     E_tilde = E - E_desired  # Energy difference
     return -k * omega * E_tilde  # Energy injection control
 
+def saturate(u, limit):
+    """
+    Clamp u to [-limit, limit] elementwise.
+    
+    Python floats stay floats (np.clip costs more than most single-state
+    controllers); arrays are clipped with the limit broadcast against u.
+    """
+    if isinstance(u, float) and not isinstance(limit, np.ndarray):
+        return min(max(u, -limit), limit)
+    return np.clip(u, -limit, limit)
+
+def _control_rows(u, state):
+    """ Bring u to shape (m,) for one state or (N, m) for a batch. """
+    u = np.asarray(u, dtype=float)
+    if u.ndim < np.ndim(state):
+        u = u[..., None]
+    return u
+
+def switching_controller(condition, inner, outer):
+    """
+    Combine two controllers by a state-dependent switch, without branching.
+    
+    Both controllers are evaluated on the whole (possibly batched) state and
+    the result is selected per row with np.where, so a batched closed loop
+    never drops to per-row Python.
+    
+    Parameters:
+        condition: condition(t, state) -> bool per row, True selects inner
+        inner, outer: Controllers controller(t, state)
+        
+    Returns:
+        controller(t, state) returning u of shape (m,) or (N, m)
+    """
+    def controller(t, state):
+        use_inner = np.asarray(condition(t, state))
+        u_inner = _control_rows(inner(t, state), state)
+        u_outer = _control_rows(outer(t, state), state)
+        return np.where(use_inner[..., None], u_inner, u_outer)
+    return controller
+
+def pendulum_swingup_controller(theta, omega, m, L, g, E_desired, k, Kp, Kd,
+                                theta_target=np.pi, torque_limit=1.0, switch_angle=0.2):
+    """
+    Energy-based swing-up far from the target, gravity-compensated PD near it.
+    
+    Elementwise in theta and omega, so (N,) arrays give (N,) torques.
+    
+    Parameters:
+        theta: Pendulum angle
+        omega: Angular velocity
+        m, L, g: Mass, length and gravity of the pendulum
+        E_desired: Desired energy for swing-up
+        k: Energy control gain
+        Kp, Kd: Proportional and derivative gains for stabilization
+        theta_target: Target angle (pi = upright)
+        torque_limit: Maximum torque
+        switch_angle: Distance from the target below which PD takes over
+        
+    Returns:
+        u: Saturated control torque
+    """
+    swing_up = energy_controller_pendulum(m, L, omega, g, theta, E_desired, k)
+    stabilize = m*g*L*np.sin(theta) - Kp * (theta - theta_target) - Kd * omega
+    u = np.where(np.abs(theta - theta_target) > switch_angle, swing_up, stabilize)
+    # [()] turns the 0-d result of scalar inputs into a float, arrays pass through
+    return saturate(u[()], torque_limit)
+
 def energy_controller_acrobat(m1, m2, L1, L2, omega1, omega2, g, theta1, theta2, E_desired, gains):
     # Controller gains
     k1, k2, k3 = gains
 
-    # Inertia matrix (M)
+    # Inertia matrix entries (M21 = M12)
     M11 = (m1 + m2) * L1**2 + m2 * L2**2 + 2 * m2 * L1 * L2 * np.cos(theta2)
     M22 = m2 * L2**2
-    M12 = M21 = m2 * L2**2 + m2 * L1 * L2 * np.cos(theta2)
-    M = np.array([[M11, M12], [M21, M22]])
+    M12 = m2 * L2**2 + m2 * L1 * L2 * np.cos(theta2)
 
     # Potential Energy (U)
     U = -(m1 + m2) * g * L1 * np.cos(theta1) - m2 * g * L2 * np.cos(theta1 + theta2)
 
-    # Kinetic Energy (K)
-    omega = np.array([omega1, omega2])
-    K = 0.5 * omega.T @ M @ omega
+    # Kinetic Energy 0.5 * omega^T M omega, expanded so it is elementwise
+    # in (N,) arrays of angles and velocities
+    K = 0.5 * (M11 * omega1**2 + 2 * M12 * omega1 * omega2 + M22 * omega2**2)
 
     # Total energy
     E = K + U
@@ -41,10 +128,30 @@ def energy_controller_acrobat(m1, m2, L1, L2, omega1, omega2, g, theta1, theta2,
 
     return ddq2_desired
 
+def bang_bang_controller(q, q_dot, u_max):
+    """
+    Minimum-time bang-bang law for the double integrator q'' = u, |u| <= u_max.
+    
+    Parameters:
+        q: Position
+        q_dot: Velocity
+        u_max: Maximum control input (acceleration)
+        
+    Returns:
+        u: Control input, either -u_max or +u_max
+    """
+    # Brake to stop at the origin once the stopping distance exceeds |q|,
+    # otherwise accelerate toward the origin
+    braking = q_dot**2 / (2 * u_max) > np.abs(q)
+    return np.where(braking, -np.sign(q_dot) * u_max, -np.sign(q) * u_max)
+
 def lqr_solve(A, B, Q, R):
     """
     Solve the continuous-time LQR problem for x' = A x + B u.
     
+    Results are memoized on the content of (A, B, Q, R), so repeated designs
+    (gain sweeps, script re-runs) skip the Riccati solve.
+    
     Parameters:
         A: System matrix of shape (n, n)
         B: Control matrix of shape (n, m)
@@ -55,8 +162,28 @@ def lqr_solve(A, B, Q, R):
         K: LQR gain matrix of shape (m, n)
         S: Solution to the continuous-time algebraic Riccati equation
     """
+    A, B, Q, R = (np.asarray(M, dtype=float) for M in (A, B, Q, R))
+    key = fingerprint(A, B, Q, R)
+    cached = _lqr_cache.get(key)
+    if cached is not None:
+        return cached
+
+    K, S = lqr_solve_uncached(A, B, Q, R)
+    _lqr_cache.put(key, (K, S))
+    return K, S
+
+
+def lqr_solve_uncached(A, B, Q, R):
+    """
+    lqr_solve without the memoization, for one-off designs such as a gain
+    schedule grid that would only flush the cache.
+    """
+    # SciPy is imported on first use; it dominates the import time otherwise
+    import scipy.linalg
+
+    A, B, Q, R = (np.asarray(M, dtype=float) for M in (A, B, Q, R))
     S = scipy.linalg.solve_continuous_are(A, B, Q, R)
-    K = np.linalg.inv(R) @ B.T @ S
+    K = np.linalg.solve(R, B.T @ S)
     return K, S
 
 def lqr_controller(state, reference_state, K):
@@ -64,15 +191,15 @@ def lqr_controller(state, reference_state, K):
     Apply LQR control to track a reference state.
     
     Parameters:
-        state: Current state vector
+        state: Current state vector (n,) or a batch (N, n)
         reference_state: Desired state vector
-        K: LQR gain matrix
+        K: LQR gain matrix (m, n)
         
     Returns:
-        u: Control input
+        u: Control input (m,) or (N, m)
     """
     state_error = state - reference_state
-    u = -K @ state_error
+    u = -(state_error @ K.T)
     return u
 
 def acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g):
@@ -93,57 +220,79 @@ def acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g):
         A: System matrix (4x4) for the continuous-time linearized dynamics
         B: Control matrix (4x1) for the continuous-time linearized dynamics
     """
-    # Evaluate M at the equilibrium (theta2 = 0)
-    M11 = I1 + I2 + m2*L1**2 + 2*m2*L1*L2  # cos(0)=1
-    M12 = I2 + m2*L1*L2
-    M21 = I2 + m2*L1*L2
-    M22 = I2
-    M_eq = np.array([[M11, M12],
-                     [M21, M22]])
-    
-    # Derivative of gravity terms w.r.t. [theta1, theta2], at (theta1=pi, theta2=0)
-    dG_dq = np.array([
-        [g*(m1*L1 + m2*L1 + m2*L2), m2*g*L2],
-        [m2*g*L2, m2*g*L2]
-    ])
-    
-    # The linearized A matrix in block form
-    zero_2x2 = np.zeros((2, 2))
-    eye_2x2 = np.eye(2)
-    Minv = np.linalg.inv(M_eq)
-    
-    A_top = np.hstack([zero_2x2, eye_2x2])
-    A_bottom = np.hstack([Minv @ dG_dq, zero_2x2])
-    A = np.vstack([A_top, A_bottom])
+    return acrobot_linearized_matrices_at(np.pi, 0.0, m1, m2, I1, I2, L1, L2, g, u=0.0)
+
+def acrobot_gravity_torque(theta1, theta2, m2, L2, g):
+    """
+    Joint-2 torque that cancels gravity on the second link at (theta1, theta2).
+    With it, the configuration is an equilibrium whenever the first joint is
+    also balanced, i.e. (m1 + m2) L1 sin(theta1) + m2 L2 sin(theta1 + theta2) = 0.
+    """
+    return m2*g*L2*np.sin(theta1 + theta2)
+
+def acrobot_linearized_matrices_at(theta1, theta2, m1, m2, I1, I2, L1, L2, g, u=None):
+    """
+    Linearize the Acrobot dynamics at rest at an arbitrary configuration:
+    (theta1, theta2), omega1 = omega2 = 0, torque u.
     
-    # The linearized B matrix in block form
-    B_bottom = Minv @ np.array([[0.0], [1.0]])
-    B_top = np.zeros((2, 1))
-    B = np.vstack([B_top, B_bottom])
+    Uses the closed-form dynamics.acrobot_jacobians (without a torque
+    limit), so theta1, theta2 and u may also be arrays of N operating
+    points, giving A of shape (N, 4, 4) and B of shape (N, 4, 1).
     
-    return A, B
+    Parameters:
+        theta1, theta2: Joint angles of the operating point
+        m1, m2, I1, I2, L1, L2, g: Physical parameters
+        u: Torque at the operating point (defaults to acrobot_gravity_torque)
+        
+    Returns:
+        A: System matrix (4x4) for the continuous-time linearized dynamics
+        B: Control matrix (4x1) for the continuous-time linearized dynamics
+    """
+    if u is None:
+        u = acrobot_gravity_torque(theta1, theta2, m2, L2, g)
+    theta1, theta2, u = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (theta1, theta2, u)))
+    zero = np.zeros_like(theta1)
+    state = np.stack([theta1, theta2, zero, zero], axis=-1)
+    params = AcrobotParams(m1, m2, I1, I2, L1, L2, g, torque_limit=np.inf)
+    return acrobot_jacobians(state, u, params)
 
 def acrobot_lqr_controller(state, reference_state, K):
     """
     Apply LQR control for an acrobot about the upright equilibrium.
     
     Parameters:
-        state: Current state [theta1, theta2, omega1, omega2]
+        state: Current state [theta1, theta2, omega1, omega2], (4,) or (N, 4)
         reference_state: Reference state [theta1_ref, theta2_ref, omega1_ref, omega2_ref]
         K: LQR gain matrix
         
     Returns:
-        u: Control torque
+        u: Control torque, (1,) or (N, 1)
     """
-    # For the upright equilibrium controller, we need to shift theta1 by pi
-    # because the linearization is around [pi, 0, 0, 0]
-    state_shifted = state.copy()
-    state_shifted[0] -= np.pi
-    
-    reference_shifted = reference_state.copy()
-    reference_shifted[0] -= np.pi
+    # Shifting theta1 of both state and reference by pi (the linearization
+    # point) cancels in the error, so no shifted copies are needed
+    return lqr_controller(state, reference_state, K)
+
+def lqr_controller_into(state, reference_state, K, out, error):
+    """
+    In-place lqr_controller: writes u = -K (state - reference_state) into out.
     
-    return lqr_controller(state_shifted, reference_shifted, K)
+    Parameters:
+        state: Current state, (n,) or a batch (N, n)
+        reference_state: Desired state vector (n,)
+        K: LQR gain matrix (m, n)
+        out: Control buffer, (m,) or (N, m)
+        error: Scratch buffer with the shape of state
+        
+    Returns:
+        out
+    """
+    np.subtract(state, reference_state, out=error)
+    if error.ndim == 1:
+        np.matmul(K, error, out=out)
+    else:
+        np.matmul(error, K.T, out=out)
+    np.negative(out, out=out)
+    return out
 
 def pendulum_linearized_matrices(m, L, g):
     """
@@ -159,20 +308,7 @@ def pendulum_linearized_matrices(m, L, g):
         A: System matrix (2x2) for the continuous-time linearized dynamics
         B: Control matrix (2x1) for the continuous-time linearized dynamics
     """
-    # For a simple pendulum, the linearized matrices around the upright position
-    J = m * L**2  # Moment of inertia
-    
-    A = np.array([
-        [0, 1],
-        [g/L, 0]
-    ])
-    
-    B = np.array([
-        [0],
-        [1/J]
-    ])
-    
-    return A, B
+    return pendulum_jacobians(np.array([np.pi, 0.0]), 0.0, PendulumParams(m, L, g, b=0.0))
 
 def design_lqr_controller(A, B, Q, R):
     """
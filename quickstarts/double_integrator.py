@@ -1,11 +1,12 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
+from controllers import bang_bang_controller
+from linear import double_integrator_linear_system, zoh_step
+from simulation import simulate
+from viewer import show_slider
 
 # Simulation parameters
 dt = 0.01  # Time step
 T = 10      # Total simulation time
-time_steps = int(T / dt)
 
 # Initial conditions
 q = -10      # Initial position
@@ -13,46 +14,16 @@ q_dot = 1   # Initial velocity
 u_max = 1   # Maximum control input (acceleration)
 
 
-# Set up figure for animation
-fig, ax = plt.subplots()
-ax.set_xlim(-15, 15)  # Wider range to see the full motion
-ax.set_ylim(-5, 5)    # Adjusted for visualization
-ax.set_aspect('equal')
-ax.set_title("Bang-Bang Double Integrator using Differential Equations")
+def controller(t, state):
+    """ Bang-bang control toward the origin. """
+    q, q_dot = state
+    return bang_bang_controller(q, q_dot, u_max)
 
-# Plot elements
-block, = ax.plot([], [], 'bo', markersize=8)
 
-def init_anim():
-    """ Initialize animation frame. """
-    block.set_data([], [])
-    return block,
+# Between control updates the acceleration is constant, so the exact
+# zero-order-hold step reproduces the true trajectory
+result = simulate(double_integrator_linear_system(), controller, zoh_step,
+                  [q, q_dot], dt, T)
 
-def update_anim(frame):
-    """ Update function for animation. """
-    global q, q_dot
-    
-    # Compute bang-bang control
-    if q_dot**2 / (2 * u_max) > abs(q):  # Braking condition
-        u = -np.sign(q_dot) * u_max  # Brake to stop at the origin
-    else:  # Accelerate toward the origin
-        u = -np.sign(q) * u_max
-    
-    # First integrate velocity (Euler step)
-    q_dot += u * dt
-    
-    # Then integrate position (Euler step using updated velocity)
-    q += q_dot * dt
-    
-    # Update block position
-    block.set_data([q], [0])
-    
-    return block,
-
-# Create animation
-ani = animation.FuncAnimation(
-    fig, update_anim, frames=time_steps,
-    init_func=init_anim, blit=True, interval=dt*1000
-)
-
-plt.show()
+show_slider(result, xlim=(-15, 15), ylim=(-5, 5), markersize=8,
+            title="Bang-Bang Double Integrator using Differential Equations")
@@ -0,0 +1,465 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+###############################################################################
+#                                 ACROBOT                                     #
+###############################################################################
+AcrobotParams = namedtuple(
+    "AcrobotParams", ["m1", "m2", "I1", "I2", "L1", "L2", "g", "torque_limit"]
+)
+
+# Default physical parameters shared by the acrobot quickstarts
+ACROBOT_PARAMS = AcrobotParams(
+    m1=1.0,            # Mass of link 1
+    m2=1.0,            # Mass of link 2
+    I1=1.0,            # Moment of inertia for link 1
+    I2=1.0,            # Moment of inertia for link 2
+    L1=0.5,            # Length of link 1
+    L2=0.5,            # Length of link 2
+    g=9.8,             # Gravity
+    torque_limit=1.0,  # Torque limit at the second joint
+)
+
+
+def _acrobot_accelerations(theta1, theta2, omega1, omega2, u, params, sin, cos):
+    """
+    Angular accelerations M^{-1} (B*u - C(q, qdot)*qdot - G(q)) of the Acrobot.
+
+    Written against the passed-in sin/cos so the same expressions serve
+    Python floats (math) and arrays (numpy).
+    """
+    m1, m2, I1, I2, L1, L2, g, _ = params
+    cos2 = cos(theta2)
+    h = m2*L1*L2*sin(theta2)
+
+    # Mass-Inertia Matrix M(q) (symmetric, M21 = M12)
+    M11 = I1 + I2 + m2*L1**2 + 2*m2*L1*L2*cos2
+    M12 = I2 + m2*L1*L2*cos2
+    M22 = I2
+
+    # Right-hand side, torque enters at joint 2 only (B = [0; 1])
+    G2 = m2*g*L2*sin(theta1 + theta2)
+    G1 = (m1 + m2)*g*L1*sin(theta1) + G2
+    rhs1 = h*(2*omega1*omega2 + omega2**2) - G1
+    rhs2 = u - h*omega1**2 - G2
+
+    # Solve M * alpha = rhs with the analytic 2x2 inverse
+    inv_det = 1.0 / (M11*M22 - M12*M12)
+    alpha1 = (M22*rhs1 - M12*rhs2) * inv_det
+    alpha2 = (M11*rhs2 - M12*rhs1) * inv_det
+    return alpha1, alpha2
+
+
+def acrobot_dynamics(t, state, u, params=ACROBOT_PARAMS):
+    """
+    Compute the full nonlinear dynamics of the Acrobot (manipulator form).
+
+    Accepts either one state of shape (4,) or a batch of shape (N, 4); the
+    2x2 mass matrix is inverted in closed form, so no per-call M, C, G or B
+    arrays are built and no linear solve is needed.
+
+    Parameters:
+        t: Current time (unused, kept for the integrator signature)
+        state: [theta1, theta2, omega1, omega2], shape (4,) or (N, 4)
+        u: Torque at the second joint, scalar, shape (1,), (N,) or (N, 1)
+        params: AcrobotParams
+
+    Returns:
+        xdot: State derivative with the same shape as state
+    """
+    torque_limit = params.torque_limit
+    state = np.asarray(state)
+
+    if state.ndim == 1:
+        theta1, theta2, omega1, omega2 = state.tolist()
+        # Clamp as a Python float; np.clip costs more than the dynamics here
+        u = min(max(sum(np.asarray(u, dtype=float).ravel().tolist()), -torque_limit), torque_limit)
+        alpha1, alpha2 = _acrobot_accelerations(
+            theta1, theta2, omega1, omega2, u, params, math.sin, math.cos
+        )
+        return np.array([omega1, omega2, alpha1, alpha2])
+
+    u = np.asarray(u)
+    if u.ndim == state.ndim:
+        u = u[..., 0]
+    u = np.clip(u, -torque_limit, torque_limit)
+    omega1 = state[..., 2]
+    omega2 = state[..., 3]
+    alpha1, alpha2 = _acrobot_accelerations(
+        state[..., 0], state[..., 1], omega1, omega2, u, params, np.sin, np.cos
+    )
+    return np.stack([omega1, omega2, alpha1, alpha2], axis=-1)
+
+
+###############################################################################
+#                                 PENDULUM                                    #
+###############################################################################
+PendulumParams = namedtuple("PendulumParams", ["m", "L", "g", "b"])
+
+PENDULUM_PARAMS = PendulumParams(
+    m=1.0,   # Mass
+    L=1.0,   # Pendulum length
+    g=9.8,   # Gravity
+    b=0.1,   # Damping coefficient
+)
+
+
+def pendulum_dynamics(t, state, u, params=PENDULUM_PARAMS):
+    """
+    Damped pendulum driven by a torque at the pivot.
+
+    Parameters:
+        t: Current time (unused, kept for the integrator signature)
+        state: [theta, omega], shape (2,) or (N, 2)
+        u: Torque at the pivot, scalar, shape (1,), (N,) or (N, 1)
+        params: PendulumParams
+
+    Returns:
+        xdot: State derivative with the same shape as state
+    """
+    m, L, g, b = params
+    state = np.asarray(state)
+    if state.ndim == 1:
+        theta, omega = state.tolist()
+        u = sum(np.asarray(u, dtype=float).ravel().tolist())
+        return np.array([omega, (u - b * omega - m * g * L * math.sin(theta)) / (m * L**2)])
+
+    u = np.asarray(u)
+    if u.ndim == state.ndim:
+        u = u[..., 0]
+    theta = state[..., 0]
+    omega = state[..., 1]
+    angular_acceleration = (u - b * omega - m * g * L * np.sin(theta)) / (m * L**2)
+    return np.stack([omega, angular_acceleration], axis=-1)
+
+
+###############################################################################
+#                               MASS-SPRING                                   #
+###############################################################################
+SpringParams = namedtuple("SpringParams", ["m", "k", "b"])
+
+SPRING_PARAMS = SpringParams(
+    m=1.0,   # Mass
+    k=1.0,   # Spring constant
+    b=0.5,   # Damping coefficient
+)
+
+
+def spring_dynamics(t, state, u, params=SPRING_PARAMS):
+    """
+    Damped mass-spring system driven by an external force (Hooke's Law).
+
+    Parameters:
+        t: Current time (unused, kept for the integrator signature)
+        state: [x, v], shape (2,) or (N, 2)
+        u: External force, scalar, shape (1,), (N,) or (N, 1)
+        params: SpringParams
+
+    Returns:
+        xdot: State derivative with the same shape as state
+    """
+    m, k, b = params
+    state = np.asarray(state)
+    u = np.asarray(u)
+    if u.ndim == state.ndim:
+        u = u[..., 0]
+    x = state[..., 0]
+    v = state[..., 1]
+    a = (u - k * x - b * v) / m
+    return np.stack([v, a], axis=-1)
+
+
+###############################################################################
+#                            DOUBLE INTEGRATOR                                #
+###############################################################################
+def double_integrator_dynamics(t, state, u):
+    """
+    Double integrator q'' = u.
+
+    Parameters:
+        t: Current time (unused, kept for the integrator signature)
+        state: [q, q_dot], shape (2,) or (N, 2)
+        u: Acceleration input, scalar, shape (1,), (N,) or (N, 1)
+
+    Returns:
+        xdot: State derivative with the same shape as state
+    """
+    state = np.asarray(state)
+    u = np.asarray(u, dtype=float)
+    if u.ndim == state.ndim:
+        u = u[..., 0]
+    q_dot = state[..., 1]
+    return np.stack([q_dot, np.broadcast_to(u, q_dot.shape)], axis=-1)
+
+
+###############################################################################
+#                            IN-PLACE DYNAMICS                                #
+###############################################################################
+# Same models as above with the in-place protocol f(t, state, u, out): the
+# derivative is written into a preallocated out (which must not alias state)
+# and out is returned. A single state allocates no arrays at all; u is read
+# as a float, so pass a float or the (1,) buffer a controller writes into.
+def _scalar_input(u):
+    return u.item(0) if isinstance(u, np.ndarray) else float(u)
+
+
+def _batch_input(u, state):
+    u = np.asarray(u)
+    return u[..., 0] if u.ndim == state.ndim else u
+
+
+def acrobot_dynamics_into(t, state, u, out, params=ACROBOT_PARAMS):
+    """
+    In-place acrobot_dynamics. Batches still build the intermediate arrays
+    of _acrobot_accelerations (amortized over N rows) before writing out.
+    """
+    torque_limit = params.torque_limit
+    if state.ndim == 1:
+        theta1, theta2, omega1, omega2 = state.tolist()
+        u = min(max(_scalar_input(u), -torque_limit), torque_limit)
+        out[2], out[3] = _acrobot_accelerations(
+            theta1, theta2, omega1, omega2, u, params, math.sin, math.cos
+        )
+        out[0] = omega1
+        out[1] = omega2
+        return out
+
+    u = np.clip(_batch_input(u, state), -torque_limit, torque_limit)
+    out[..., 2], out[..., 3] = _acrobot_accelerations(
+        state[..., 0], state[..., 1], state[..., 2], state[..., 3], u, params, np.sin, np.cos
+    )
+    out[..., :2] = state[..., 2:]
+    return out
+
+
+def pendulum_dynamics_into(t, state, u, out, params=PENDULUM_PARAMS):
+    """ In-place pendulum_dynamics. """
+    m, L, g, b = params
+    if state.ndim == 1:
+        theta, omega = state.tolist()
+        out[0] = omega
+        out[1] = (_scalar_input(u) - b * omega - m * g * L * math.sin(theta)) / (m * L**2)
+        return out
+
+    velocity = out[..., 0]
+    acceleration = out[..., 1]
+    np.sin(state[..., 0], out=acceleration)
+    acceleration *= -m * g * L
+    np.multiply(state[..., 1], -b, out=velocity)
+    acceleration += velocity
+    acceleration += _batch_input(u, state)
+    acceleration /= m * L**2
+    velocity[...] = state[..., 1]
+    return out
+
+
+def spring_dynamics_into(t, state, u, out, params=SPRING_PARAMS):
+    """ In-place spring_dynamics. """
+    m, k, b = params
+    if state.ndim == 1:
+        x, v = state.tolist()
+        out[0] = v
+        out[1] = (_scalar_input(u) - k * x - b * v) / m
+        return out
+
+    velocity = out[..., 0]
+    acceleration = out[..., 1]
+    np.multiply(state[..., 0], -k, out=acceleration)
+    np.multiply(state[..., 1], -b, out=velocity)
+    acceleration += velocity
+    acceleration += _batch_input(u, state)
+    acceleration /= m
+    velocity[...] = state[..., 1]
+    return out
+
+
+def double_integrator_dynamics_into(t, state, u, out):
+    """ In-place double_integrator_dynamics. """
+    if state.ndim == 1:
+        out[0] = state[1]
+        out[1] = _scalar_input(u)
+        return out
+
+    out[..., 0] = state[..., 1]
+    out[..., 1] = _batch_input(u, state)
+    return out
+
+
+###############################################################################
+#                                 ENERGY                                      #
+###############################################################################
+def pendulum_energy(state, params=PENDULUM_PARAMS):
+    """ Total energy of the pendulum, for a state (2,) or batch (N, 2). """
+    m, L, g, _ = params
+    state = np.asarray(state)
+    theta = state[..., 0]
+    omega = state[..., 1]
+    return 0.5 * m * L**2 * omega**2 - m * g * L * np.cos(theta)
+
+
+def spring_energy(state, params=SPRING_PARAMS):
+    """ Total energy of the mass-spring, for a state (2,) or batch (N, 2). """
+    m, k, _ = params
+    state = np.asarray(state)
+    return 0.5 * m * state[..., 1]**2 + 0.5 * k * state[..., 0]**2
+
+
+def acrobot_energy(state, params=ACROBOT_PARAMS):
+    """
+    Total energy 0.5 * omega^T M(q) omega + U(q) of the Acrobot, using the
+    same M and potential as acrobot_dynamics, for a state (4,) or batch (N, 4).
+    """
+    m1, m2, I1, I2, L1, L2, g, _ = params
+    state = np.asarray(state)
+    theta1 = state[..., 0]
+    theta2 = state[..., 1]
+    omega1 = state[..., 2]
+    omega2 = state[..., 3]
+    cos2 = np.cos(theta2)
+    M11 = I1 + I2 + m2*L1**2 + 2*m2*L1*L2*cos2
+    M12 = I2 + m2*L1*L2*cos2
+    M22 = I2
+    kinetic = 0.5 * (M11*omega1**2 + 2*M12*omega1*omega2 + M22*omega2**2)
+    potential = -(m1 + m2)*g*L1*np.cos(theta1) - m2*g*L2*np.cos(theta1 + theta2)
+    return kinetic + potential
+
+
+###############################################################################
+#                                JACOBIANS                                    #
+###############################################################################
+# Closed-form df/dx and df/du of the models above at any state and input.
+# Each accepts one state (n,) or a batch (N, n) with inputs shaped as for the
+# dynamics, and returns A of shape (..., n, n) and B of shape (..., n, 1).
+def _control_column(state, u):
+    """ Inputs as an array broadcastable against state[..., 0]. """
+    u = np.asarray(u, dtype=float)
+    if u.ndim == state.ndim:
+        u = u[..., 0]
+    return np.broadcast_to(u, state.shape[:-1])
+
+
+def acrobot_jacobians(state, u, params=ACROBOT_PARAMS):
+    """
+    Linearization of acrobot_dynamics, including the Coriolis terms.
+
+    With alpha = M^{-1} r(q, qdot, u) and only M depending on theta2,
+        d alpha / dz = M^{-1} (dr/dz - dM/dz alpha)
+    Inputs beyond the torque limit are clamped as in the dynamics and have
+    zero input derivative.
+
+    Parameters:
+        state: [theta1, theta2, omega1, omega2], shape (4,) or (N, 4)
+        u: Torque at the second joint, scalar, shape (1,), (N,) or (N, 1)
+        params: AcrobotParams
+
+    Returns:
+        A: df/dx, shape (4, 4) or (N, 4, 4)
+        B: df/du, shape (4, 1) or (N, 4, 1)
+    """
+    m1, m2, I1, I2, L1, L2, g, torque_limit = params
+    state = np.asarray(state, dtype=float)
+    u = _control_column(state, u)
+    inside = np.abs(u) <= torque_limit
+    u = np.clip(u, -torque_limit, torque_limit)
+    theta1 = state[..., 0]
+    theta2 = state[..., 1]
+    omega1 = state[..., 2]
+    omega2 = state[..., 3]
+
+    c2 = np.cos(theta2)
+    h = m2*L1*L2*np.sin(theta2)
+    h_dot = m2*L1*L2*c2
+    dG2 = m2*g*L2*np.cos(theta1 + theta2)
+    G2 = m2*g*L2*np.sin(theta1 + theta2)
+    G1 = (m1 + m2)*g*L1*np.sin(theta1) + G2
+
+    M11 = I1 + I2 + m2*L1**2 + 2*m2*L1*L2*c2
+    M12 = I2 + m2*L1*L2*c2
+    M22 = np.broadcast_to(I2, c2.shape)
+    inv_det = 1.0 / (M11*M22 - M12*M12)
+    r1 = h*(2*omega1*omega2 + omega2**2) - G1
+    r2 = u - h*omega1**2 - G2
+    alpha1 = (M22*r1 - M12*r2) * inv_det
+    alpha2 = (M11*r2 - M12*r1) * inv_det
+
+    # d/d[theta1, theta2, omega1, omega2] of r - M alpha (dM/dtheta2 in the theta2 entry)
+    d1 = np.stack([-((m1 + m2)*g*L1*np.cos(theta1) + dG2),
+                   h_dot*(2*omega1*omega2 + omega2**2) - dG2 + 2*h*alpha1 + h*alpha2,
+                   2*h*omega2,
+                   2*h*(omega1 + omega2)], axis=-1)
+    d2 = np.stack([-dG2,
+                   -h_dot*omega1**2 - dG2 + h*alpha1,
+                   -2*h*omega1,
+                   np.zeros_like(h)], axis=-1)
+
+    A = np.zeros(state.shape[:-1] + (4, 4))
+    A[..., 0, 2] = 1.0
+    A[..., 1, 3] = 1.0
+    A[..., 2, :] = (M22[..., None]*d1 - M12[..., None]*d2) * inv_det[..., None]
+    A[..., 3, :] = (M11[..., None]*d2 - M12[..., None]*d1) * inv_det[..., None]
+    B = np.zeros(state.shape[:-1] + (4, 1))
+    B[..., 2, 0] = -M12 * inv_det * inside
+    B[..., 3, 0] = M11 * inv_det * inside
+    return A, B
+
+
+def pendulum_jacobians(state, u, params=PENDULUM_PARAMS):
+    """ Linearization (A (..., 2, 2), B (..., 2, 1)) of pendulum_dynamics. """
+    m, L, g, b = params
+    state = np.asarray(state, dtype=float)
+    J = m * L**2
+    A = np.zeros(state.shape[:-1] + (2, 2))
+    A[..., 0, 1] = 1.0
+    A[..., 1, 0] = -g / L * np.cos(state[..., 0])
+    A[..., 1, 1] = -b / J
+    B = np.zeros(state.shape[:-1] + (2, 1))
+    B[..., 1, 0] = 1.0 / J
+    return A, B
+
+
+def spring_jacobians(state, u, params=SPRING_PARAMS):
+    """ Linearization (A (..., 2, 2), B (..., 2, 1)) of spring_dynamics. """
+    m, k, b = params
+    state = np.asarray(state, dtype=float)
+    A = np.zeros(state.shape[:-1] + (2, 2))
+    A[..., 0, 1] = 1.0
+    A[..., 1, 0] = -k / m
+    A[..., 1, 1] = -b / m
+    B = np.zeros(state.shape[:-1] + (2, 1))
+    B[..., 1, 0] = 1.0 / m
+    return A, B
+
+
+def double_integrator_jacobians(state, u):
+    """ Linearization (A (..., 2, 2), B (..., 2, 1)) of double_integrator_dynamics. """
+    state = np.asarray(state, dtype=float)
+    A = np.broadcast_to(np.array([[0.0, 1.0], [0.0, 0.0]]), state.shape[:-1] + (2, 2))
+    B = np.broadcast_to(np.array([[0.0], [1.0]]), state.shape[:-1] + (2, 1))
+    return A.copy(), B.copy()
+
+
+def finite_difference_jacobians(dynamics, state, u, eps=1e-6):
+    """
+    Central-difference df/dx and df/du of dynamics(t, state, u), batched
+    like the closed-form Jacobians. Costs 2 (n + 1) dynamics calls, so it is
+    meant for checking those, not for use in a loop.
+    """
+    state = np.asarray(state, dtype=float)
+    u = _control_column(state, u)
+    n = state.shape[-1]
+    A = np.empty(state.shape[:-1] + (n, n))
+    for j in range(n):
+        step = np.zeros(n)
+        step[j] = eps
+        A[..., :, j] = (dynamics(0.0, state + step, u) - dynamics(0.0, state - step, u)) / (2 * eps)
+    B = ((dynamics(0.0, state, u + eps) - dynamics(0.0, state, u - eps)) / (2 * eps))[..., None]
+    return A, B
+
+
+def jacobian_error(dynamics, jacobians, state, u, eps=1e-6):
+    """ Largest absolute difference between closed-form and finite-difference A and B. """
+    A, B = jacobians(state, u)
+    A_fd, B_fd = finite_difference_jacobians(dynamics, state, u, eps)
+    return float(np.max(np.abs(A - A_fd))), float(np.max(np.abs(B - B_fd)))
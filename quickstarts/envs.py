@@ -0,0 +1,284 @@
+"""
+Vectorized Gym-style environments for policy training.
+
+A VectorEnv steps num_envs instances of one model in lockstep, with the
+reset()/step() signatures of gymnasium's vector API (without depending on
+gymnasium):
+
+    env = PendulumEnv(4096, seed=0)
+    observations, infos = env.reset()
+    observations, rewards, terminated, truncated, infos = env.step(actions)
+
+Episodes end by termination (a goal or failure condition of the task) or
+truncation (max_steps reached). Finished envs are reset in place within
+the same step: their row of observations already starts the next episode,
+and infos["final_observation"] holds the last observation of the finished
+one for the rows flagged in infos["final"].
+
+The state stays in one (num_envs, state_dim) array advanced by an
+in-place integrator workspace on model.dynamics_into, and every returned
+array is a buffer owned by the env and overwritten by the next step: copy
+what has to outlive it. A model with per-environment parameter arrays
+(Model.randomized) gives each env its own physical constants.
+
+    python envs.py --envs 1 256 4096 65536
+"""
+import abc
+import argparse
+
+import numpy as np
+
+from integrators import EulerWorkspace, RK4Workspace
+from models import Acrobot, Pendulum
+
+WORKSPACES = {"euler": EulerWorkspace, "rk4": RK4Workspace}
+
+
+class VectorEnv(abc.ABC):
+    """
+    Base class: a batch of one model with batched rewards and auto-reset.
+
+    Subclasses set Model, observation_dim and the default dt and max_steps,
+    and implement _action_limit, _sample_states, _observe, _reward and, for
+    tasks that can end early, _terminated.
+
+    Parameters:
+        num_envs: Number of environments
+        model: Model instance, with shared parameters or one value per
+               environment (defaults to the Model class defaults)
+        dt: Simulated time per env step
+        substeps: Integrator steps per env step, the action held over them
+        max_steps: Steps after which an episode is truncated
+        integrator: "rk4" or "euler"
+        seed: Seed or numpy Generator for the initial states
+    """
+    Model = None
+    observation_dim = None
+    dt = 0.05
+    max_steps = 200
+
+    def __init__(self, num_envs, model=None, dt=None, substeps=1, max_steps=None, integrator="rk4",
+                 seed=None):
+        model = self.Model() if model is None else model
+        if model.num_envs is not None and model.num_envs != num_envs:
+            raise ValueError(f"Model has {model.num_envs} environments, expected {num_envs}")
+        self.num_envs = num_envs
+        self.model = model
+        self.dt = self.dt if dt is None else dt
+        self.substeps = substeps
+        self.max_steps = self.max_steps if max_steps is None else max_steps
+        self.rng = np.random.default_rng(seed)
+
+        shape = (num_envs, model.state_dim)
+        self.states = np.zeros(shape)
+        self._workspace = WORKSPACES[integrator](model.dynamics_into, shape)
+        self._limit = np.reshape(np.asarray(self._action_limit(), dtype=float), (-1, 1))
+        self._actions = np.zeros((num_envs, 1))
+        self._scratch = np.empty(num_envs)
+        self._done = np.zeros(num_envs, dtype=bool)
+        self._steps = np.zeros(num_envs, dtype=np.int64)
+        self._returns = np.zeros(num_envs)
+
+        self.observations = np.zeros((num_envs, self.observation_dim), dtype=np.float32)
+        self.rewards = np.zeros(num_envs)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.infos = {
+            "final": self._done,
+            "final_observation": np.zeros_like(self.observations),
+            "episode_return": np.zeros(num_envs),
+            "episode_length": np.zeros(num_envs, dtype=np.int64),
+        }
+
+    @property
+    def action_limit(self):
+        """ Largest torque magnitude of each environment, shape (num_envs,). """
+        return np.broadcast_to(self._limit[:, 0], self.num_envs)
+
+    def reset(self, seed=None):
+        """
+        Start a new episode in every environment.
+
+        Returns:
+            (observations, infos)
+        """
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self.states[:] = self._sample_states(self.num_envs)
+        self._steps[:] = 0
+        self._returns[:] = 0.0
+        self._done[:] = False
+        self._observe(self.states, self.observations)
+        return self.observations, self.infos
+
+    def step(self, actions):
+        """
+        Advance every environment by dt, resetting the finished ones.
+
+        Parameters:
+            actions: Torques, shape (num_envs,) or (num_envs, 1), clipped
+                     to the action limit
+
+        Returns:
+            (observations, rewards, terminated, truncated, infos)
+        """
+        self._actions[:, 0] = np.reshape(actions, self.num_envs)
+        np.clip(self._actions, -self._limit, self._limit, out=self._actions)
+        dt = self.dt / self.substeps
+        for _ in range(self.substeps):
+            self._workspace.step(self.states, self._actions, dt, self.states)
+
+        self._observe(self.states, self.observations)
+        self._terminated(self.states, self.terminated)
+        self._reward(self.states, self._actions[:, 0], self.rewards)
+        self._steps += 1
+        self._returns += self.rewards
+        np.greater_equal(self._steps, self.max_steps, out=self.truncated)
+        np.logical_or(self.terminated, self.truncated, out=self._done)
+        if self._done.any():
+            self._reset_done()
+        return self.observations, self.rewards, self.terminated, self.truncated, self.infos
+
+    def _reset_done(self):
+        """ Record the finished episodes in infos and restart them in place. """
+        done = np.flatnonzero(self._done)
+        infos = self.infos
+        infos["final_observation"][done] = self.observations[done]
+        infos["episode_return"][done] = self._returns[done]
+        infos["episode_length"][done] = self._steps[done]
+        states = self._sample_states(len(done))
+        self.states[done] = states
+        self.observations[done] = self._observe(states, np.empty((len(done), self.observation_dim)))
+        self._steps[done] = 0
+        self._returns[done] = 0.0
+
+    @abc.abstractmethod
+    def _action_limit(self):
+        """ Largest torque magnitude, a number or one per environment. """
+
+    @abc.abstractmethod
+    def _sample_states(self, count):
+        """ Initial states of count new episodes, shape (count, state_dim). """
+
+    @abc.abstractmethod
+    def _observe(self, states, out):
+        """ Write the observations of states into out and return it. """
+
+    @abc.abstractmethod
+    def _reward(self, states, actions, out):
+        """ Write the reward of reaching states under actions into out (after _terminated). """
+
+    def _terminated(self, states, out):
+        """ Write the termination mask into out (no early termination by default). """
+        return out
+
+
+class PendulumEnv(VectorEnv):
+    """
+    Torque-limited pendulum swing-up, as in gym's Pendulum.
+
+    Observation [cos(theta), sin(theta), omega] with theta = 0 hanging down.
+    The reward is -(e**2 + 0.1 omega**2 + 0.001 u**2) for the angle e from
+    upright; episodes are only truncated. The default torque limit of 2 is
+    well below m*g*L, so the pendulum has to be pumped up.
+    """
+    Model = Pendulum
+    observation_dim = 3
+    dt = 0.05
+    max_steps = 200
+    max_torque = 2.0
+
+    def _action_limit(self):
+        return self.max_torque
+
+    def _sample_states(self, count):
+        return np.column_stack([self.rng.uniform(-np.pi, np.pi, count),
+                                self.rng.uniform(-1.0, 1.0, count)])
+
+    def _observe(self, states, out):
+        np.cos(states[:, 0], out=out[:, 0])
+        np.sin(states[:, 0], out=out[:, 1])
+        out[:, 2] = states[:, 1]
+        return out
+
+    def _reward(self, states, actions, out):
+        # theta mod 2 pi via floor, several times faster than np.remainder
+        error = self._scratch
+        np.multiply(states[:, 0], 1 / (2 * np.pi), out=error)
+        np.floor(error, out=error)
+        error *= -2 * np.pi
+        error += states[:, 0]
+        error -= np.pi
+        np.square(error, out=error)
+        np.square(states[:, 1], out=out)
+        out *= 0.1
+        out += error
+        np.square(actions, out=error)
+        error *= 0.001
+        out += error
+        np.negative(out, out=out)
+        return out
+
+
+class AcrobotEnv(VectorEnv):
+    """
+    Acrobot swing-up, as in gym's Acrobot but with a continuous torque.
+
+    Observation [cos(theta1), sin(theta1), cos(theta2), sin(theta2),
+    omega1, omega2]. The reward is -1 per step until the tip rises L1
+    above the shoulder, which terminates the episode with reward 0.
+    """
+    Model = Acrobot
+    observation_dim = 6
+    dt = 0.05
+    max_steps = 500
+
+    def _action_limit(self):
+        return self.model.params.torque_limit
+
+    def _sample_states(self, count):
+        return self.rng.uniform(-0.1, 0.1, (count, 4))
+
+    def _observe(self, states, out):
+        np.cos(states[:, 0], out=out[:, 0])
+        np.sin(states[:, 0], out=out[:, 1])
+        np.cos(states[:, 1], out=out[:, 2])
+        np.sin(states[:, 1], out=out[:, 3])
+        out[:, 4:] = states[:, 2:]
+        return out
+
+    def _reward(self, states, actions, out):
+        np.subtract(self.terminated, 1.0, out=out)
+        return out
+
+    def _terminated(self, states, out):
+        # Tip height above the shoulder, -L1 cos(theta1) - L2 cos(theta1 + theta2)
+        _, _, _, _, L1, L2, _, _ = self.model.params
+        height = self._scratch
+        np.add(states[:, 0], states[:, 1], out=height)
+        np.cos(height, out=height)
+        height *= -L2
+        height -= L1 * np.cos(states[:, 0])
+        np.greater(height, L1, out=out)
+        return out
+
+
+if __name__ == "__main__":
+    from benchmark import time_rate
+
+    parser = argparse.ArgumentParser(description="Env-steps per second of the vectorized envs.")
+    parser.add_argument("--envs", type=int, nargs="+", default=[1, 256, 4096, 65536])
+    parser.add_argument("--integrator", choices=list(WORKSPACES), default="rk4")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per measurement")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'env':<14}{'num_envs':>10}{'steps/s':>14}{'env-steps/s':>16}")
+    for env_class in (PendulumEnv, AcrobotEnv):
+        for num_envs in args.envs:
+            env = env_class(num_envs, integrator=args.integrator, seed=0)
+            env.reset()
+            # Fixed random actions, so the policy costs nothing
+            actions = rng.uniform(-1.0, 1.0, num_envs) * env.action_limit
+            rate = time_rate(lambda: env.step(actions), args.min_time)
+            print(f"{env_class.__name__:<14}{num_envs:>10}{rate:>14.3g}{rate * num_envs:>16.3g}")
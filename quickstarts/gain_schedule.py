@@ -0,0 +1,150 @@
+from collections import namedtuple
+
+import numpy as np
+
+from controllers import acrobot_gravity_torque, acrobot_linearized_matrices_at, lqr_solve_uncached
+from dynamics import ACROBOT_PARAMS
+
+# Regular (theta1, theta2) grid of LQR gains and operating-point torques.
+#   theta1, theta2: Grid axes, shape (n1,) and (n2,), evenly spaced
+#   K: Gains, shape (n1, n2, 1, 4)
+#   u0: Torque each gain was linearized about, shape (n1, n2, 1)
+GainSchedule = namedtuple("GainSchedule", ["theta1", "theta2", "K", "u0"])
+
+
+def build_acrobot_gain_schedule(theta1_grid, theta2_grid, Q, R, params=ACROBOT_PARAMS):
+    """
+    Precompute LQR gains over a grid of acrobot configurations (offline).
+
+    Each grid point is linearized at rest with the joint-2 gravity torque
+    (acrobot_linearized_matrices_at) and gets its own Riccati solution; that
+    torque is stored as the feedforward u0 of the point. At
+    runtime scheduled_lqr_controller only interpolates this table, so no
+    Riccati solve happens in the loop. The solves bypass the lqr_solve
+    cache, which a whole grid of one-off designs would only flush.
+
+    Grid points whose linearization is not stabilizable (the Riccati solve
+    fails) take the gain of the nearest valid point along theta2.
+
+    Parameters:
+        theta1_grid: Evenly spaced theta1 values, shape (n1,)
+        theta2_grid: Evenly spaced theta2 values, shape (n2,)
+        Q: State cost matrix (4x4)
+        R: Control cost matrix (1x1)
+        params: AcrobotParams
+
+    Returns:
+        GainSchedule
+    """
+    m1, m2, I1, I2, L1, L2, g, _ = params
+    theta1_grid = np.asarray(theta1_grid, dtype=float)
+    theta2_grid = np.asarray(theta2_grid, dtype=float)
+    K = np.full((len(theta1_grid), len(theta2_grid), 1, 4), np.nan)
+
+    # Linearize the whole grid in one batched call
+    theta1_mesh, theta2_mesh = np.meshgrid(theta1_grid, theta2_grid, indexing="ij")
+    u0 = acrobot_gravity_torque(theta1_mesh, theta2_mesh, m2, L2, g)[..., None]
+    A, B = acrobot_linearized_matrices_at(theta1_mesh, theta2_mesh, m1, m2, I1, I2, L1, L2, g,
+                                          u=u0[..., 0])
+
+    for i, theta1 in enumerate(theta1_grid):
+        for j in range(len(theta2_grid)):
+            try:
+                K[i, j], _ = lqr_solve_uncached(A[i, j], B[i, j], Q, R)
+            except (np.linalg.LinAlgError, ValueError):
+                pass
+
+        valid = np.flatnonzero(np.isfinite(K[i, :, 0, 0]))
+        if len(valid) == 0:
+            raise ValueError(f"No stabilizable operating point at theta1 = {theta1}")
+        nearest = valid[np.abs(np.arange(len(theta2_grid))[:, None] - valid).argmin(axis=1)]
+        K[i] = K[i, nearest]
+
+    return GainSchedule(theta1_grid, theta2_grid, K, u0)
+
+
+def interpolate_gain(schedule, theta1, theta2):
+    """
+    Bilinear interpolation of the gain table at (theta1, theta2).
+
+    The grid is regular, so the cell index is computed directly (O(1) per
+    query, no search). Queries outside the grid are clamped to its edge,
+    and along a single-point axis the gain is held constant.
+    Scalars give a (1, 4) gain, arrays of shape (N,) give (N, 1, 4).
+    """
+    return _interpolate(schedule, schedule.K, theta1, theta2)
+
+
+def interpolate_feedforward(schedule, theta1, theta2):
+    """
+    Bilinear interpolation of the operating-point torque u0, like
+    interpolate_gain. Scalars give shape (1,), arrays of shape (N,) give (N, 1).
+    """
+    return _interpolate(schedule, schedule.u0, theta1, theta2)
+
+
+def _interpolate(schedule, table, theta1, theta2):
+    """ Bilinear interpolation of a (n1, n2, ...) table over the schedule grid. """
+    def cell(axis, value):
+        if len(axis) == 1:
+            index = np.zeros(np.shape(value), dtype=int)
+            return index, index, np.zeros(np.shape(value))
+        step = axis[1] - axis[0]
+        position = np.clip((value - axis[0]) / step, 0.0, len(axis) - 1)
+        index = np.minimum(position.astype(int), len(axis) - 2)
+        return index, index + 1, position - index
+
+    i, i1, a = cell(schedule.theta1, np.asarray(theta1, dtype=float))
+    j, j1, b = cell(schedule.theta2, np.asarray(theta2, dtype=float))
+    trailing = (None,) * (table.ndim - 2)
+    a = a[(..., *trailing)]
+    b = b[(..., *trailing)]
+    return ((1 - a) * (1 - b) * table[i, j] + a * (1 - b) * table[i1, j]
+            + (1 - a) * b * table[i, j1] + a * b * table[i1, j1])
+
+
+def scheduled_lqr_controller(state, reference_state, schedule):
+    """
+    Gain-scheduled LQR: u = u0(theta1, theta2) - K(theta1, theta2) (state - reference_state),
+    with the gain K and the operating-point torque u0 looked up from a
+    precomputed GainSchedule at the current configuration. Each gain was
+    designed about u0, the torque holding its grid point at rest, so the
+    feedforward is needed away from the upright equilibrium (where u0 = 0).
+
+    Parameters:
+        state: Current state [theta1, theta2, omega1, omega2], shape (4,) or (N, 4)
+        reference_state: Reference state, shape (4,)
+        schedule: GainSchedule
+
+    Returns:
+        u: Control torque, shape (1,) or (N, 1)
+    """
+    state = np.asarray(state)
+    K = interpolate_gain(schedule, state[..., 0], state[..., 1])
+    u0 = interpolate_feedforward(schedule, state[..., 0], state[..., 1])
+    state_error = state - reference_state
+    return u0 - np.einsum("...ij,...j->...i", K, state_error)
+
+
+def save_gain_schedule(path, schedule):
+    """ Store a GainSchedule as a single uncompressed .npz file. """
+    np.savez(path, theta1=schedule.theta1, theta2=schedule.theta2, K=schedule.K, u0=schedule.u0)
+
+
+def load_gain_schedule(path):
+    """ Load a GainSchedule written by save_gain_schedule. """
+    with np.load(path) as data:
+        return GainSchedule(data["theta1"], data["theta2"], data["K"], data["u0"])
+
+
+if __name__ == "__main__":
+    import time
+
+    Q = np.diag([10.0, 10.0, 1.0, 1.0])
+    R = np.array([[1.0]])
+    start = time.perf_counter()
+    schedule = build_acrobot_gain_schedule(np.linspace(np.pi - 0.5, np.pi + 0.5, 21),
+                                           np.linspace(-0.5, 0.5, 21), Q, R)
+    print(f"Built {schedule.K.shape[0]}x{schedule.K.shape[1]} gain table "
+          f"in {time.perf_counter() - start:.2f} s")
+    save_gain_schedule("acrobot_gains.npz", schedule)
@@ -0,0 +1,284 @@
+"""
+Hybrid (event-driven) simulation of switched controllers.
+
+A switched controller is a small automaton: inside each mode the control
+law is a smooth function of the state, and a guard function marks the
+switching surface that ends the mode. simulate() re-evaluates a switching
+rule only at fixed dt ticks, so every switch lands up to dt late and a law
+like bang-bang chatters on the surface. simulate_hybrid instead integrates
+each mode with adaptive RK45 (or an exact flow), stops on the located guard
+crossing and continues in the next mode, taking large steps in between.
+
+    python hybrid.py
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from controllers import bang_bang_controller, energy_controller_pendulum, saturate
+from integrators import AdaptiveResult, locate_crossing, rk45_solve
+
+SwitchedController = namedtuple("SwitchedController", [
+    "initial",     # initial(t, state) -> starting mode
+    "control",     # control(mode, t, state) -> u, smooth inside the mode
+    "guard",       # guard(mode, t, state) -> scalar or array, None if the mode never ends;
+                   # a sign change of entry i ends the mode
+    "transition",  # transition(mode, i, t, state) -> next mode after guard entry i crossed
+])
+
+Event = namedtuple("Event", ["t", "x", "mode", "next_mode", "guard"])
+
+HybridResult = namedtuple("HybridResult", [
+    "t",       # Sample times (t_eval)
+    "x",       # States at the sample times
+    "u",       # Control at the sample times
+    "modes",   # Mode at the sample times
+    "events",  # List of Event, in time order
+    "nfev",    # Dynamics evaluations (0 for an exact flow)
+    "steps",   # Accepted RK45 steps, or one per mode segment for an exact flow
+])
+
+
+def _flow_segment(flow, guard, t0, state, u, T, t_eval, scan, event_tol):
+    """
+    One mode with a closed-form solution flow(t, state, u, s) for constant u.
+
+    The guard is scanned at `scan` points over the remaining horizon and the
+    first sign change is refined on the exact flow, so the only error is
+    event_tol in the switching time.
+    """
+    t_event = x_event = event = None
+    if guard is not None:
+        g0 = np.atleast_1d(np.asarray(guard(t0, state), dtype=float))
+        s_grid = np.linspace(0.0, T, scan + 1)[1:]
+        previous_s, previous_g = 0.0, g0
+        for s, x in zip(s_grid, flow(t0, state, u, s_grid)):
+            g = np.atleast_1d(np.asarray(guard(t0 + s, x), dtype=float))
+            crossed = np.flatnonzero((previous_g != 0) & (np.sign(g) != np.sign(previous_g)))
+            if len(crossed):
+                def crossing(i):
+                    return locate_crossing(
+                        lambda r: np.atleast_1d(guard(t0 + r, flow(t0, state, u, r)))[i],
+                        previous_s, s, previous_g[i], g[i], event_tol)
+                s_event, event = min((crossing(i), i) for i in crossed)
+                t_event = t0 + s_event
+                x_event = flow(t0, state, u, s_event)
+                T = s_event
+                break
+            previous_s, previous_g = s, g
+
+    samples = t_eval[t_eval <= t0 + T]
+    x = flow(t0, state, u, samples - t0).reshape((len(samples),) + np.shape(state))
+    return AdaptiveResult(samples, x, 0, 1, 0, t_event, x_event, event)
+
+
+def simulate_hybrid(system, controller, x0, T, t_eval=None, flow=None, rtol=1e-8, atol=1e-10,
+                    max_step=np.inf, scan=64, event_tol=1e-12, max_events=10_000):
+    """
+    Simulate a switched controller with exact switching times.
+
+    Parameters:
+        system: Dynamics func(t, state, u) of a single state
+        controller: SwitchedController
+        x0: Initial state
+        T: Total simulation time
+        t_eval: Output sample times in [0, T] (defaults to [0, T]); they do
+                not constrain the steps
+        flow: Optional exact solution flow(t, state, u, s) of the system
+              for a control held constant over a mode (control is then
+              evaluated once per mode); s may be an array of offsets
+        rtol, atol, max_step: RK45 settings used without a flow
+        scan: Guard scan points over the horizon with a flow
+        event_tol: Time tolerance of each switch
+        max_events: Raise if more switches occur (Zeno behaviour)
+
+    Returns:
+        HybridResult
+    """
+    t_eval = np.array([0.0, T]) if t_eval is None else np.asarray(t_eval, dtype=float)
+    state = np.asarray(x0, dtype=float)
+    t = 0.0
+    mode = controller.initial(t, state)
+    times, xs, us, modes, events = [], [], [], [], []
+    nfev = steps = 0
+    i_eval = 0
+
+    while True:
+        current = mode  # bound for the closures below
+        guard = None
+        if controller.guard(current, t, state) is not None:
+            def guard(s, x):
+                return controller.guard(current, s, x)
+
+        if flow is None:
+            def closed_loop(s, x, _):
+                return system(s, x, controller.control(current, s, x))
+            segment = rk45_solve(closed_loop, t, state, None, T - t, t_eval=t_eval[i_eval:],
+                                 rtol=rtol, atol=atol, max_step=max_step, events=guard,
+                                 event_tol=event_tol)
+        else:
+            u = controller.control(current, t, state)
+            segment = _flow_segment(flow, guard, t, state, u, T - t, t_eval[i_eval:], scan, event_tol)
+        nfev += segment.nfev
+        steps += segment.accepted
+
+        i_eval += len(segment.t)
+        times.append(segment.t)
+        xs.append(segment.x)
+        for s, x in zip(segment.t, segment.x):
+            us.append(controller.control(current, s, x))
+            modes.append(current)
+
+        if segment.t_event is None:
+            break
+        mode = controller.transition(current, segment.event, segment.t_event, segment.x_event)
+        events.append(Event(segment.t_event, segment.x_event, current, mode, segment.event))
+        t, state = segment.t_event, segment.x_event
+        if len(events) >= max_events:
+            raise RuntimeError(f"More than {max_events} switches before t = {T} (Zeno behaviour?)")
+
+    return HybridResult(np.concatenate(times), np.concatenate(xs), np.array(us), modes,
+                        events, nfev, steps)
+
+
+###############################################################################
+#                           SWITCHED CONTROLLERS                              #
+###############################################################################
+def double_integrator_flow(t, state, u, s):
+    """ Exact double integrator solution after time(s) s for a constant u. """
+    s = np.asarray(s, dtype=float)[..., None]
+    q, q_dot = state
+    u = float(np.sum(u))
+    return np.concatenate([q + q_dot * s + 0.5 * u * s**2, q_dot + u * s], axis=-1)
+
+
+# Bang-bang modes: +-1 accelerate, +-2 brake (the sign is that of u), 0 rest
+ACCELERATE, BRAKE, REST = 1, 2, 0
+
+
+def bang_bang_automaton(u_max):
+    """
+    Minimum-time bang-bang control of q'' = u as an automaton.
+
+    Accelerate until the switching curve q + q_dot |q_dot| / (2 u_max) = 0,
+    brake along it until q_dot = 0, then rest at the origin with u = 0
+    instead of chattering around it.
+    """
+    def switching_curve(state):
+        q, q_dot = state
+        return q + q_dot * abs(q_dot) / (2 * u_max)
+
+    def initial(t, state):
+        q, q_dot = state
+        if q == 0 and q_dot == 0:
+            return REST
+        if switching_curve(state) == 0:
+            return BRAKE * int(-np.sign(q_dot))
+        return ACCELERATE * int(np.sign(bang_bang_controller(q, q_dot, u_max)))
+
+    def control(mode, t, state):
+        return float(np.sign(mode)) * u_max
+
+    def guard(mode, t, state):
+        if abs(mode) == ACCELERATE:
+            return switching_curve(state)
+        if abs(mode) == BRAKE:
+            return state[1]
+        return None
+
+    def transition(mode, i, t, state):
+        return -BRAKE * int(np.sign(mode)) if abs(mode) == ACCELERATE else REST
+
+    return SwitchedController(initial, control, guard, transition)
+
+
+# Pendulum modes
+SWING_UP, STABILIZE = 0, 1
+
+
+def pendulum_swingup_automaton(m, L, g, E_desired, k, Kp, Kd, theta_target=np.pi,
+                               torque_limit=1.0, switch_angle=0.2):
+    """
+    controllers.pendulum_swingup_controller as an automaton: energy
+    swing-up until |theta - theta_target| drops to switch_angle, then
+    gravity-compensated PD until it leaves that band again. Torque
+    saturation boundaries are guards too, without changing the mode.
+    """
+    def initial(t, state):
+        return STABILIZE if abs(state[0] - theta_target) <= switch_angle else SWING_UP
+
+    def unsaturated(mode, state):
+        theta, omega = state
+        if mode == SWING_UP:
+            return float(energy_controller_pendulum(m, L, omega, g, theta, E_desired, k))
+        return m*g*L*np.sin(theta) - Kp * (theta - theta_target) - Kd * omega
+
+    def control(mode, t, state):
+        return saturate(unsaturated(mode, state), torque_limit)
+
+    def guard(mode, t, state):
+        # Entering or leaving saturation is a kink in u; stopping on it
+        # spares the step-size controller from rejecting steps across it
+        u = unsaturated(mode, state)
+        return np.array([abs(state[0] - theta_target) - switch_angle,
+                         u - torque_limit, u + torque_limit])
+
+    def transition(mode, i, t, state):
+        if i > 0:
+            return mode
+        return STABILIZE if mode == SWING_UP else SWING_UP
+
+    return SwitchedController(initial, control, guard, transition)
+
+
+if __name__ == "__main__":
+    from functools import partial
+
+    from controllers import pendulum_swingup_controller
+    from dynamics import PENDULUM_PARAMS, double_integrator_dynamics, pendulum_dynamics
+    from integrators import rk4_step
+    from linear import double_integrator_linear_system, zoh_step
+    from simulation import simulate
+
+    def switches(u):
+        u = np.ravel(u)
+        return int(np.count_nonzero(u[1:] != u[:-1]))
+
+    # Double integrator, bang-bang from q = -10, q_dot = 1 with |u| <= 1
+    x0, u_max, T, dt = np.array([-10.0, 1.0]), 1.0, 10.0, 0.01
+    t_switch = -1.0 + np.sqrt(10.5)          # reaches the switching curve
+    t_arrive = t_switch + (1.0 + t_switch)   # brakes from q_dot = 1 + t_switch to 0
+
+    fixed = simulate(double_integrator_linear_system(),
+                     lambda t, state: bang_bang_controller(state[0], state[1], u_max),
+                     zoh_step, x0, dt, T)
+    exact = simulate_hybrid(double_integrator_dynamics, bang_bang_automaton(u_max), x0, T,
+                            t_eval=np.arange(0, T + dt / 2, dt), flow=double_integrator_flow)
+    print("Double integrator, bang-bang")
+    print(f"  fixed dt={dt}: {len(fixed.t) - 1} steps, {switches(fixed.u)} input switches, "
+          f"final |x| {np.linalg.norm(fixed.x[-1]):.2e}")
+    print(f"  hybrid (exact flow): {exact.steps} segments, {len(exact.events)} switches at "
+          f"t = {', '.join(f'{event.t:.6f}' for event in exact.events)}, "
+          f"final |x| {np.linalg.norm(exact.x[-1]):.2e}")
+    print(f"  switch time errors: {abs(exact.events[0].t - t_switch):.1e}, "
+          f"{abs(exact.events[1].t - t_arrive):.1e}")
+
+    # Pendulum energy swing-up with PD stabilization
+    m, L, g, b = PENDULUM_PARAMS
+    E_desired, k, Kp, Kd = m * g * L, 10.0, 5.0, 10.0
+    x0, T = np.array([np.pi / 16, 0.0]), 20.0
+    dynamics = partial(pendulum_dynamics, params=PENDULUM_PARAMS)
+    fixed = simulate(dynamics,
+                     lambda t, state: pendulum_swingup_controller(state[0], state[1], m, L, g,
+                                                                  E_desired, k, Kp, Kd),
+                     rk4_step, x0, dt, T)
+    automaton = pendulum_swingup_automaton(m, L, g, E_desired, k, Kp, Kd)
+    t_eval = np.arange(0, T + dt / 2, dt)
+    hybrid = simulate_hybrid(dynamics, automaton, x0, T, t_eval=t_eval, rtol=1e-6, atol=1e-9)
+    reference = simulate_hybrid(dynamics, automaton, x0, T, t_eval=t_eval, rtol=1e-11, atol=1e-13)
+    print("Pendulum, energy swing-up + PD (error = max deviation from a tight-tolerance run)")
+    print(f"  fixed dt={dt} RK4: {len(fixed.t) - 1} steps, {4 * (len(fixed.t) - 1)} evaluations, "
+          f"error {np.abs(fixed.x - reference.x).max():.1e}")
+    print(f"  hybrid RK45: {hybrid.steps} steps, {hybrid.nfev} evaluations, "
+          f"{sum(event.guard == 0 for event in hybrid.events)} mode switches, "
+          f"{len(hybrid.events)} events, error {np.abs(hybrid.x - reference.x).max():.1e}")
@@ -0,0 +1,302 @@
+"""
+Iterative LQR (iLQR) trajectory optimization for swing-up.
+
+Optimizes an open-loop torque sequence for the same dynamics the quickstarts
+simulate, discretized with RK4 so the optimized trajectory is exactly what
+simulate(..., rk4_step, ...) reproduces. Every iteration linearizes the RK4
+map along the current trajectory with analytic Jacobians, runs a Riccati-like
+backward pass for feedforward k and feedback K terms, and line-searches the
+forward pass. The result includes the time-varying gains, so it can be
+tracked in closed loop with tracking_controller().
+
+    python ilqr.py [--system acrobot]
+"""
+import argparse
+import time
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+from dynamics import (ACROBOT_PARAMS, PENDULUM_PARAMS, acrobot_dynamics, acrobot_jacobians,
+                      pendulum_dynamics, pendulum_jacobians)
+from integrators import rk4_step
+
+ILQRResult = namedtuple("ILQRResult", [
+    "x",           # (N + 1, n) optimized states
+    "u",           # (N, m) optimized controls
+    "k",           # (N, m) feedforward terms of the last backward pass
+    "K",           # (N, m, n) time-varying feedback gains
+    "cost",        # Final cost
+    "converged",   # Whether the relative cost change fell below tolerance
+    "iterations",  # List of IterationStats
+])
+
+IterationStats = namedtuple("IterationStats", [
+    "cost", "alpha", "mu", "linearize_time", "backward_time", "forward_time",
+])
+
+# Line-search step sizes tried in order
+ALPHAS = 0.5 ** np.arange(10)
+
+
+###############################################################################
+#                           RK4 LINEARIZATION                                 #
+###############################################################################
+def _rk4_linearization(dynamics, jacobians, x, u, dt):
+    """
+    Jacobians (N, n, n) and (N, n, m) of the RK4 map
+    x_next = rk4_step(dynamics, t, x, u, dt) along a whole trajectory of
+    (N, n) states and (N, m) controls, chained through its four stages.
+    """
+    half_dt = 0.5 * dt
+    eye = np.eye(x.shape[1])
+    k1 = dynamics(0.0, x, u)
+    A1, B1 = jacobians(x, u)
+    x2 = x + half_dt * k1
+    k2 = dynamics(0.0, x2, u)
+    A2, B2 = jacobians(x2, u)
+    x3 = x + half_dt * k2
+    k3 = dynamics(0.0, x3, u)
+    A3, B3 = jacobians(x3, u)
+    A4, B4 = jacobians(x + dt * k3, u)
+
+    dk1_dx, dk1_du = A1, B1
+    dk2_dx, dk2_du = A2 @ (eye + half_dt * dk1_dx), A2 @ (half_dt * dk1_du) + B2
+    dk3_dx, dk3_du = A3 @ (eye + half_dt * dk2_dx), A3 @ (half_dt * dk2_du) + B3
+    dk4_dx, dk4_du = A4 @ (eye + dt * dk3_dx), A4 @ (dt * dk3_du) + B4
+    Fx = eye + dt / 6 * (dk1_dx + 2*dk2_dx + 2*dk3_dx + dk4_dx)
+    Fu = dt / 6 * (dk1_du + 2*dk2_du + 2*dk3_du + dk4_du)
+    return Fx, Fu
+
+
+###############################################################################
+#                                 iLQR                                        #
+###############################################################################
+def _rollout(dynamics, x0, u_nominal, x_nominal, k, K, alpha, dt, u_limit, x_out, u_out):
+    """ Forward pass u = u_nominal + alpha k + K (x - x_nominal), written into x_out, u_out. """
+    x_out[0] = x0
+    for i in range(len(u_out)):
+        u = u_nominal[i] + alpha * k[i] + K[i] @ (x_out[i] - x_nominal[i])
+        if u_limit is not None:
+            u = np.minimum(np.maximum(u, -u_limit), u_limit)
+        u_out[i] = u
+        x_out[i + 1] = rk4_step(dynamics, i * dt, x_out[i], u, dt)
+
+
+def _cost(x, u, x_goal, Q, R, Qf, dt):
+    error = x - x_goal
+    running = np.einsum("ki,ij,kj->", error[:-1], Q, error[:-1]) + np.einsum("ki,ij,kj->", u, R, u)
+    return 0.5 * dt * running + 0.5 * error[-1] @ Qf @ error[-1]
+
+
+def ilqr(dynamics, jacobians, x0, u_init, dt, x_goal, Q, R, Qf, u_limit=None,
+         max_iterations=100, tolerance=1e-4, mu_init=1e-6):
+    """
+    Minimize 0.5 * sum(dt * (e^T Q e + u^T R u)) + 0.5 * e_N^T Qf e_N,
+    e = x - x_goal, over the controls of an RK4-discretized system.
+
+    Parameters:
+        dynamics: Dynamics func(t, state, u)
+        jacobians: func(states, u) returning continuous-time (df/dx, df/du)
+                   for a batch of states, e.g. dynamics.acrobot_jacobians
+        x0: Initial state (n,)
+        u_init: Initial control sequence (N, m); pass a previous solution's
+                u (see warm_start) to warm-start
+        dt: Time step of the discretization
+        x_goal: Target state (n,)
+        Q, R, Qf: Running state, control and terminal state costs
+        u_limit: Optional symmetric control bound; saturated steps get no
+                 feedback and their feedforward is clamped to the bound
+        max_iterations: Iteration cap
+        tolerance: Relative cost change counted as converged
+        mu_init: Initial Levenberg-Marquardt regularization of Vxx
+
+    Returns:
+        ILQRResult
+    """
+    x0 = np.asarray(x0, dtype=float)
+    x_goal = np.asarray(x_goal, dtype=float)
+    Q, R, Qf = (np.atleast_2d(np.asarray(M, dtype=float)) for M in (Q, R, Qf))
+    u_nominal = np.array(u_init, dtype=float).reshape(len(u_init), -1)
+    N, m = u_nominal.shape
+    n = len(x0)
+
+    # Preallocated trajectories, linearizations and gains
+    x_nominal = np.empty((N + 1, n))
+    x_trial = np.empty((N + 1, n))
+    u_trial = np.empty((N, m))
+    Fx = np.empty((N, n, n))
+    Fu = np.empty((N, n, m))
+    k = np.zeros((N, m))
+    K = np.zeros((N, m, n))
+    eye_n = np.eye(n)
+    Q_dt, R_dt = Q * dt, R * dt
+
+    _rollout(dynamics, x0, u_nominal, x_nominal, k, K, 0.0, dt, u_limit, x_nominal, u_nominal)
+    cost = _cost(x_nominal, u_nominal, x_goal, Q, R, Qf, dt)
+    mu = mu_init
+    iterations = []
+    converged = False
+
+    for _ in range(max_iterations):
+        start = time.perf_counter()
+        Fx[:], Fu[:] = _rk4_linearization(dynamics, jacobians, x_nominal[:-1], u_nominal, dt)
+        linearized = time.perf_counter()
+
+        # Backward pass; mu regularizes Vxx (Tassa et al.) and is raised
+        # until every Quu is positive definite
+        lx = (x_nominal[:-1] - x_goal) @ Q_dt
+        lu = u_nominal @ R_dt
+        while True:
+            Vx = Qf @ (x_nominal[-1] - x_goal)
+            Vxx = Qf.copy()
+            expected = 0.0
+            for i in range(N - 1, -1, -1):
+                A, B = Fx[i], Fu[i]
+                A_T, B_T = A.T, B.T
+                Vxx_A = Vxx @ A
+                Vxx_B = Vxx @ B
+                Qx = lx[i] + A_T @ Vx
+                Qu = lu[i] + B_T @ Vx
+                Qxx = Q_dt + A_T @ Vxx_A
+                Quu = R_dt + B_T @ Vxx_B
+                Qux = B_T @ Vxx_A
+                # Same terms with Vxx + mu I
+                Quu_reg = Quu + mu * (B_T @ B)
+                Qux_reg = Qux + mu * (B_T @ A)
+                if m == 1:
+                    # Single input (every quickstart system): Quu is a scalar
+                    quu = Quu_reg[0, 0]
+                    if not quu > 0.0:
+                        break
+                    ki = Qu / -quu
+                    Ki = Qux_reg / -quu
+                else:
+                    try:
+                        np.linalg.cholesky(Quu_reg)
+                    except np.linalg.LinAlgError:
+                        break
+                    Quu_inv = np.linalg.inv(Quu_reg)
+                    ki = -Quu_inv @ Qu
+                    Ki = -Quu_inv @ Qux_reg
+                if u_limit is not None:
+                    # Box-constrained step: clamp the feedforward, and give
+                    # saturated controls no feedback
+                    target = u_nominal[i] + ki
+                    clamped = np.minimum(np.maximum(target, -u_limit), u_limit)
+                    Ki[clamped != target] = 0.0
+                    ki = clamped - u_nominal[i]
+                k[i], K[i] = ki, Ki
+                Quu_k = Quu @ ki
+                expected += ki @ Qu + 0.5 * ki @ Quu_k
+                Ki_T = Ki.T
+                Vx = Qx + Ki_T @ (Quu_k + Qu) + Qux.T @ ki
+                Ki_T_Qux = Ki_T @ Qux
+                Vxx = Qxx + Ki_T @ Quu @ Ki + Ki_T_Qux + Ki_T_Qux.T
+            else:
+                break
+            mu = max(mu * 10.0, 1e-6)
+        backward = time.perf_counter()
+
+        # Line search on the forward pass
+        accepted = False
+        for alpha in ALPHAS:
+            _rollout(dynamics, x0, u_nominal, x_nominal, k, K, alpha, dt, u_limit, x_trial, u_trial)
+            trial_cost = _cost(x_trial, u_trial, x_goal, Q, R, Qf, dt)
+            if np.isfinite(trial_cost) and cost - trial_cost > -1e-4 * alpha * expected:
+                accepted = True
+                break
+        forward = time.perf_counter()
+
+        if accepted:
+            x_nominal, x_trial = x_trial, x_nominal
+            u_nominal, u_trial = u_trial, u_nominal
+            change = (cost - trial_cost) / max(abs(cost), 1e-12)
+            cost = trial_cost
+            mu = max(mu / 10.0, 1e-9)
+        else:
+            mu *= 10.0
+        iterations.append(IterationStats(cost, alpha if accepted else 0.0, mu, linearized - start,
+                                         backward - linearized, forward - backward))
+        if accepted and change < tolerance:
+            converged = True
+            break
+        if mu > 1e10:
+            break
+
+    return ILQRResult(x_nominal, u_nominal, k, K, cost, converged, iterations)
+
+
+def warm_start(result, shift=0):
+    """
+    Initial controls for the next solve from a previous ILQRResult, shifted
+    by `shift` steps (receding horizon) and padded with the last control.
+    """
+    u = result.u[shift:]
+    return np.concatenate([u, np.repeat(u[-1:], shift, axis=0)])
+
+
+def tracking_controller(result, dt, fallback=None):
+    """
+    Closed-loop policy u = u_k + K_k (x - x_k) for simulate(), with
+    k = round(t / dt). After the horizon, fallback(t, state) is used if
+    given, otherwise the final gains keep tracking the final state.
+    """
+    N = len(result.u)
+
+    def controller(t, state):
+        i = int(round(t / dt))
+        if i >= N:
+            if fallback is not None:
+                return fallback(t, state)
+            i = N - 1
+        return result.u[i] + result.K[i] @ (state - result.x[i])
+    return controller
+
+
+###############################################################################
+#                                 PROBLEMS                                    #
+###############################################################################
+def pendulum_swingup(params=PENDULUM_PARAMS, T=5.0, dt=0.05, u_limit=3.0, u_init=None, **options):
+    """ Swing the pendulum from hanging (0) to upright (pi) with |u| <= u_limit. """
+    N = int(round(T / dt))
+    return ilqr(partial(pendulum_dynamics, params=params), partial(pendulum_jacobians, params=params),
+                np.zeros(2), np.zeros((N, 1)) if u_init is None else u_init, dt, np.array([np.pi, 0.0]),
+                Q=np.zeros((2, 2)), R=np.array([[0.01]]), Qf=np.diag([100.0, 10.0]),
+                u_limit=u_limit, **options)
+
+
+def acrobot_swingup(params=ACROBOT_PARAMS._replace(torque_limit=5.0), T=4.0, dt=0.05, u_init=None,
+                    **options):
+    """ Swing the acrobot from hanging (0, 0) to upright (pi, 0) within its torque limit. """
+    N = int(round(T / dt))
+    return ilqr(partial(acrobot_dynamics, params=params), partial(acrobot_jacobians, params=params),
+                np.zeros(4), np.zeros((N, 1)) if u_init is None else u_init, dt,
+                np.array([np.pi, 0.0, 0.0, 0.0]),
+                Q=np.zeros((4, 4)), R=np.array([[1.0]]), Qf=np.diag([100.0, 100.0, 10.0, 10.0]),
+                u_limit=params.torque_limit, **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="iLQR swing-up trajectory optimization.")
+    parser.add_argument("--system", choices=["pendulum", "acrobot"], default="pendulum")
+    args = parser.parse_args()
+
+    problem = pendulum_swingup if args.system == "pendulum" else acrobot_swingup
+    start = time.perf_counter()
+    result = problem()
+    elapsed = time.perf_counter() - start
+
+    # Re-solving from the previous solution converges almost immediately
+    start = time.perf_counter()
+    warm = problem(u_init=warm_start(result))
+    warm_elapsed = time.perf_counter() - start
+
+    print(f"{'iter':>4}{'cost':>14}{'alpha':>8}{'mu':>10}{'lin ms':>9}{'bwd ms':>9}{'fwd ms':>9}")
+    for i, it in enumerate(result.iterations):
+        print(f"{i:>4}{it.cost:>14.6g}{it.alpha:>8.3g}{it.mu:>10.2g}{it.linearize_time * 1e3:>9.2f}"
+              f"{it.backward_time * 1e3:>9.2f}{it.forward_time * 1e3:>9.2f}")
+    print(f"\n{len(result.iterations)} iterations in {elapsed * 1e3:.0f} ms, "
+          f"converged={result.converged}, final state {np.round(result.x[-1], 4)}")
+    print(f"Warm-started: {len(warm.iterations)} iterations in {warm_elapsed * 1e3:.0f} ms")
@@ -0,0 +1,118 @@
+"""
+Accuracy-vs-cost report: energy drift per dynamics evaluation.
+
+Runs the conservative versions (no damping, no input) of the pendulum,
+mass-spring and acrobot with every integrator over a range of time steps,
+and reports the worst absolute energy error against the number of dynamics
+evaluations spent. cheapest_integrator() picks the fewest evaluations that
+meet an energy-error budget.
+
+    python integrator_report.py [--T 100] [--budget 1e-3]
+"""
+import argparse
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+from dynamics import (ACROBOT_PARAMS, PENDULUM_PARAMS, SPRING_PARAMS, acrobot_dynamics,
+                      acrobot_energy, pendulum_dynamics, pendulum_energy, spring_dynamics,
+                      spring_energy)
+from integrators import (euler_step, leapfrog_step, rk4_step, semi_implicit_euler_step,
+                         velocity_verlet_step, yoshida4_step)
+
+ReportRow = namedtuple("ReportRow", ["system", "integrator", "dt", "evaluations", "energy_drift"])
+
+INTEGRATORS = {
+    "euler": euler_step,
+    "semi_implicit_euler": semi_implicit_euler_step,
+    "leapfrog": leapfrog_step,
+    "velocity_verlet": velocity_verlet_step,
+    "yoshida4": yoshida4_step,
+    "rk4": rk4_step,
+}
+
+# (dynamics, energy, x0) of the undamped, unforced systems
+SYSTEMS = {
+    "pendulum": (
+        partial(pendulum_dynamics, params=PENDULUM_PARAMS._replace(b=0.0)),
+        partial(pendulum_energy, params=PENDULUM_PARAMS),
+        np.array([np.pi / 2, 0.0]),
+    ),
+    "spring": (
+        partial(spring_dynamics, params=SPRING_PARAMS._replace(b=0.0)),
+        partial(spring_energy, params=SPRING_PARAMS),
+        np.array([1.0, 0.0]),
+    ),
+    "acrobot": (
+        partial(acrobot_dynamics, params=ACROBOT_PARAMS),
+        partial(acrobot_energy, params=ACROBOT_PARAMS),
+        np.array([np.pi / 2, 0.0, 0.0, 0.0]),
+    ),
+}
+
+
+def energy_drift(dynamics, energy, integrator, x0, dt, T):
+    """
+    Integrate an unforced system and measure its energy error.
+
+    Returns:
+        evaluations: Number of dynamics evaluations
+        drift: max |E(t) - E(0)| over the run (inf if the state blew up)
+    """
+    evaluations = 0
+
+    def counted(t, state, u):
+        nonlocal evaluations
+        evaluations += 1
+        return dynamics(t, state, u)
+
+    state = x0
+    E0 = energy(x0)
+    drift = 0.0
+    with np.errstate(all="ignore"):
+        for k in range(int(round(T / dt))):
+            state = integrator(counted, k * dt, state, 0.0, dt)
+            error = abs(energy(state) - E0)
+            if not np.isfinite(error):
+                return evaluations, np.inf
+            drift = max(drift, error)
+    return evaluations, drift
+
+
+def energy_report(T=100.0, dts=(0.1, 0.05, 0.02, 0.01), systems=SYSTEMS, integrators=INTEGRATORS):
+    """ Energy drift and cost for every (system, integrator, dt) combination. """
+    rows = []
+    for system_name, (dynamics, energy, x0) in systems.items():
+        for integrator_name, integrator in integrators.items():
+            for dt in dts:
+                evaluations, drift = energy_drift(dynamics, energy, integrator, x0, dt, T)
+                rows.append(ReportRow(system_name, integrator_name, dt, evaluations, drift))
+    return rows
+
+
+def cheapest_integrator(rows, system, budget):
+    """ The row with the fewest evaluations whose drift is within budget, or None. """
+    candidates = [row for row in rows if row.system == system and row.energy_drift <= budget]
+    return min(candidates, key=lambda row: row.evaluations, default=None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--T", type=float, default=100.0, help="Simulated time per run")
+    parser.add_argument("--budget", type=float, default=1e-3, help="Energy error budget [J]")
+    args = parser.parse_args()
+
+    rows = energy_report(T=args.T)
+    print(f"{'system':<10}{'integrator':<22}{'dt':>7}{'evals':>9}{'max |dE|':>12}{'dE/eval':>12}")
+    for row in rows:
+        print(f"{row.system:<10}{row.integrator:<22}{row.dt:>7.3g}{row.evaluations:>9d}"
+              f"{row.energy_drift:>12.3e}{row.energy_drift / row.evaluations:>12.3e}")
+
+    print(f"\nCheapest integrator within |dE| <= {args.budget:g} J:")
+    for system in SYSTEMS:
+        best = cheapest_integrator(rows, system, args.budget)
+        if best is None:
+            print(f"  {system:<10}none of the tested settings")
+        else:
+            print(f"  {system:<10}{best.integrator} at dt={best.dt:g} ({best.evaluations} evaluations)")
@@ -1,3 +1,5 @@
+from collections import namedtuple
+
 import numpy as np
 
 def euler_step(func, t, state, u, dt):
@@ -12,4 +14,406 @@ def rk4_step(func, t, state, u, dt):
     k2 = np.array(func(t + dt/2, state + k1/2, u)) * dt
     k3 = np.array(func(t + dt/2, state + k2/2, u)) * dt
     k4 = np.array(func(t + dt, state + k3, u)) * dt
-    return state + (k1 + 2*k2 + 2*k3 + k4) / 6
\ No newline at end of file
+    return state + (k1 + 2*k2 + 2*k3 + k4) / 6
+
+
+def euler_step_batch(func, t, states, controls, dt):
+    """
+    Implements one step of Euler integration for a batch of states.
+
+    Parameters:
+        func: Dynamics func(t, states, controls) returning an (N, state_dim) array
+        t: Current time
+        states: State array of shape (N, state_dim)
+        controls: Control array of shape (N, control_dim)
+        dt: Time step
+
+    Returns:
+        new_states: State array of shape (N, state_dim)
+    """
+    return states + np.asarray(func(t, states, controls)) * dt
+
+
+def rk4_step_batch(func, t, states, controls, dt):
+    """
+    Implements one step of RK4 integration for a batch of states.
+
+    Every row is advanced by the same vectorized stage evaluations, so the
+    cost is four calls to func regardless of N.
+
+    Parameters:
+        func: Dynamics func(t, states, controls) returning an (N, state_dim) array
+        t: Current time
+        states: State array of shape (N, state_dim)
+        controls: Control array of shape (N, control_dim)
+        dt: Time step
+
+    Returns:
+        new_states: State array of shape (N, state_dim)
+    """
+    half_dt = 0.5 * dt
+    k1 = np.asarray(func(t, states, controls))
+    k2 = np.asarray(func(t + half_dt, states + half_dt * k1, controls))
+    k3 = np.asarray(func(t + half_dt, states + half_dt * k2, controls))
+    k4 = np.asarray(func(t + dt, states + dt * k3, controls))
+    return states + (dt / 6) * (k1 + 2*k2 + 2*k3 + k4)
+
+
+def semi_implicit_euler_step(func, t, state, u, dt):
+    """
+    Implements one step of semi-implicit (symplectic) Euler integration.
+
+    The state is laid out as [q, qdot]; the velocity half is updated first
+    and the new velocity advances the position. Works for a single state
+    or an (N, state_dim) batch.
+    """
+    state = np.asarray(state, dtype=float)
+    n = state.shape[-1] // 2
+    derivative = np.asarray(func(t, state, u))
+    new_state = np.empty_like(state)
+    new_state[..., n:] = state[..., n:] + derivative[..., n:] * dt
+    new_state[..., :n] = state[..., :n] + new_state[..., n:] * dt
+    return new_state
+
+
+# Dormand–Prince 5(4) tableau. The 5th-order solution is propagated and the
+# embedded 4th-order one only provides the error estimate. The last stage is
+# evaluated at the new point, so it is reused as the first stage of the next
+# step (first same as last).
+_DP_C = np.array([0.0, 1/5, 3/10, 4/5, 8/9, 1.0])
+_DP_A = [
+    np.array([1/5]),
+    np.array([3/40, 9/40]),
+    np.array([44/45, -56/15, 32/9]),
+    np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+    np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+]
+_DP_B = np.array([35/384, 0.0, 500/1113, 125/192, -2187/6784, 11/84])
+_DP_E = np.array([71/57600, 0.0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40])
+
+# Continuous extension of Dormand–Prince: y(t + s*h) = y + h * sum_i k_i * (P @ [s, s^2, s^3, s^4])_i
+_DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423],
+])
+
+AdaptiveResult = namedtuple(
+    "AdaptiveResult", ["t", "x", "nfev", "accepted", "rejected", "t_event", "x_event", "event"],
+    defaults=(None, None, None),
+)
+
+
+def _rms(x):
+    return np.sqrt(np.mean(np.square(x)))
+
+
+def _initial_step(func, t, state, u, f0, rtol, atol):
+    """ Hairer's starting step size heuristic, one extra dynamics evaluation. """
+    scale = atol + rtol * np.abs(state)
+    d0 = _rms(state / scale)
+    d1 = _rms(f0 / scale)
+    h0 = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01 * d0 / d1
+    f1 = np.asarray(func(t + h0, state + h0 * f0, u))
+    d2 = _rms((f1 - f0) / scale) / h0
+    if max(d1, d2) <= 1e-15:
+        h1 = max(1e-6, h0 * 1e-3)
+    else:
+        h1 = (0.01 / max(d1, d2)) ** (1/5)
+    return min(100 * h0, h1)
+
+
+def locate_crossing(func, a, b, fa, fb, xtol=1e-12, max_iterations=100):
+    """
+    Sign change of a scalar func inside [a, b], with fa = func(a) and
+    fb = func(b) of opposite signs (or fb == 0).
+
+    Regula falsi with the Illinois modification, which keeps the
+    superlinear convergence of the secant method while always bracketing.
+
+    Returns:
+        b: The end of the final bracket past the crossing (func(b) has the
+           sign of the original fb or is 0), within xtol of the root
+    """
+    side = 0
+    for _ in range(max_iterations):
+        if fb == 0 or b - a <= xtol:
+            break
+        c = (a * fb - b * fa) / (fb - fa)
+        if not a < c < b:
+            c = 0.5 * (a + b)
+        fc = func(c)
+        if fc == 0 or (fc > 0) == (fb > 0):
+            b, fb = c, fc
+            if side == -1:
+                fa *= 0.5
+            side = -1
+        else:
+            a, fa = c, fc
+            if side == 1:
+                fb *= 0.5
+            side = 1
+    return b
+
+
+def rk45_solve(func, t0, state, u, T, t_eval=None, rtol=1e-6, atol=1e-9,
+               dt0=None, max_step=np.inf, events=None, event_tol=1e-12):
+    """
+    Integrates from t0 to t0 + T with the adaptive Dormand–Prince RK45 method.
+
+    The step size is chosen from the embedded error estimate so that each
+    component stays within atol + rtol * |x|. Output is sampled at t_eval by
+    dense (4th-order) interpolation inside accepted steps, so display times
+    never force the solver to take small steps.
+
+    With events, integration stops at the first zero crossing of any entry
+    of events(t, state). Crossings are detected by a sign change over an
+    accepted step (two crossings within one step go unnoticed, so bound
+    max_step if guards can oscillate) and located on the dense output, so
+    landing on a switching surface does not need small steps either.
+
+    Parameters:
+        func: Dynamics func(t, state, u), same signature as for rk4_step
+        t0: Initial time
+        state: Initial state (any shape, e.g. (state_dim,) or (N, state_dim))
+        u: Control input, held constant over the whole interval
+        T: Length of the interval
+        t_eval: Times at which to sample the solution (defaults to [t0 + T])
+        rtol, atol: Relative and absolute error tolerances
+        dt0: Initial step size (chosen automatically if None)
+        max_step: Upper bound on the step size
+        events: Optional guard function events(t, state) returning a scalar
+                or an array; entries that start at exactly 0 are ignored
+        event_tol: Time tolerance of the located crossing
+
+    Returns:
+        AdaptiveResult
+            t: Sample times, shape (len(t_eval),), cut at the event if any
+            x: Sampled states, shape (len(t),) + state.shape
+            nfev: Number of dynamics evaluations
+            accepted: Number of accepted steps
+            rejected: Number of rejected steps
+            t_event, x_event: Time and state just past the crossing (None
+                              without an event)
+            event: Index of the guard entry that crossed
+    """
+    t_end = t0 + T
+    state = np.asarray(state, dtype=float)
+    t_eval = np.array([t_end]) if t_eval is None else np.asarray(t_eval, dtype=float)
+    out = np.empty((len(t_eval),) + state.shape)
+    k = np.empty((7,) + state.shape)
+
+    k[0] = func(t0, state, u)
+    nfev = 1
+    if dt0 is None:
+        dt0 = _initial_step(func, t0, state, u, k[0], rtol, atol)
+        nfev += 1
+    h = min(dt0, max_step)
+    accepted = rejected = 0
+
+    t = t0
+    i_eval = np.searchsorted(t_eval, t0)
+    out[:i_eval] = state
+    if events is not None:
+        guard = np.atleast_1d(np.asarray(events(t0, state), dtype=float))
+    while t < t_end:
+        h = min(h, t_end - t)
+
+        # Stages 2-6, then the 5th-order solution and FSAL stage 7
+        for s, a in enumerate(_DP_A, start=1):
+            k[s] = func(t + _DP_C[s] * h, state + h * np.tensordot(a, k[:s], axes=1), u)
+        new_state = state + h * np.tensordot(_DP_B, k[:6], axes=1)
+        k[6] = func(t + h, new_state, u)
+        nfev += 6
+
+        scale = atol + rtol * np.maximum(np.abs(state), np.abs(new_state))
+        error = _rms(h * np.tensordot(_DP_E, k, axes=1) / scale)
+
+        if error <= 1.0:
+            t_new = t + h
+            if events is not None:
+                new_guard = np.atleast_1d(np.asarray(events(t_new, new_state), dtype=float))
+                crossed = np.flatnonzero((guard != 0) & (np.sign(new_guard) != np.sign(guard)))
+                if len(crossed):
+                    def dense(s):
+                        weights = np.cumprod(np.full(4, s)) @ _DP_P.T
+                        return state + h * np.tensordot(weights, k, axes=1)
+
+                    def crossing(i):
+                        def g(s):
+                            return np.atleast_1d(events(t + s * h, dense(s)))[i]
+                        return locate_crossing(g, 0.0, 1.0, guard[i], new_guard[i], event_tol / h)
+
+                    s_event, event = min((crossing(i), i) for i in crossed)
+                    t_new = t + s_event * h
+                    new_state = dense(s_event)
+
+            i_next = np.searchsorted(t_eval, t_new, side="right")
+            if i_next > i_eval:
+                s = (t_eval[i_eval:i_next] - t) / h
+                powers = np.cumprod(np.repeat(s[:, None], 4, axis=1), axis=1)
+                weights = powers @ _DP_P.T
+                out[i_eval:i_next] = state + h * np.tensordot(weights, k, axes=1)
+                i_eval = i_next
+
+            if events is not None and len(crossed):
+                accepted += 1
+                return AdaptiveResult(t_eval[:i_eval], out[:i_eval], nfev, accepted, rejected,
+                                      t_new, new_state, int(event))
+            if events is not None:
+                guard = new_guard
+            t = t_new
+            state = new_state
+            k[0] = k[6]
+            accepted += 1
+            factor = 10.0 if error == 0 else min(10.0, 0.9 * error ** -0.2)
+        else:
+            rejected += 1
+            factor = max(0.2, 0.9 * error ** -0.2)
+        h = min(h * factor, max_step)
+
+    out[i_eval:] = state
+    return AdaptiveResult(t_eval, out, nfev, accepted, rejected)
+
+
+def rk45_step(func, t, state, u, dt, rtol=1e-6, atol=1e-9):
+    """
+    Adaptive RK45 over one control interval, for use wherever a fixed-step
+    integrator(func, t, state, u, dt) is expected (e.g. simulation.simulate).
+    """
+    return rk45_solve(func, t, state, u, dt, rtol=rtol, atol=atol).x[-1]
+
+
+###############################################################################
+#                     SYMPLECTIC (q, qdot) INTEGRATORS                        #
+###############################################################################
+# These take a state laid out as [q, qdot] (last axis, so batches work) and
+# only use the acceleration half of func. They are symplectic and
+# time-reversible when the acceleration depends on q alone (pendulum and
+# spring without damping), so the energy error stays bounded instead of
+# drifting. With damping or velocity-dependent terms such as the acrobot's
+# Coriolis forces the acceleration is evaluated with a lagged velocity and
+# they degrade to first order; integrator_report.py compares them with RK4.
+
+def leapfrog_step(func, t, state, u, dt):
+    """
+    Implements one drift-kick-drift leapfrog step (1 dynamics evaluation).
+    """
+    state = np.asarray(state, dtype=float)
+    n = state.shape[-1] // 2
+    mid = state.copy()
+    mid[..., :n] += 0.5 * dt * state[..., n:]
+    acceleration = np.asarray(func(t + dt/2, mid, u))[..., n:]
+    new_state = np.empty_like(state)
+    new_state[..., n:] = state[..., n:] + dt * acceleration
+    new_state[..., :n] = mid[..., :n] + 0.5 * dt * new_state[..., n:]
+    return new_state
+
+
+def velocity_verlet_step(func, t, state, u, dt):
+    """
+    Implements one kick-drift-kick velocity Verlet step (2 dynamics evaluations).
+    """
+    state = np.asarray(state, dtype=float)
+    n = state.shape[-1] // 2
+    new_state = state.copy()
+    new_state[..., n:] += 0.5 * dt * np.asarray(func(t, state, u))[..., n:]
+    new_state[..., :n] += dt * new_state[..., n:]
+    new_state[..., n:] += 0.5 * dt * np.asarray(func(t + dt, new_state, u))[..., n:]
+    return new_state
+
+
+# Yoshida's 4th-order composition weights: w1, w0, w1 with 2*w1 + w0 = 1
+_YOSHIDA_W1 = 1.0 / (2.0 - 2.0 ** (1/3))
+_YOSHIDA_W0 = 1.0 - 2.0 * _YOSHIDA_W1
+
+
+def yoshida4_step(func, t, state, u, dt):
+    """
+    Implements one 4th-order Yoshida step as three leapfrog substeps of
+    w1*dt, w0*dt, w1*dt (3 dynamics evaluations).
+    """
+    state = leapfrog_step(func, t, state, u, _YOSHIDA_W1 * dt)
+    state = leapfrog_step(func, t + _YOSHIDA_W1 * dt, state, u, _YOSHIDA_W0 * dt)
+    return leapfrog_step(func, t + (_YOSHIDA_W1 + _YOSHIDA_W0) * dt, state, u, _YOSHIDA_W1 * dt)
+
+
+###############################################################################
+#                         IN-PLACE (WORKSPACE) STEPPING                       #
+###############################################################################
+# Steppers for in-place dynamics func(t, state, u, out) (see the *_into
+# functions in dynamics.py). All stage buffers live on the workspace, so
+# step(x, u, dt, out) allocates no arrays; out may be x itself or a row of a
+# preallocated history. The workspace keeps its own time t, advanced by dt
+# on every step.
+class EulerWorkspace:
+    """
+    Explicit Euler with one preallocated derivative buffer.
+
+    Parameters:
+        func: In-place dynamics func(t, state, u, out)
+        shape: State shape, (state_dim,) or (N, state_dim)
+        t: Initial time
+    """
+
+    def __init__(self, func, shape, t=0.0):
+        self.func = func
+        self.t = t
+        self.derivative = np.empty(shape)
+
+    def step(self, x, u, dt, out):
+        self.func(self.t, x, u, self.derivative)
+        self.derivative *= dt
+        np.add(x, self.derivative, out=out)
+        self.t += dt
+        return out
+
+
+class RK4Workspace:
+    """
+    Classic RK4 with preallocated stage buffers; same result as rk4_step.
+
+    Parameters:
+        func: In-place dynamics func(t, state, u, out)
+        shape: State shape, (state_dim,) or (N, state_dim)
+        t: Initial time
+    """
+
+    def __init__(self, func, shape, t=0.0):
+        self.func = func
+        self.t = t
+        self.k1 = np.empty(shape)
+        self.k2 = np.empty(shape)
+        self.k3 = np.empty(shape)
+        self.k4 = np.empty(shape)
+        self.stage = np.empty(shape)
+
+    def step(self, x, u, dt, out):
+        func, t, stage = self.func, self.t, self.stage
+        k1, k2, k3, k4 = self.k1, self.k2, self.k3, self.k4
+        half_dt = 0.5 * dt
+
+        func(t, x, u, k1)
+        np.multiply(k1, half_dt, out=stage)
+        stage += x
+        func(t + half_dt, stage, u, k2)
+        np.multiply(k2, half_dt, out=stage)
+        stage += x
+        func(t + half_dt, stage, u, k3)
+        np.multiply(k3, dt, out=stage)
+        stage += x
+        func(t + dt, stage, u, k4)
+
+        # out = x + dt/6 * (k1 + 2 k2 + 2 k3 + k4), accumulated in k2
+        k2 += k3
+        k2 *= 2.0
+        k2 += k1
+        k2 += k4
+        k2 *= dt / 6
+        np.add(x, k2, out=out)
+        self.t = t + dt
+        return out
@@ -0,0 +1,140 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from cache import LRUCache, fingerprint, runtime_state
+
+# (Ad, Bd) pairs keyed on the content of (A, B, dt)
+_zoh_cache = LRUCache(maxsize=256)
+
+# Fast path for zoh_step: raw bytes and shapes of (A, B) plus dt -> (Ad, Bd),
+# cheaper to key than a fingerprint and bounded to the most recent systems
+_zoh_step_cache = runtime_state(OrderedDict())
+_ZOH_STEP_CACHE_SIZE = 64
+
+
+class LinearSystem(namedtuple("LinearSystem", ["A", "B"])):
+    """
+    Continuous-time linear system x' = A x + B u.
+
+    Callable with the usual dynamics signature, so it also works with the
+    generic integrators; with zoh_step it is stepped exactly.
+    """
+    __slots__ = ()
+
+    def __call__(self, t, state, u):
+        state = np.asarray(state)
+        return state @ self.A.T + _as_input(u, state) @ self.B.T
+
+
+def _as_input(u, state):
+    """ Bring u to shape (m,) for one state or (N, m) for a batch. """
+    u = np.asarray(u, dtype=float)
+    if u.ndim < state.ndim:
+        u = u[..., None]
+    return u
+
+
+def zoh_discretize(A, B, dt):
+    """
+    Exact zero-order-hold discretization of x' = A x + B u.
+
+    Uses the matrix exponential of the augmented matrix
+        expm([[A, B], [0, 0]] * dt) = [[Ad, Bd], [0, I]]
+    so x[k+1] = Ad x[k] + Bd u[k] holds exactly for inputs held constant
+    over each step. Results are cached on the content of (A, B, dt).
+
+    Parameters:
+        A: System matrix (n x n)
+        B: Control matrix (n x m)
+        dt: Time step
+
+    Returns:
+        Ad: Discrete system matrix (n x n)
+        Bd: Discrete control matrix (n x m)
+    """
+    A = np.asarray(A, dtype=float)
+    B = np.asarray(B, dtype=float)
+    key = fingerprint(A, B, np.float64(dt))
+    cached = _zoh_cache.get(key)
+    if cached is not None:
+        return cached
+
+    n, m = B.shape
+    augmented = np.zeros((n + m, n + m))
+    augmented[:n, :n] = A
+    augmented[:n, n:] = B
+    import scipy.linalg  # only on a cache miss, so importing linear stays cheap
+    transition = scipy.linalg.expm(augmented * dt)
+    Ad = transition[:n, :n]
+    Bd = transition[:n, n:]
+    _zoh_cache.put(key, (Ad, Bd))
+    return Ad, Bd
+
+
+def zoh_step(system, t, state, u, dt):
+    """
+    Exact one-step update of a LinearSystem, with the integrator signature
+    used by simulation.simulate.
+
+    After the first call for a given (A, B, dt) this is one matvec (or one
+    matmul for an (N, n) batch) with no truncation error, so dt is limited
+    only by the control rate, not by stability or accuracy.
+    """
+    A = np.asarray(system.A, dtype=float)
+    B = np.asarray(system.B, dtype=float)
+    key = (A.shape, B.shape, A.tobytes(), B.tobytes(), float(dt))
+    entry = _zoh_step_cache.get(key)
+    if entry is None:
+        entry = _zoh_step_cache[key] = zoh_discretize(A, B, dt)
+        if len(_zoh_step_cache) > _ZOH_STEP_CACHE_SIZE:
+            _zoh_step_cache.popitem(last=False)
+    else:
+        _zoh_step_cache.move_to_end(key)
+    Ad, Bd = entry
+    state = np.asarray(state)
+    return state @ Ad.T + _as_input(u, state) @ Bd.T
+
+
+def zoh_rollout(A, B, dt, x0, controls):
+    """
+    Roll a linear model forward over a control sequence (e.g. a linearized
+    model inside a controller).
+
+    Parameters:
+        A, B: Continuous-time system and control matrices
+        dt: Time step
+        x0: Initial state, shape (n,) or (N, n)
+        controls: Inputs, shape (num_steps, m) or (num_steps, N, m)
+
+    Returns:
+        states: Shape (num_steps + 1,) + x0.shape
+    """
+    Ad, Bd = zoh_discretize(A, B, dt)
+    x0 = np.asarray(x0, dtype=float)
+    controls = np.asarray(controls, dtype=float)
+    states = np.empty((len(controls) + 1,) + x0.shape)
+    states[0] = x0
+    # Input contributions for all steps in one matmul, then the recursion
+    forced = controls @ Bd.T
+    for k in range(len(controls)):
+        states[k + 1] = states[k] @ Ad.T + forced[k]
+    return states
+
+
+def spring_linear_system(m, k, b):
+    """ Mass-spring-damper m x'' = u - k x - b x' as a LinearSystem. """
+    A = np.array([[0.0, 1.0],
+                  [-k / m, -b / m]])
+    B = np.array([[0.0],
+                  [1.0 / m]])
+    return LinearSystem(A, B)
+
+
+def double_integrator_linear_system():
+    """ Double integrator q'' = u as a LinearSystem. """
+    A = np.array([[0.0, 1.0],
+                  [0.0, 0.0]])
+    B = np.array([[0.0],
+                  [1.0]])
+    return LinearSystem(A, B)
@@ -0,0 +1,231 @@
+"""
+System model objects.
+
+A model bundles one of the dynamics in dynamics.py with its parameters, so
+several systems with different physical constants can live side by side
+in one process. Models are callable with the usual dynamics signature
+model(t, state, u) and work with every integrator.
+
+Parameters are stored structure-of-arrays: each field of the parameter
+namedtuple is either a float shared by all environments or an (N,) array
+with one value per environment. A model with per-environment arrays steps
+a batch of N states, each row with its own masses and lengths, in a single
+vectorized pass:
+
+    acrobots = Acrobot.randomized(10_000, m1=(0.8, 1.2), L1=(0.4, 0.6), seed=0)
+    states = rk4_step_batch(acrobots, t, states, u, dt)
+
+    python models.py [--envs 10000] [--spread 0.1]
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from dynamics import (ACROBOT_PARAMS, PENDULUM_PARAMS, SPRING_PARAMS, AcrobotParams,
+                      PendulumParams, SpringParams, acrobot_dynamics, acrobot_dynamics_into,
+                      acrobot_energy, acrobot_jacobians, double_integrator_dynamics,
+                      double_integrator_dynamics_into, double_integrator_jacobians,
+                      pendulum_dynamics, pendulum_dynamics_into, pendulum_energy,
+                      pendulum_jacobians, spring_dynamics, spring_dynamics_into,
+                      spring_energy, spring_jacobians)
+
+
+class Model:
+    """
+    Base class: a parameter namedtuple plus the functions it is passed to.
+
+    Subclasses set Params (the namedtuple type), DEFAULTS, state_dim and the
+    _dynamics, _dynamics_into, _jacobians and _energy functions, each taking
+    params as its last argument.
+
+    Parameters:
+        params: Parameter namedtuple to start from (defaults to DEFAULTS)
+        **overrides: Field values replacing those of params; each a number
+                     or a sequence of one value per environment
+    """
+    __slots__ = ("params", "num_envs")
+
+    Params = None
+    DEFAULTS = None
+    state_dim = None
+
+    def __init__(self, params=None, **overrides):
+        params = (self.DEFAULTS if params is None else params)._replace(**overrides)
+        fields = []
+        num_envs = None
+        for name, value in zip(params._fields, params):
+            value = np.asarray(value, dtype=float)
+            if value.ndim == 0:
+                fields.append(float(value))
+                continue
+            if value.ndim != 1 or (num_envs is not None and len(value) != num_envs):
+                raise ValueError(f"{type(self).__name__}.{name} must be a number or one value per "
+                                 f"environment, got shape {value.shape}")
+            num_envs = len(value)
+            fields.append(value)
+        self.params = self.Params(*fields)
+        self.num_envs = num_envs  # None when every field is a shared float
+
+    @classmethod
+    def randomized(cls, num_envs, params=None, seed=None, **ranges):
+        """
+        Model of num_envs environments with uniformly randomized parameters.
+
+        Parameters:
+            num_envs: Number of environments
+            params: Nominal parameters for the fields not randomized
+            seed: Seed or numpy Generator
+            **ranges: Field name -> (low, high) sampling range
+
+        Returns:
+            Model whose randomized fields are (num_envs,) arrays
+        """
+        rng = np.random.default_rng(seed)
+        samples = {name: rng.uniform(low, high, num_envs) for name, (low, high) in ranges.items()}
+        model = cls(params, **samples)
+        model.num_envs = num_envs
+        return model
+
+    def __getitem__(self, index):
+        """ Model for a subset of environments (an int gives a single system). """
+        if self.num_envs is None:
+            raise IndexError(f"{type(self).__name__} has shared parameters only")
+        return type(self)(self.Params(*(value[index] if isinstance(value, np.ndarray) else value
+                                        for value in self.params)))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value if isinstance(value, float) else f'<{len(value)} values>'}"
+                           for name, value in zip(self.params._fields, self.params))
+        return f"{type(self).__name__}({fields})"
+
+    def _check(self, state):
+        if self.num_envs is not None and np.shape(state)[:-1] != (self.num_envs,):
+            raise ValueError(f"{type(self).__name__} has {self.num_envs} environments, "
+                             f"expected states of shape ({self.num_envs}, {self.state_dim}), "
+                             f"got {np.shape(state)}")
+
+    def dynamics(self, t, state, u):
+        """ State derivative, see the dynamics.py function of this model. """
+        self._check(state)
+        return self._dynamics(t, state, u, self.params)
+
+    __call__ = dynamics
+
+    def dynamics_into(self, t, state, u, out):
+        """ In-place dynamics for the integrator workspaces. """
+        self._check(state)
+        return self._dynamics_into(t, state, u, out, self.params)
+
+    def jacobians(self, state, u):
+        """ Closed-form (A, B) at the given states and inputs. """
+        self._check(state)
+        return self._jacobians(state, u, self.params)
+
+    def energy(self, state):
+        """ Total energy of each state. """
+        self._check(state)
+        return self._energy(state, self.params)
+
+
+class Pendulum(Model):
+    """ Damped pendulum, state [theta, omega], torque input. """
+    __slots__ = ()
+    Params = PendulumParams
+    DEFAULTS = PENDULUM_PARAMS
+    state_dim = 2
+    _dynamics = staticmethod(pendulum_dynamics)
+    _dynamics_into = staticmethod(pendulum_dynamics_into)
+    _jacobians = staticmethod(pendulum_jacobians)
+    _energy = staticmethod(pendulum_energy)
+
+
+class MassSpring(Model):
+    """ Damped mass-spring, state [x, v], force input. """
+    __slots__ = ()
+    Params = SpringParams
+    DEFAULTS = SPRING_PARAMS
+    state_dim = 2
+    _dynamics = staticmethod(spring_dynamics)
+    _dynamics_into = staticmethod(spring_dynamics_into)
+    _jacobians = staticmethod(spring_jacobians)
+    _energy = staticmethod(spring_energy)
+
+
+class Acrobot(Model):
+    """ Acrobot, state [theta1, theta2, omega1, omega2], torque at joint 2. """
+    __slots__ = ()
+    Params = AcrobotParams
+    DEFAULTS = ACROBOT_PARAMS
+    state_dim = 4
+    _dynamics = staticmethod(acrobot_dynamics)
+    _dynamics_into = staticmethod(acrobot_dynamics_into)
+    _jacobians = staticmethod(acrobot_jacobians)
+    _energy = staticmethod(acrobot_energy)
+
+
+class DoubleIntegrator(Model):
+    """ Double integrator q'' = u, state [q, q_dot]; it has no parameters. """
+    __slots__ = ()
+    Params = namedtuple("DoubleIntegratorParams", [])
+    DEFAULTS = Params()
+    state_dim = 2
+
+    @staticmethod
+    def _dynamics(t, state, u, params):
+        return double_integrator_dynamics(t, state, u)
+
+    @staticmethod
+    def _dynamics_into(t, state, u, out, params):
+        return double_integrator_dynamics_into(t, state, u, out)
+
+    @staticmethod
+    def _jacobians(state, u, params):
+        return double_integrator_jacobians(state, u)
+
+    @staticmethod
+    def _energy(state, params):
+        # Kinetic energy per unit mass
+        return 0.5 * np.asarray(state)[..., 1]**2
+
+
+if __name__ == "__main__":
+    from controllers import acrobot_linearized_matrices, lqr_solve
+    from integrators import rk4_step_batch
+
+    parser = argparse.ArgumentParser(
+        description="Nominal acrobot LQR on a batch of acrobots with randomized parameters.")
+    parser.add_argument("--envs", type=int, default=10_000)
+    parser.add_argument("--spread", type=float, default=0.1,
+                        help="Masses, inertias and lengths vary by +/- this fraction")
+    parser.add_argument("--T", type=float, default=5.0)
+    parser.add_argument("--dt", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nominal = ACROBOT_PARAMS._replace(torque_limit=np.inf)
+    ranges = {name: (value * (1 - args.spread), value * (1 + args.spread))
+              for name, value in nominal._asdict().items() if name not in ("g", "torque_limit")}
+    acrobots = Acrobot.randomized(args.envs, nominal, seed=args.seed, **ranges)
+
+    A, B = acrobot_linearized_matrices(*nominal[:7])
+    K, _ = lqr_solve(A, B, np.diag([10.0, 10.0, 1.0, 1.0]), np.array([[1.0]]))
+    upright = np.array([np.pi, 0.0, 0.0, 0.0])
+    x = np.tile(upright + [0.05, 0.0, 0.0, 0.0], (args.envs, 1))
+
+    num_steps = int(round(args.T / args.dt))
+    start = time.perf_counter()
+    with np.errstate(all="ignore"):
+        for k in range(num_steps):
+            x = rk4_step_batch(acrobots, k * args.dt, x, -(x - upright) @ K.T, args.dt)
+    elapsed = time.perf_counter() - start
+
+    balanced = np.linalg.norm(x - upright, axis=1) < 1e-2
+    print(f"{args.envs} acrobots x {num_steps} steps in {elapsed:.2f} s "
+          f"({args.envs * num_steps / elapsed:.3g} env-steps/s)")
+    print(f"Nominal LQR balances {balanced.mean():.1%} of the randomized acrobots")
+    for name in ranges:
+        values = getattr(acrobots.params, name)
+        print(f"  {name}: balanced mean {values[balanced].mean():.3f}, "
+              f"failed mean {values[~balanced].mean() if (~balanced).any() else float('nan'):.3f}")
@@ -1,8 +1,10 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from controllers import energy_controller_pendulum
+from functools import partial
+from controllers import energy_controller_pendulum, saturate, switching_controller
+from dynamics import PendulumParams, pendulum_dynamics
 from integrators import euler_step
+from simulation import simulate
+from viewer import show_pendulum
 
 # Constants
 dt = 0.01  # Time step (smaller for faster simulation)
@@ -27,57 +29,29 @@ E_desired = m * g * L
 theta = np.pi / 16
 angular_velocity = 0.0
 
-# Setup animation
-fig, ax = plt.subplots()
-ax.set_xlim(-1.5, 1.5)
-ax.set_ylim(-1.5, 1.5)
+# Pendulum dynamics for the integrator
+dynamics = partial(pendulum_dynamics, params=PendulumParams(m, L, g, b))
 
-# Pendulum representation
-bob, = plt.plot([], [], 'bo', markersize=14)  # Bob
-rod, = plt.plot([], [], 'k-', lw=2)  # Rod
+# Each piece works on one state or an (N, 2) batch of states
+def swing_up(t, state):
+    """ Energy-based control for swing-up """
+    return energy_controller_pendulum(m, L, state[..., 1], g, state[..., 0], E_desired, k)
 
-def init():
-    """ Initialize animation """
-    bob.set_data([], [])
-    rod.set_data([], [])
-    return rod, bob
+def stabilize(t, state):
+    """ Gravity-compensated PD near upright """
+    theta, angular_velocity = state[..., 0], state[..., 1]
+    return m*g*L*np.sin(theta) - Kp * (theta - theta_target) - Kd * angular_velocity
 
-def update(frame):
-    """ Swing-up and stabilize pendulum """
-    global theta, angular_velocity
+def near_target(t, state):
+    return np.abs(state[..., 0] - theta_target) <= 0.2
 
-    # Control Strategy: Use energy-based control for swing-up, then PD for stabilization
-    if abs(theta - theta_target) > 0.2:  # Swing-up mode (far from upright)
-        u = energy_controller_pendulum(m, L, angular_velocity, g, theta, E_desired, k)  # Energy injection control
-    else:  # Stabilization mode (near upright)
-        u = m*g*L*np.sin(theta) - Kp * (theta - theta_target) - Kd * angular_velocity  # PD control
-    
-    # Apply torque limits
-    u = np.clip(u, -torque_limit, torque_limit)
+# Swing-up and stabilize pendulum, switching per state instead of with an if
+switched = switching_controller(near_target, stabilize, swing_up)
 
-    # Define pendulum dynamics function for the integrator
-    def pendulum_dynamics(t, state, u):
-        theta, omega = state
-        angular_acceleration = (u - b * omega - m * g * L * np.sin(theta)) / (m * L**2)
-        return [omega, angular_acceleration]
-    
-    # Use euler_step from integrators module
-    state = np.array([theta, angular_velocity])
-    new_state = euler_step(pendulum_dynamics, 0, state, u, dt)
-    theta, angular_velocity = new_state
+def controller(t, state):
+    return saturate(switched(t, state), torque_limit)
 
-    # Compute new bob position
-    x = L * np.sin(theta)
-    y = -L * np.cos(theta)
+# Use euler_step from integrators module
+result = simulate(dynamics, controller, euler_step, [theta, angular_velocity], dt, T)
 
-    # Update visualization
-    bob.set_data(x, y)
-    rod.set_data([0, x], [0, y])
-
-    return rod, bob
-
-# Create animation
-ani = animation.FuncAnimation(fig, update, frames=int(T/dt), init_func=init, interval=dt*1000, blit=True)
-
-plt.title("Energy-Based Swing-Up + PD Stabilization")
-plt.show()
+show_pendulum(result, L, title="Energy-Based Swing-Up + PD Stabilization")
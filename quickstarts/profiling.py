@@ -0,0 +1,135 @@
+import json
+import time
+
+import numpy as np
+
+# Stages instrumented by simulation.simulate and viewer.replay. "integrator"
+# is inclusive of the "dynamics" calls it makes; summary() also reports the
+# integrator's own overhead with dynamics subtracted.
+STAGES = ("controller", "dynamics", "integrator", "recorder", "render", "step")
+
+# Latency histograms use power-of-two nanosecond buckets: bucket b holds
+# samples with 2**(b-1) <= ns < 2**b
+NUM_BUCKETS = 64
+
+
+class Profiler:
+    """
+    Low-overhead per-stage counters, monotonic-clock timings and latency
+    histograms for the simulation loop.
+
+    Each record() is a handful of integer operations on preallocated lists,
+    and the "step" stage holds the end-to-end per-step latency. Pass
+    enabled=False (or no profiler at all) to skip every clock read.
+
+    Parameters:
+        enabled: Whether instrumented loops should time anything
+        trace: Also keep individual (stage, start, duration) events for
+               export as a Chrome trace (chrome://tracing / Perfetto)
+        max_trace_events: Cap on stored trace events
+    """
+
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, enabled=True, trace=False, max_trace_events=1_000_000):
+        self.enabled = enabled
+        self.trace = trace
+        self.max_trace_events = max_trace_events
+        self.reset()
+
+    def reset(self):
+        self.counts = {stage: 0 for stage in STAGES}
+        self.total_ns = {stage: 0 for stage in STAGES}
+        self.max_ns = {stage: 0 for stage in STAGES}
+        self.histograms = {stage: [0] * NUM_BUCKETS for stage in STAGES}
+        self.events = []
+
+    def record(self, stage, start_ns, end_ns):
+        """ Account one timed interval of a stage. """
+        elapsed = end_ns - start_ns
+        self.counts[stage] += 1
+        self.total_ns[stage] += elapsed
+        if elapsed > self.max_ns[stage]:
+            self.max_ns[stage] = elapsed
+        self.histograms[stage][min(elapsed.bit_length(), NUM_BUCKETS - 1)] += 1
+        if self.trace and len(self.events) < self.max_trace_events:
+            self.events.append((stage, start_ns, elapsed))
+
+    def wrap(self, stage, func):
+        """ Return func timed under stage (func itself when disabled). """
+        if not self.enabled:
+            return func
+        clock = self.clock
+        record = self.record
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            record(stage, start, clock())
+            return result
+        return timed
+
+    def percentile_ns(self, stage, q):
+        """ Approximate q-th percentile (0-100) from the histogram (bucket upper edge). """
+        histogram = np.asarray(self.histograms[stage])
+        total = histogram.sum()
+        if total == 0:
+            return 0
+        bucket = int(np.searchsorted(np.cumsum(histogram), q / 100 * total))
+        return min(2 ** bucket, self.max_ns[stage])
+
+    def to_dict(self):
+        """ Counters, timings and histograms as plain JSON-serializable data. """
+        stages = {}
+        for stage in STAGES:
+            count = self.counts[stage]
+            if count == 0:
+                continue
+            stages[stage] = {
+                "count": count,
+                "total_ns": self.total_ns[stage],
+                "mean_ns": self.total_ns[stage] / count,
+                "max_ns": self.max_ns[stage],
+                "p50_ns": self.percentile_ns(stage, 50),
+                "p99_ns": self.percentile_ns(stage, 99),
+                "histogram_log2_ns": self.histograms[stage],
+            }
+        return {"stages": stages}
+
+    def summary(self):
+        """ Human-readable table of where the time went. """
+        step_total = self.total_ns["step"] or sum(self.total_ns.values()) or 1
+        lines = [f"{'stage':<14}{'count':>10}{'total ms':>12}{'mean us':>10}"
+                 f"{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'share':>8}"]
+        for stage in STAGES:
+            count = self.counts[stage]
+            if count == 0:
+                continue
+            total = self.total_ns[stage]
+            lines.append(
+                f"{stage:<14}{count:>10}{total / 1e6:>12.2f}{total / count / 1e3:>10.2f}"
+                f"{self.percentile_ns(stage, 50) / 1e3:>10.2f}"
+                f"{self.percentile_ns(stage, 99) / 1e3:>10.2f}"
+                f"{self.max_ns[stage] / 1e3:>10.2f}{total / step_total:>8.1%}"
+            )
+        if self.counts["integrator"] and self.counts["dynamics"]:
+            overhead = self.total_ns["integrator"] - self.total_ns["dynamics"]
+            lines.append(f"integrator overhead excluding dynamics: {overhead / 1e6:.2f} ms "
+                         f"({overhead / step_total:.1%})")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """
+        Write the profile as JSON. With trace=True the file is also a valid
+        Chrome trace ("traceEvents", microsecond timestamps).
+        """
+        data = self.to_dict()
+        if self.trace:
+            origin = self.events[0][1] if self.events else 0
+            data["traceEvents"] = [
+                {"name": stage, "ph": "X", "pid": 0, "tid": 0,
+                 "ts": (start - origin) / 1e3, "dur": elapsed / 1e3}
+                for stage, start, elapsed in self.events
+            ]
+        with open(path, "w") as f:
+            json.dump(data, f)
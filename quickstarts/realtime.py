@@ -0,0 +1,368 @@
+"""
+Real-time fixed-rate execution of a controller against a simulated plant.
+
+simulate() runs as fast as it can and the matplotlib animation interval is
+only a request to the GUI timer. run_realtime() instead releases every
+control cycle on a monotonic-clock schedule, as the loop on a real rig
+would, and measures how well the schedule was kept:
+
+    jitter   wake-up time minus the scheduled release of the cycle
+    compute  time from wake-up until the input is applied
+    overrun  a cycle that finished after its deadline (the next release);
+             the releases it ran into are skipped rather than replayed in
+             a burst, and the plant keeps the previous input meanwhile
+
+Execution modes:
+
+    inline   controller and plant in one loop, the plant integrating one
+             control period per cycle
+    thread   the plant runs in its own thread at plant_rate and the
+             control loop reads the latest state sample from it
+    process  as thread, with the plant in a separate process so the two
+             loops do not share the GIL
+
+In the thread and process modes state and input are exchanged through
+SeqlockBuffer blocks in shared memory, so neither loop ever blocks on
+the other.
+
+    python realtime.py --system acrobot --rate 500 --mode all
+"""
+import argparse
+import gc
+import multiprocessing
+import threading
+import time
+from collections import namedtuple
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+
+RealtimeResult = namedtuple("RealtimeResult", [
+    "t",           # Scheduled time of each executed cycle, shape (num_cycles,)
+    "x",           # State the controller saw, shape (num_cycles, state_dim)
+    "u",           # Input it applied, shape (num_cycles, num_inputs)
+    "period",      # Control period in s
+    "jitter_ns",   # Wake-up minus scheduled release, per cycle
+    "compute_ns",  # Wake-up to input applied, per cycle
+    "overrun",     # Whether the cycle finished past its deadline
+    "missed",      # Releases skipped after the cycle
+    "age_ns",      # Age of the state sample when read (None inline)
+    "plant_late",  # Plant steps that started behind schedule (None inline)
+])
+
+# State samples published by the plant: [t, publish time in ns, late steps, state...]
+_SAMPLE_HEADER = 3
+
+
+def wait_until(deadline_ns, spin=2e-4, clock=time.perf_counter_ns):
+    """
+    Sleep until deadline_ns on the given clock.
+
+    time.sleep() alone wakes up 50-100 us late on a typical Linux desktop,
+    so the last `spin` seconds are busy-waited.
+
+    Returns:
+        Clock reading at wake-up
+    """
+    remaining = deadline_ns - clock()
+    spin_ns = int(spin * 1e9)
+    if remaining > spin_ns:
+        time.sleep((remaining - spin_ns) / 1e9)
+    now = clock()
+    while now < deadline_ns:
+        now = clock()
+    return now
+
+
+class SeqlockBuffer:
+    """
+    Fixed-size float64 buffer in shared memory guarded by a sequence lock.
+
+    The single writer makes the counter odd, copies the values and makes
+    it even again; a reader copies the values and retries when the counter
+    was odd or changed meanwhile. Neither side takes a lock, so a slow or
+    stalled reader never delays the writer. The counter and the values are
+    plain stores, which other cores observe in program order on x86-64; on
+    weakly ordered CPUs a torn read could go unnoticed.
+
+    Pickling reattaches by name, so a buffer can be passed to a spawned
+    process; the creating side unlinks the memory in close().
+
+    Parameters:
+        size: Number of float64 values
+        name: Existing block to attach to (None creates a new one)
+    """
+
+    def __init__(self, size, name=None):
+        self.size = size
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(name=name, create=self._owner, size=8 * (size + 1))
+        self._seq = np.ndarray((1,), dtype=np.int64, buffer=self._shm.buf)
+        self._values = np.ndarray((size,), dtype=np.float64, buffer=self._shm.buf, offset=8)
+        if self._owner:
+            self._seq[0] = 0
+        self._count = int(self._seq[0])
+
+    def __reduce__(self):
+        return type(self), (self.size, self._shm.name)
+
+    @property
+    def sequence(self):
+        """ Number of completed writes times two (odd while a write is in progress). """
+        return int(self._seq[0])
+
+    def write(self, values):
+        """ Publish values (one writer only). """
+        self._seq[0] = self._count + 1
+        self._values[:] = values
+        self._count += 2
+        self._seq[0] = self._count
+
+    def read(self, out):
+        """ Copy a consistent snapshot into out; returns its sequence number. """
+        while True:
+            before = self._seq[0]
+            if not before & 1:
+                out[:] = self._values
+                if self._seq[0] == before:
+                    return int(before)
+            # Let a writer thread preempted mid-write finish
+            time.sleep(0)
+
+    def close(self):
+        self._seq = self._values = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+def _run_plant(system, integrator, x0, dt, state_buffer, input_buffer, stop, spin):
+    """ Plant loop of the thread and process modes, stepping dt of simulated time per period. """
+    clock = time.perf_counter_ns
+    period_ns = round(dt * 1e9)
+    state = np.asarray(x0, dtype=float)
+    u = np.zeros(input_buffer.size)
+    sample = np.empty(state_buffer.size)
+    late = 0
+
+    start = clock()
+    sample[0], sample[1], sample[2], sample[_SAMPLE_HEADER:] = 0.0, start, late, state
+    state_buffer.write(sample)
+    k = 0
+    while not stop.is_set():
+        input_buffer.read(u)
+        state = integrator(system, k * dt, state, u, dt)
+        k += 1
+        release = start + k * period_ns
+        now = clock()
+        if now > release:
+            # Behind schedule: take the next step immediately to catch up
+            late += 1
+        sample[0], sample[1], sample[2], sample[_SAMPLE_HEADER:] = k * dt, now, late, state
+        state_buffer.write(sample)
+        wait_until(release, spin, clock)
+
+
+def run_realtime(system, controller, integrator, x0, rate, T, mode="inline", plant_rate=None,
+                 spin=None, disable_gc=True):
+    """
+    Run a closed loop in real time at a fixed control rate.
+
+    Parameters:
+        system: Dynamics func(t, state, u) of the simulated plant
+        controller: Control law controller(t, state), or None for u = 0
+        integrator: Step function integrator(func, t, state, u, dt)
+        x0: Initial state
+        rate: Control rate in Hz
+        T: Duration in (wall-clock and simulated) seconds
+        mode: "inline", "thread" or "process", see the module docstring
+        plant_rate: Plant step rate of the thread and process modes
+                    (defaults to rate)
+        spin: Seconds busy-waited before each release, see wait_until
+              (defaults to 0 in thread mode, where spinning would hold
+              the GIL against the plant thread, and 200 us otherwise)
+        disable_gc: Keep the cyclic garbage collector from pausing the loop
+
+    Returns:
+        RealtimeResult
+    """
+    if mode not in ("inline", "thread", "process"):
+        raise ValueError(f"Unknown mode {mode!r}, expected 'inline', 'thread' or 'process'")
+    if spin is None:
+        spin = 0.0 if mode == "thread" else 2e-4
+    if controller is None:
+        controller = lambda t, state: 0.0  # noqa: E731
+
+    clock = time.perf_counter_ns
+    period = 1.0 / rate
+    period_ns = round(period * 1e9)
+    num_slots = int(round(T * rate))
+    state = np.asarray(x0, dtype=float)
+
+    # Warm-up call: pays for lazy imports and caches, and sizes the input
+    u_buffer = np.atleast_1d(np.asarray(controller(0.0, state), dtype=float)).copy()
+    num_inputs = u_buffer.size
+
+    t = np.empty(num_slots)
+    x = np.empty((num_slots,) + state.shape)
+    u = np.empty((num_slots, num_inputs))
+    jitter = np.empty(num_slots, dtype=np.int64)
+    compute = np.empty(num_slots, dtype=np.int64)
+    age = np.empty(num_slots, dtype=np.int64)
+    overrun = np.zeros(num_slots, dtype=bool)
+    missed = np.zeros(num_slots, dtype=np.int64)
+
+    inline = mode == "inline"
+    if not inline:
+        plant_dt = 1.0 / (plant_rate or rate)
+        state_buffer = SeqlockBuffer(_SAMPLE_HEADER + state.size)
+        input_buffer = SeqlockBuffer(num_inputs)
+        input_buffer.write(u_buffer)
+        if mode == "thread":
+            stop = threading.Event()
+            plant = threading.Thread(target=_run_plant, daemon=True, args=(
+                system, integrator, state, plant_dt, state_buffer, input_buffer, stop, spin))
+        else:
+            stop = multiprocessing.Event()
+            plant = multiprocessing.Process(target=_run_plant, daemon=True, args=(
+                system, integrator, state, plant_dt, state_buffer, input_buffer, stop, spin))
+        plant.start()
+        sample = np.empty(state_buffer.size)
+        while state_buffer.sequence < 2:
+            if not plant.is_alive():
+                state_buffer.close()
+                input_buffer.close()
+                raise RuntimeError("Plant exited before publishing its first state")
+            time.sleep(1e-4)
+
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.disable()
+    try:
+        if inline:
+            start = clock()
+        else:
+            # Align the control schedule with the plant's
+            state_buffer.read(sample)
+            start = int(sample[1])
+        slot = 0
+        cycle = 0
+        while slot < num_slots:
+            release = start + slot * period_ns
+            wake = wait_until(release, spin, clock)
+            if inline:
+                t_k = slot * period
+            else:
+                state_buffer.read(sample)
+                t_k = sample[0]
+                state = sample[_SAMPLE_HEADER:]
+                age[cycle] = wake - int(sample[1])
+            u_k = controller(t_k, state)
+            u_buffer[:] = np.ravel(u_k)
+            x[cycle] = state
+            if inline:
+                state = integrator(system, t_k, state, u_k, period)
+            else:
+                input_buffer.write(u_buffer)
+            done = clock()
+
+            # Releases this cycle ran into are skipped; the input is held over them
+            skipped = max(0, (done - release) // period_ns)
+            if inline:
+                for j in range(1, skipped + 1):
+                    state = integrator(system, t_k + j * period, state, u_k, period)
+            t[cycle] = t_k
+            u[cycle] = u_buffer
+            jitter[cycle] = wake - release
+            compute[cycle] = done - wake
+            overrun[cycle] = skipped > 0
+            missed[cycle] = skipped
+            cycle += 1
+            slot += 1 + skipped
+    finally:
+        if disable_gc and gc_was_enabled:
+            gc.enable()
+        if not inline:
+            stop.set()
+            plant.join(timeout=5.0)
+            if mode == "process" and plant.is_alive():
+                plant.terminate()
+            state_buffer.read(sample)
+            state_buffer.close()
+            input_buffer.close()
+
+    if mode == "process" and plant.exitcode not in (0, None):
+        raise RuntimeError(f"Plant process exited with code {plant.exitcode}")
+    return RealtimeResult(t[:cycle], x[:cycle], u[:cycle], period, jitter[:cycle], compute[:cycle],
+                          overrun[:cycle], missed[:cycle], None if inline else age[:cycle],
+                          None if inline else int(sample[2]))
+
+
+def timing_summary(result):
+    """ Cycle counts and p50/p99/max of jitter, compute time and sample age in us. """
+    def percentiles(samples_ns):
+        if samples_ns is None or not len(samples_ns):
+            return None
+        p50, p99 = np.percentile(samples_ns / 1e3, [50, 99])
+        return {"p50_us": float(p50), "p99_us": float(p99), "max_us": float(samples_ns.max() / 1e3)}
+
+    return {
+        "rate_hz": 1.0 / result.period,
+        "cycles": len(result.t),
+        "overruns": int(result.overrun.sum()),
+        "missed": int(result.missed.sum()),
+        "jitter": percentiles(result.jitter_ns),
+        "compute": percentiles(result.compute_ns),
+        "age": percentiles(result.age_ns),
+        "plant_late": result.plant_late,
+    }
+
+
+if __name__ == "__main__":
+    from controllers import (acrobot_linearized_matrices, acrobot_lqr_controller, lqr_solve,
+                             pendulum_swingup_controller, saturate)
+    from dynamics import ACROBOT_PARAMS, PENDULUM_PARAMS, acrobot_dynamics, pendulum_dynamics
+    from integrators import rk4_step
+
+    parser = argparse.ArgumentParser(description="Run a closed loop at a fixed real-time rate.")
+    parser.add_argument("--system", choices=["pendulum", "acrobot"], default="acrobot")
+    parser.add_argument("--rate", type=float, default=500.0, help="Control rate in Hz")
+    parser.add_argument("--plant-rate", type=float, help="Plant step rate (thread/process modes)")
+    parser.add_argument("--T", type=float, default=5.0, help="Duration in s")
+    parser.add_argument("--mode", choices=["inline", "thread", "process", "all"], default="all")
+    args = parser.parse_args()
+
+    if args.system == "pendulum":
+        m, L, g, _ = PENDULUM_PARAMS
+        system = partial(pendulum_dynamics, params=PENDULUM_PARAMS)
+        x0 = np.array([np.pi / 16, 0.0])
+        goal = np.array([np.pi, 0.0])
+
+        def controller(t, state):
+            return pendulum_swingup_controller(state[0], state[1], m, L, g, m * g * L,
+                                               k=10.0, Kp=5.0, Kd=10.0)
+    else:
+        system = partial(acrobot_dynamics, params=ACROBOT_PARAMS)
+        A, B = acrobot_linearized_matrices(*ACROBOT_PARAMS[:7])
+        K, _ = lqr_solve(A, B, np.diag([10.0, 10.0, 1.0, 1.0]), np.array([[1.0]]))
+        x0 = np.array([np.pi + 0.01, 0.0, 0.0, 0.0])
+        goal = np.array([np.pi, 0.0, 0.0, 0.0])
+
+        def controller(t, state):
+            return saturate(acrobot_lqr_controller(state, goal, K), ACROBOT_PARAMS.torque_limit)
+
+    modes = ["inline", "thread", "process"] if args.mode == "all" else [args.mode]
+    for mode in modes:
+        result = run_realtime(system, controller, rk4_step, x0, args.rate, args.T, mode=mode,
+                              plant_rate=args.plant_rate)
+        summary = timing_summary(result)
+        print(f"{args.system} at {args.rate:g} Hz, {mode}: {summary['cycles']} cycles, "
+              f"{summary['overruns']} overruns, {summary['missed']} missed releases, "
+              f"final distance to goal {np.linalg.norm(result.x[-1] - goal):.3g}")
+        for name in ("jitter", "compute", "age"):
+            if summary[name] is not None:
+                print(f"  {name:<8} p50 {summary[name]['p50_us']:8.1f} us   "
+                      f"p99 {summary[name]['p99_us']:8.1f} us   max {summary[name]['max_us']:8.1f} us")
+        if summary["plant_late"] is not None:
+            print(f"  plant steps behind schedule: {summary['plant_late']}")
@@ -0,0 +1,157 @@
+import json
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# Read-only view of a recording; every field is a numpy memmap (or a view of one)
+Recording = namedtuple("Recording", ["t", "x", "u"])
+
+_META_FILE = "meta.json"
+_FILES = {"t": "t.bin", "x": "x.bin", "u": "u.bin"}
+
+
+class TrajectoryRecorder:
+    """
+    Streams (t, x, u) samples to memory-mapped raw files in fixed-size chunks.
+
+    Each file is grown one chunk at a time and samples are written straight
+    into the mapped chunk, so memory use is one chunk per stream no matter
+    how long the run is. After every completed chunk meta.json is rewritten
+    with the number of durable samples, which lets open_recording() follow a
+    recording that is still in progress.
+
+    Layout of the recording directory:
+        meta.json   shapes, dtypes, sample count, decimation, completion flag
+        t.bin       float64 timestamps, shape (count,)
+        x.bin       states, shape (count,) + state_shape
+        u.bin       controls, shape (count,) + control_shape
+
+    Parameters:
+        path: Directory to write the recording into (created if missing)
+        chunk_size: Samples per chunk
+        dtype: Storage dtype for states and controls (e.g. np.float32 to
+               halve the size); timestamps always stay float64
+        decimation: Keep one sample out of every `decimation` appended
+    """
+
+    def __init__(self, path, chunk_size=4096, dtype=np.float64, decimation=1):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.dtype = np.dtype(dtype)
+        self.decimation = decimation
+        self.count = 0
+        self._appended = 0
+        self._shapes = None
+        self._chunks = None
+        os.makedirs(path, exist_ok=True)
+
+    def _open_chunk(self):
+        """ Grow every file by one chunk and map the new region. """
+        chunk_index = self.count // self.chunk_size
+        self._chunks = {}
+        for name, (shape, dtype) in self._shapes.items():
+            file_path = os.path.join(self.path, _FILES[name])
+            row_bytes = dtype.itemsize * int(np.prod(shape))
+            offset = chunk_index * self.chunk_size * row_bytes
+            with open(file_path, "r+b" if os.path.exists(file_path) else "w+b") as f:
+                f.truncate(offset + self.chunk_size * row_bytes)
+            self._chunks[name] = np.memmap(file_path, dtype=dtype, mode="r+", offset=offset,
+                                           shape=(self.chunk_size,) + shape)
+
+    def append(self, t, x, u=0.0, force=False):
+        """
+        Record one sample, subject to decimation unless force is set (used
+        for the terminal sample of a run, which must not be dropped).
+        """
+        self._appended += 1
+        if (self._appended - 1) % self.decimation and not force:
+            return
+
+        if self._shapes is None:
+            self._shapes = {
+                "t": ((), np.dtype(np.float64)),
+                "x": (np.shape(x), self.dtype),
+                "u": (np.shape(u), self.dtype),
+            }
+            self._write_meta(complete=False)
+        if self.count % self.chunk_size == 0:
+            self._open_chunk()
+
+        row = self.count % self.chunk_size
+        self._chunks["t"][row] = t
+        self._chunks["x"][row] = x
+        self._chunks["u"][row] = u
+        self.count += 1
+
+        if self.count % self.chunk_size == 0:
+            self.flush()
+
+    def flush(self):
+        """ Push the current chunk to disk and publish the sample count. """
+        if self._chunks is None:
+            return
+        for chunk in self._chunks.values():
+            chunk.flush()
+        self._write_meta(complete=False)
+
+    def close(self):
+        """ Flush, trim the files to the recorded length and mark complete. """
+        if self._shapes is not None:
+            self.flush()
+            self._chunks = None
+            for name, (shape, dtype) in self._shapes.items():
+                row_bytes = dtype.itemsize * int(np.prod(shape))
+                with open(os.path.join(self.path, _FILES[name]), "r+b") as f:
+                    f.truncate(self.count * row_bytes)
+        self._write_meta(complete=True)
+
+    def _write_meta(self, complete):
+        shapes = self._shapes or {}
+        meta = {
+            "count": self.count,
+            "complete": complete,
+            "decimation": self.decimation,
+            "chunk_size": self.chunk_size,
+            "streams": {name: {"shape": list(shape), "dtype": dtype.str}
+                        for name, (shape, dtype) in shapes.items()},
+        }
+        # Write-then-rename so readers never see a partial meta file
+        tmp_path = os.path.join(self.path, _META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, _META_FILE))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_recording(path):
+    """
+    Open a finished or in-progress recording without loading it.
+
+    Returns a Recording of read-only memmaps covering the samples published
+    so far; slicing them reads only the touched pages.
+    """
+    with open(os.path.join(path, _META_FILE)) as f:
+        meta = json.load(f)
+    count = meta["count"]
+    arrays = {}
+    for name, file_name in _FILES.items():
+        stream = meta["streams"].get(name)
+        if stream is None or count == 0:
+            arrays[name] = np.empty((0,))
+            continue
+        shape = (count,) + tuple(stream["shape"])
+        arrays[name] = np.memmap(os.path.join(path, file_name), dtype=np.dtype(stream["dtype"]),
+                                 mode="r", shape=shape)
+    return Recording(**arrays)
+
+
+def time_window(recording, t_start, t_end):
+    """ Zero-copy slice of a Recording to samples with t_start <= t < t_end. """
+    start, stop = np.searchsorted(recording.t, [t_start, t_end])
+    return Recording(recording.t[start:stop], recording.x[start:stop], recording.u[start:stop])
@@ -0,0 +1,217 @@
+"""
+Monte Carlo region-of-attraction estimate for acrobot LQR balancing.
+
+Samples many initial states around the upright equilibrium, rolls them all
+out together with the LQR controller and classifies each one as converged,
+diverged or undecided. Finished states are dropped from the batch as soon
+as they are classified, so every step costs time proportional to the states
+still running. The converged set is summarized by the largest sublevel set
+of the LQR cost-to-go V(x) = e^T S e that contains no failed sample.
+
+    python roa.py [--samples 200000] [--T 10]
+"""
+import argparse
+import time
+from collections import namedtuple
+from functools import partial
+
+import numpy as np
+
+from controllers import acrobot_linearized_matrices, lqr_solve
+from dynamics import ACROBOT_PARAMS, acrobot_dynamics
+from integrators import rk4_step_batch
+
+# Classification labels
+UNDECIDED = 0
+CONVERGED = 1
+DIVERGED = -1
+
+UPRIGHT = np.array([np.pi, 0.0, 0.0, 0.0])
+
+RoaResult = namedtuple("RoaResult", [
+    "states",       # (N, 4) sampled initial states
+    "labels",       # (N,) CONVERGED / DIVERGED / UNDECIDED
+    "times",        # (N,) time at which each sample was classified (T if undecided)
+    "V",            # (N,) LQR cost-to-go of each initial state
+    "level",        # Largest c with {V < c} free of non-converged samples
+    "S",            # Riccati solution defining V
+    "active_steps", # Sum over steps of the number of states still running
+    "elapsed",      # Wall-clock seconds of the rollout
+])
+
+
+def sample_states(n, spread, center=UPRIGHT, seed=None):
+    """ n initial states drawn uniformly from the box center +/- spread. """
+    rng = np.random.default_rng(seed)
+    spread = np.asarray(spread, dtype=float)
+    return center + rng.uniform(-1.0, 1.0, (n, len(spread))) * spread
+
+
+def sample_ellipsoid(n, S, level, center=UPRIGHT, seed=None):
+    """
+    n initial states drawn uniformly from the ellipsoid
+    (x - center)^T S (x - center) < level.
+
+    The LQR region of attraction is long and thin in state space, so
+    sampling a box wastes most samples on states that obviously fail.
+    """
+    rng = np.random.default_rng(seed)
+    dim = len(S)
+    direction = rng.standard_normal((n, dim))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    z = direction * (np.sqrt(level) * rng.uniform(size=(n, 1)) ** (1.0 / dim))
+    # e^T S e = |C^T e|^2 for S = C C^T, so e = C^-T z has V(e) = |z|^2
+    C = np.linalg.cholesky(S)
+    return center + np.linalg.solve(C.T, z.T).T
+
+
+def classify(dynamics, K, states, reference_state=UPRIGHT, dt=0.01, T=10.0,
+             tolerance=1e-2, divergence_radius=2 * np.pi):
+    """
+    Roll out x' = f(x, -K (x - reference)) for a batch of initial states.
+
+    A state is CONVERGED once its error norm drops below tolerance, DIVERGED
+    once the norm exceeds divergence_radius (or becomes non-finite), and
+    UNDECIDED if neither happens by T. Classified rows are compacted out of
+    the working batch, so only undecided rows are integrated.
+
+    Parameters:
+        dynamics: Batched dynamics func(t, states, controls)
+        K: LQR gain of shape (1, 4)
+        states: Initial states of shape (N, 4)
+        reference_state: Equilibrium the controller regulates to
+        dt: Integration time step (RK4)
+        T: Time horizon
+        tolerance: Error norm counted as converged
+        divergence_radius: Error norm counted as diverged
+
+    Returns:
+        labels: (N,) classification
+        times: (N,) classification time
+        active_steps: Total rows integrated, summed over steps
+    """
+    n = len(states)
+    labels = np.full(n, UNDECIDED, dtype=np.int8)
+    times = np.full(n, T)
+    active = np.arange(n)
+    x = np.array(states, dtype=float)
+    K_T = np.asarray(K, dtype=float).T
+    active_steps = 0
+
+    with np.errstate(all="ignore"):
+        for k in range(int(round(T / dt))):
+            if len(active) == 0:
+                break
+            active_steps += len(active)
+            u = -(x - reference_state) @ K_T
+            x = rk4_step_batch(dynamics, k * dt, x, u, dt)
+
+            error = np.linalg.norm(x - reference_state, axis=1)
+            converged = error < tolerance
+            diverged = ~(error <= divergence_radius)
+            done = converged | diverged
+            if done.any():
+                labels[active[converged]] = CONVERGED
+                labels[active[diverged]] = DIVERGED
+                times[active[done]] = (k + 1) * dt
+                keep = ~done
+                active = active[keep]
+                x = x[keep]
+    return labels, times, active_steps
+
+
+def fit_level_set(V, labels):
+    """
+    Largest c such that every sample with V < c converged.
+
+    This is the sample-based inner estimate of the region of attraction as
+    a sublevel set (ellipsoid) of the quadratic V; inf if nothing failed.
+    """
+    failed = labels != CONVERGED
+    return float(V[failed].min()) if failed.any() else np.inf
+
+
+def ellipsoid_axes(S, level):
+    """
+    Semi-axis lengths and directions of the ellipsoid e^T S e < level.
+
+    Returns:
+        radii: (n,) semi-axis lengths, largest first
+        directions: (n, n) columns are the matching unit axes
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(S)
+    order = np.argsort(eigenvalues)
+    return np.sqrt(level / eigenvalues[order]), eigenvectors[:, order]
+
+
+def in_region(result, states):
+    """ Whether states lie inside the fitted level set of a RoaResult. """
+    error = np.atleast_2d(states) - UPRIGHT
+    return np.einsum("ni,ij,nj->n", error, result.S, error) < result.level
+
+
+def estimate_acrobot_roa(n=200_000, params=ACROBOT_PARAMS, Q=None, R=None, max_level=2.0,
+                         spread=None, dt=0.01, T=10.0, tolerance=1e-2, seed=0):
+    """
+    Monte Carlo region of attraction of the acrobot LQR balance controller.
+
+    Parameters:
+        n: Number of sampled initial states
+        params: AcrobotParams (the torque limit is enforced by the dynamics)
+        Q, R: LQR costs, defaulting to those of acrobat_balance.py
+        max_level: Samples are drawn uniformly from V(x) < max_level
+        spread: If given, sample the box upright +/- spread instead
+        dt, T: Rollout time step and horizon
+        tolerance: Error norm counted as converged
+        seed: Random seed for the samples
+
+    Returns:
+        RoaResult
+    """
+    Q = np.diag([10.0, 10.0, 1.0, 1.0]) if Q is None else Q
+    R = np.array([[1.0]]) if R is None else R
+    m1, m2, I1, I2, L1, L2, g, _ = params
+    A, B = acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g)
+    K, S = lqr_solve(A, B, Q, R)
+
+    if spread is None:
+        states = sample_ellipsoid(n, S, max_level, seed=seed)
+    else:
+        states = sample_states(n, spread, seed=seed)
+    start = time.perf_counter()
+    labels, times, active_steps = classify(
+        partial(acrobot_dynamics, params=params), K, states, dt=dt, T=T, tolerance=tolerance
+    )
+    elapsed = time.perf_counter() - start
+
+    error = states - UPRIGHT
+    V = np.einsum("ni,ij,nj->n", error, S, error)
+    return RoaResult(states, labels, times, V, fit_level_set(V, labels), S, active_steps, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo ROA of the acrobot LQR controller.")
+    parser.add_argument("--samples", type=int, default=200_000)
+    parser.add_argument("--T", type=float, default=10.0, help="Rollout horizon")
+    parser.add_argument("--max-level", type=float, default=2.0, help="Sample V(x) < max-level")
+    parser.add_argument("--dt", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = estimate_acrobot_roa(args.samples, max_level=args.max_level, dt=args.dt, T=args.T, seed=args.seed)
+    n = len(result.labels)
+    steps = int(round(args.T / args.dt))
+    print(f"{n} samples in {result.elapsed:.2f} s")
+    for name, label in (("converged", CONVERGED), ("diverged", DIVERGED), ("undecided", UNDECIDED)):
+        print(f"  {name:<10}{np.count_nonzero(result.labels == label) / n:>8.1%}")
+    print(f"Integrated {result.active_steps} state-steps, "
+          f"{result.active_steps / (n * steps):.1%} of a full {n} x {steps} rollout")
+
+    inside = result.V < result.level
+    print(f"\nLevel set V(x) < {result.level:.4g} holds {np.count_nonzero(inside) / n:.1%} of the "
+          f"samples and {np.count_nonzero(inside) / max(np.count_nonzero(result.labels == CONVERGED), 1):.1%}"
+          f" of the converged ones")
+    radii, directions = ellipsoid_axes(result.S, result.level)
+    print("Ellipsoid semi-axes (error coordinates):")
+    for radius, direction in zip(radii, directions.T):
+        print(f"  {radius:8.4f} along {np.array2string(direction, precision=3, suppress_small=True)}")
@@ -0,0 +1,325 @@
+"""
+Local WebSocket simulation server.
+
+Runs the Python pendulum / acrobot closed loop in real time and streams
+packed float32 state frames to any number of browser clients, so the React
+front end can render the same dynamics and controllers as the quickstarts.
+
+    python server.py --system pendulum --port 8765
+
+Binary frame message (little-endian):
+    uint32   sequence number
+    uint16   number of frames in this message
+    uint16   floats per frame: [t, state..., u]
+    float64  server send time (monotonic seconds, echo it back in "ack")
+    float32  frames, row-major (num_frames x floats_per_frame)
+
+Text (JSON) messages accepted from clients:
+    {"type": "params", "params": {"Kp": 20.0, "torque_limit": 2.0}}
+    {"type": "reset"}
+    {"type": "ack", "seq": 12, "send_time": 1234.5}   round-trip latency
+    {"type": "stats"}                                 replies with a stats JSON
+"""
+import argparse
+import asyncio
+import json
+import struct
+import time
+from collections import deque
+from functools import partial
+
+import numpy as np
+
+from controllers import (acrobot_linearized_matrices, acrobot_lqr_controller, lqr_solve,
+                         pendulum_swingup_controller)
+from dynamics import ACROBOT_PARAMS, PENDULUM_PARAMS, acrobot_dynamics, pendulum_dynamics
+from integrators import rk4_step
+
+HEADER = struct.Struct("<IHHd")
+
+PENDULUM_DEFAULTS = {
+    "m": PENDULUM_PARAMS.m, "L": PENDULUM_PARAMS.L, "g": PENDULUM_PARAMS.g, "b": PENDULUM_PARAMS.b,
+    "Kp": 5.0, "Kd": 10.0, "k": 10.0, "torque_limit": 1.0, "theta0": np.pi / 16,
+}
+
+ACROBOT_DEFAULTS = {
+    "q1": 10.0, "q2": 10.0, "q3": 1.0, "q4": 1.0, "r": 1.0,
+    "torque_limit": ACROBOT_PARAMS.torque_limit, "dtheta1": 0.01,
+}
+
+
+def pack_frames(seq, frames, send_time):
+    """ Serialize an (num_frames, width) array into one binary message. """
+    frames = np.ascontiguousarray(frames, dtype="<f4")
+    return HEADER.pack(seq, frames.shape[0], frames.shape[1], send_time) + frames.tobytes()
+
+
+def unpack_frames(message):
+    """ Inverse of pack_frames: returns (seq, send_time, frames). """
+    seq, num_frames, width, send_time = HEADER.unpack_from(message)
+    frames = np.frombuffer(message, dtype="<f4", offset=HEADER.size).reshape(num_frames, width)
+    return seq, send_time, frames
+
+
+class SimulationSession:
+    """
+    One closed-loop simulation (pendulum swing-up or acrobot LQR balancing)
+    whose parameters can be changed while it runs.
+    """
+
+    def __init__(self, system="pendulum", dt=0.002):
+        if system not in ("pendulum", "acrobot"):
+            raise ValueError(f"Unknown system {system!r}, expected 'pendulum' or 'acrobot'")
+        self.system = system
+        self.dt = dt
+        self.params = dict(PENDULUM_DEFAULTS if system == "pendulum" else ACROBOT_DEFAULTS)
+        self._configure()
+        self.reset()
+
+    def update(self, params):
+        """
+        Apply parameter changes. Unknown names raise KeyError and invalid
+        values ValueError, leaving the running configuration untouched.
+        """
+        unknown = set(params) - set(self.params)
+        if unknown:
+            raise KeyError(f"Unknown parameters for {self.system}: {sorted(unknown)}")
+        updated = dict(self.params)
+        updated.update({name: float(value) for name, value in params.items()})
+        self._configure(updated)
+
+    def reset(self):
+        p = self.params
+        self.t = 0.0
+        if self.system == "pendulum":
+            self.state = np.array([p["theta0"], 0.0])
+        else:
+            self.state = np.array([np.pi + p["dtheta1"], 0.0, 0.0, 0.0])
+
+    def _configure(self, params=None):
+        """
+        Rebuild dynamics and controller from params (default: the current
+        ones) and adopt all three only once everything is valid.
+        """
+        p = dict(self.params if params is None else params)
+        if not 0.0 < self.dt <= 0.1:
+            raise ValueError(f"dt must be in (0, 0.1], got {self.dt}")
+        positive = ("m", "L", "torque_limit") if self.system == "pendulum" else ("r", "torque_limit")
+        non_negative = ("b", "g", "k", "Kp", "Kd") if self.system == "pendulum" else ("q1", "q2", "q3", "q4")
+        for name in positive:
+            if not p[name] > 0.0:
+                raise ValueError(f"{name} must be positive, got {p[name]}")
+        for name in non_negative:
+            if not p[name] >= 0.0:
+                raise ValueError(f"{name} must be non-negative, got {p[name]}")
+        if not all(np.isfinite(value) for value in p.values()):
+            raise ValueError("parameters must be finite")
+
+        if self.system == "pendulum":
+            model = PENDULUM_PARAMS._replace(m=p["m"], L=p["L"], g=p["g"], b=p["b"])
+            dynamics = partial(pendulum_dynamics, params=model)
+            E_desired = p["m"] * p["g"] * p["L"]
+
+            def controller(state):
+                return pendulum_swingup_controller(
+                    state[0], state[1], p["m"], p["L"], p["g"], E_desired, p["k"],
+                    p["Kp"], p["Kd"], np.pi, p["torque_limit"])
+        else:
+            model = ACROBOT_PARAMS._replace(torque_limit=p["torque_limit"])
+            dynamics = partial(acrobot_dynamics, params=model)
+            A, B = acrobot_linearized_matrices(*model[:7])
+            Q = np.diag([p["q1"], p["q2"], p["q3"], p["q4"]])
+            K, _ = lqr_solve(A, B, Q, np.array([[p["r"]]]))
+            reference_state = np.array([np.pi, 0.0, 0.0, 0.0])
+
+            def controller(state):
+                u = acrobot_lqr_controller(state, reference_state, K)
+                return np.clip(u, -p["torque_limit"], p["torque_limit"])
+        self.params = p
+        self.dynamics = dynamics
+        self.controller = controller
+
+    def step(self, num_steps):
+        """ Advance num_steps and return frames [t, state..., u] as float32. """
+        frames = np.empty((num_steps, len(self.state) + 2), dtype=np.float32)
+        for i in range(num_steps):
+            u = self.controller(self.state)
+            self.state = rk4_step(self.dynamics, self.t, self.state, u, self.dt)
+            self.t += self.dt
+            frames[i, 0] = self.t
+            frames[i, 1:-1] = self.state
+            frames[i, -1] = np.sum(u)
+        if not np.isfinite(self.state).all():
+            self.reset()
+        return frames
+
+
+class SimulationServer:
+    """
+    Runs a SimulationSession in real time and broadcasts its frames.
+
+    The physics loop never waits on clients: each client has a small queue
+    drained by its own sender task, and when a slow client's queue is full
+    the oldest message is dropped.
+
+    Parameters:
+        session: SimulationSession to run
+        fps: Messages per second; each carries dt * steps of simulated time
+        queue_size: Messages buffered per client before dropping
+    """
+
+    def __init__(self, session, fps=60, queue_size=4):
+        self.session = session
+        self.fps = fps
+        self.steps_per_message = max(1, round(1.0 / (fps * session.dt)))
+        self.queue_size = queue_size
+        self.clients = set()
+        self.seq = 0
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.step_errors = 0
+        self.last_error = None
+        self.started = time.monotonic()
+        self.send_latency = deque(maxlen=2000)   # produced -> written to socket
+        self.round_trip = deque(maxlen=2000)     # produced -> client ack received
+        self.physics_time = deque(maxlen=2000)   # time spent stepping per message
+
+    async def physics_loop(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.fps
+        next_time = loop.time()
+        while True:
+            start = time.monotonic()
+            try:
+                frames = self.session.step(self.steps_per_message)
+            except Exception as error:
+                # Keep serving the other clients: report, restart the session
+                self.step_errors += 1
+                self.last_error = f"{type(error).__name__}: {error}"
+                print(f"Simulation step failed ({self.last_error}), resetting")
+                self.session.reset()
+                frames = None
+            now = time.monotonic()
+            self.physics_time.append(now - start)
+
+            if frames is not None:
+                message = pack_frames(self.seq, frames, now)
+                self.seq += 1
+                for queue in self.clients:
+                    if queue.full():
+                        queue.get_nowait()
+                        self.messages_dropped += 1
+                    queue.put_nowait((now, message))
+
+            next_time += period
+            delay = next_time - loop.time()
+            if delay < 0:
+                # Fell behind: skip the missed slots instead of bursting
+                next_time = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def _send_loop(self, websocket, queue):
+        while True:
+            produced, message = await queue.get()
+            await websocket.send(message)
+            self.send_latency.append(time.monotonic() - produced)
+            self.messages_sent += 1
+
+    async def handler(self, websocket, *_):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.clients.add(queue)
+        sender = asyncio.create_task(self._send_loop(websocket, queue))
+        try:
+            async for message in websocket:
+                reply = self.handle_message(message)
+                if reply is not None:
+                    await websocket.send(json.dumps(reply))
+        finally:
+            self.clients.discard(queue)
+            sender.cancel()
+
+    def handle_message(self, message):
+        """ Apply one JSON control message; returns a reply dict or None. """
+        try:
+            request = json.loads(message)
+            if not isinstance(request, dict):
+                return {"type": "error", "error": "expected a JSON object"}
+            kind = request.get("type")
+            if kind == "params":
+                self.session.update(request["params"])
+            elif kind == "reset":
+                self.session.reset()
+            elif kind == "ack":
+                self.round_trip.append(time.monotonic() - float(request["send_time"]))
+            elif kind == "stats":
+                return {"type": "stats", **self.stats()}
+            else:
+                return {"type": "error", "error": f"unknown message type {kind!r}"}
+        except (ValueError, KeyError, TypeError) as error:
+            return {"type": "error", "error": error.args[0] if error.args else repr(error)}
+        return None
+
+    def stats(self):
+        """ Message rate, drop count and latency percentiles in ms. """
+        def percentiles(samples):
+            if not samples:
+                return None
+            p50, p99 = np.percentile(np.asarray(samples) * 1e3, [50, 99])
+            return {"p50_ms": float(p50), "p99_ms": float(p99)}
+
+        elapsed = time.monotonic() - self.started
+        return {
+            "clients": len(self.clients),
+            "messages_per_sec": self.seq / elapsed if elapsed > 0 else 0.0,
+            "frames_per_sec": self.seq * self.steps_per_message / elapsed if elapsed > 0 else 0.0,
+            "messages_sent": self.messages_sent,
+            "messages_dropped": self.messages_dropped,
+            "step_errors": self.step_errors,
+            "last_error": self.last_error,
+            "send_latency": percentiles(self.send_latency),
+            "round_trip": percentiles(self.round_trip),
+            "physics": percentiles(self.physics_time),
+        }
+
+    async def report_loop(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(json.dumps(self.stats()))
+
+
+async def serve(session, host="127.0.0.1", port=8765, fps=60, report_interval=5.0):
+    """ Serve a SimulationSession until cancelled. Requires the `websockets` package. """
+    try:
+        from websockets.asyncio.server import serve as websocket_serve
+    except ImportError:
+        try:
+            from websockets import serve as websocket_serve
+        except ImportError:
+            raise ImportError("server.py needs the 'websockets' package: pip install websockets") from None
+
+    server = SimulationServer(session, fps=fps)
+    async with websocket_serve(server.handler, host, port):
+        print(f"Streaming {session.system} on ws://{host}:{port} "
+              f"({fps} messages/s, {server.steps_per_message} steps each)")
+        tasks = [asyncio.create_task(server.physics_loop())]
+        if report_interval:
+            tasks.append(asyncio.create_task(server.report_loop(report_interval)))
+        await asyncio.gather(*tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream a simulation over a local WebSocket.")
+    parser.add_argument("--system", choices=["pendulum", "acrobot"], default="pendulum")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dt", type=float, default=0.002, help="Physics time step")
+    parser.add_argument("--fps", type=int, default=60, help="Messages per second")
+    parser.add_argument("--report", type=float, default=5.0, help="Stats interval in s (0 = off)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(SimulationSession(args.system, args.dt), args.host, args.port,
+                          args.fps, args.report))
+    except KeyboardInterrupt:
+        pass
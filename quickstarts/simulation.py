@@ -0,0 +1,190 @@
+import functools
+import os
+import types
+from collections import namedtuple
+
+import numpy as np
+
+from cache import LRUCache, config_fingerprint
+from integrators import RK4Workspace
+
+SimulationResult = namedtuple("SimulationResult", ["t", "x", "u"])
+
+# Trajectories of cached_simulate keyed on the full run configuration. Set
+# SIMULATION_CACHE_DIR to also keep them on disk across runs.
+_simulation_cache = LRUCache(maxsize=1024, max_bytes=256 * 2**20, copy=False,
+                             directory=os.environ.get("SIMULATION_CACHE_DIR"),
+                             max_disk_bytes=2 * 2**30)
+
+
+def configure_simulation_cache(maxsize=1024, max_bytes=256 * 2**20, directory=None,
+                               max_disk_bytes=2 * 2**30):
+    """
+    Replace the cache used by cached_simulate.
+
+    Parameters:
+        maxsize: Number of trajectories kept in memory
+        max_bytes: Memory budget of the kept trajectories
+        directory: Optional directory for the on-disk tier
+        max_disk_bytes: Size budget of that directory
+    """
+    global _simulation_cache
+    _simulation_cache = LRUCache(maxsize=maxsize, max_bytes=max_bytes, copy=False,
+                                 directory=directory, max_disk_bytes=max_disk_bytes)
+
+
+def simulation_cache_info():
+    """ Hits, misses, bytes held and hit_rate of the cached_simulate cache. """
+    return _simulation_cache.info()
+
+
+def simulate(system, controller, integrator, x0, dt, T, recorder=None, keep_history=True,
+             profiler=None):
+    """
+    Run a closed-loop simulation at full speed, without any rendering.
+
+    The control input is held constant over each step (zero-order hold).
+    Works unchanged for a single state or an (N, state_dim) batch as long
+    as system, controller and integrator accept the same shapes.
+    
+    Parameters:
+        system: Dynamics func(t, state, u) returning the state derivative
+        controller: Control law controller(t, state) returning u, or None
+                    for an unforced system (u = 0)
+        integrator: Step function integrator(func, t, state, u, dt),
+                    e.g. euler_step or rk4_step
+        x0: Initial state
+        dt: Time step
+        T: Total simulation time
+        recorder: Optional TrajectoryRecorder receiving (t_k, x_k, u_k)
+                  for every step, then the terminal (t_N, x_N) with a NaN
+                  input of the same shape, recorded whatever the decimation
+        keep_history: If False, only the final sample is kept in memory
+                      (use with a recorder for very long runs)
+        profiler: Optional profiling.Profiler timing the controller,
+                  dynamics, integrator and recorder stages of every step
+                  (dynamics only for a plain function or partial system)
+        
+    Returns:
+        SimulationResult with preallocated arrays
+            t: Sample times, shape (num_steps + 1,)
+            x: States, shape (num_steps + 1,) + x0.shape
+            u: Controls applied over each step, shape (num_steps,) + u.shape
+        With keep_history=False each array holds only its last entry.
+    """
+    num_steps = int(round(T / dt))
+    state = np.asarray(x0, dtype=float)
+
+    t = np.arange(num_steps + 1) * dt
+    x = np.empty((num_steps + 1 if keep_history else 1,) + state.shape)
+    x[0] = state
+    u = None
+
+    profiling = profiler is not None and profiler.enabled
+    if profiling:
+        clock = profiler.clock
+        record = profiler.record
+        if isinstance(system, (types.FunctionType, functools.partial)):
+            # Objects such as LinearSystem keep their attributes for the
+            # integrator (zoh_step reads A and B); only the integrator stage
+            # times their dynamics
+            system = profiler.wrap("dynamics", system)
+
+    for k in range(num_steps):
+        if profiling:
+            step_start = clock()
+        u_k = controller(t[k], state) if controller is not None else 0.0
+        if profiling:
+            controller_end = clock()
+            record("controller", step_start, controller_end)
+        if u is None:
+            u = np.empty((num_steps if keep_history else 1,) + np.shape(u_k))
+        if recorder is not None:
+            recorder.append(t[k], state, u_k)
+            if profiling:
+                recorder_end = clock()
+                record("recorder", controller_end, recorder_end)
+                controller_end = recorder_end
+        state = integrator(system, t[k], state, u_k, dt)
+        if keep_history:
+            u[k] = u_k
+            x[k + 1] = state
+        if profiling:
+            step_end = clock()
+            record("integrator", controller_end, step_end)
+            record("step", step_start, step_end)
+
+    if recorder is not None:
+        # Terminal state x[num_steps]; no input is applied after it
+        recorder.append(t[num_steps], state, np.full(np.shape(u_k), np.nan) if num_steps else np.nan,
+                        force=True)
+
+    if u is None:
+        u = np.empty((0,))
+    if not keep_history:
+        t = t[-1:]
+        x[0] = state
+        if num_steps:
+            u[0] = u_k
+    return SimulationResult(t, x, u)
+
+
+def cached_simulate(system, controller, integrator, x0, dt, T):
+    """
+    simulate() with results served from a content-addressed cache.
+
+    The key covers everything that determines the trajectory: the system,
+    controller and integrator (by code, captured values and the globals
+    they read, see cache.config_fingerprint), x0, dt and T. A repeated run
+    returns the stored arrays, read-only, without simulating.
+
+    Returns:
+        SimulationResult
+    """
+    key = config_fingerprint("simulate", system, controller, integrator,
+                             np.asarray(x0, dtype=float), float(dt), float(T))
+    cached = _simulation_cache.get(key)
+    if cached is not None:
+        return SimulationResult(*cached)
+    result = simulate(system, controller, integrator, x0, dt, T)
+    _simulation_cache.put(key, result)
+    return result
+
+
+def simulate_inplace(system, controller, x0, dt, T, workspace=RK4Workspace, num_inputs=1):
+    """
+    Allocation-free variant of simulate for in-place dynamics and controllers.
+
+    The history arrays are allocated once up front; every step then writes
+    the control straight into u[k] and integrates x[k] into x[k + 1] through
+    the preallocated buffers of the workspace, so the loop itself creates
+    no arrays.
+
+    Parameters:
+        system: In-place dynamics func(t, state, u, out), e.g.
+                dynamics.acrobot_dynamics_into
+        controller: In-place control law controller(t, state, out) writing
+                    u into out, or None for an unforced system (u = 0)
+        x0: Initial state, (state_dim,) or a batch (N, state_dim)
+        dt: Time step
+        T: Total simulation time
+        workspace: Workspace class, RK4Workspace or EulerWorkspace
+        num_inputs: Control dimension
+
+    Returns:
+        SimulationResult, as from simulate
+    """
+    num_steps = int(round(T / dt))
+    x0 = np.asarray(x0, dtype=float)
+
+    t = np.arange(num_steps + 1) * dt
+    x = np.empty((num_steps + 1,) + x0.shape)
+    x[0] = x0
+    u = np.zeros((num_steps,) + x0.shape[:-1] + (num_inputs,))
+    stepper = workspace(system, x0.shape)
+
+    for k in range(num_steps):
+        if controller is not None:
+            controller(t[k], x[k], u[k])
+        stepper.step(x[k], u[k], dt, x[k + 1])
+    return SimulationResult(t, x, u)
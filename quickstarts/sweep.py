@@ -0,0 +1,200 @@
+import itertools
+import math
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from controllers import (acrobot_linearized_matrices, acrobot_lqr_controller, lqr_solve,
+                         pendulum_swingup_controller)
+from dynamics import ACROBOT_PARAMS, PENDULUM_PARAMS, acrobot_dynamics, pendulum_dynamics
+from integrators import euler_step
+from simulation import simulate
+
+SweepResult = namedtuple("SweepResult", ["table", "elapsed", "throughput"])
+
+
+###############################################################################
+#                               SAMPLING                                      #
+###############################################################################
+def parameter_grid(**axes):
+    """
+    Cartesian product of parameter values.
+
+    Example:
+        parameter_grid(Kp=[1, 5, 10], Kd=[1, 10]) -> 6 dicts
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+def random_samples(n, seed=None, **ranges):
+    """
+    Uniform random parameter samples.
+
+    Example:
+        random_samples(100, seed=0, Kp=(0, 20), Kd=(0, 20)) -> 100 dicts
+    """
+    rng = np.random.default_rng(seed)
+    columns = {name: rng.uniform(low, high, n) for name, (low, high) in ranges.items()}
+    return [{name: float(column[i]) for name, column in columns.items()} for i in range(n)]
+
+
+###############################################################################
+#                                METRICS                                      #
+###############################################################################
+def closed_loop_metrics(result, reference_state, tolerance=0.05):
+    """
+    Summarize a closed-loop SimulationResult.
+
+    Parameters:
+        result: SimulationResult of a single (unbatched) run
+        reference_state: Target state
+        tolerance: Error norm inside which the system counts as settled
+
+    Returns:
+        dict with
+            settling_time: First time after which the error stays within
+                           tolerance (inf if it never settles)
+            max_torque: Largest absolute control input
+            final_error: Error norm at the final time
+    """
+    error = np.linalg.norm(result.x - reference_state, axis=-1)
+    outside = np.flatnonzero(~(error <= tolerance))
+    if len(outside) == 0:
+        settling_time = result.t[0]
+    elif outside[-1] == len(error) - 1:
+        settling_time = math.inf
+    else:
+        settling_time = result.t[outside[-1] + 1]
+
+    return {
+        "settling_time": float(settling_time),
+        "max_torque": float(np.max(np.abs(result.u))) if result.u.size else 0.0,
+        "final_error": float(error[-1]),
+    }
+
+
+###############################################################################
+#                              EXPERIMENTS                                    #
+###############################################################################
+def pendulum_swingup_experiment(params, dt=0.01, T=5.0):
+    """
+    Energy swing-up + PD stabilization of the pendulum_control.py setup.
+
+    Swept parameters (defaults from pendulum_control.py): Kp, Kd, k,
+    torque_limit, theta0.
+    """
+    m, L, g, b = PENDULUM_PARAMS
+    Kp = params.get("Kp", 5.0)
+    Kd = params.get("Kd", 10.0)
+    k = params.get("k", 10.0)
+    torque_limit = params.get("torque_limit", 1.0)
+    theta0 = params.get("theta0", np.pi / 16)
+    E_desired = m * g * L
+
+    def controller(t, state):
+        return pendulum_swingup_controller(state[0], state[1], m, L, g, E_desired, k, Kp, Kd,
+                                           np.pi, torque_limit)
+
+    dynamics = partial(pendulum_dynamics, params=PENDULUM_PARAMS)
+    result = simulate(dynamics, controller, euler_step, [theta0, 0.0], dt, T)
+    return closed_loop_metrics(result, np.array([np.pi, 0.0]))
+
+
+def acrobot_lqr_experiment(params, dt=0.01, T=10.0):
+    """
+    LQR balancing of the acrobat_balance.py setup.
+
+    Swept parameters: q1..q4 (diagonal of Q), r (R = [[r]]), torque_limit
+    and the initial offset dtheta1 from upright.
+    """
+    acrobot_params = ACROBOT_PARAMS._replace(
+        torque_limit=params.get("torque_limit", ACROBOT_PARAMS.torque_limit)
+    )
+    m1, m2, I1, I2, L1, L2, g, _ = acrobot_params
+    Q = np.diag([params.get("q1", 10.0), params.get("q2", 10.0),
+                 params.get("q3", 1.0), params.get("q4", 1.0)])
+    R = np.array([[params.get("r", 1.0)]])
+
+    A, B = acrobot_linearized_matrices(m1, m2, I1, I2, L1, L2, g)
+    K, _ = lqr_solve(A, B, Q, R)
+    reference_state = np.array([np.pi, 0.0, 0.0, 0.0])
+
+    def controller(t, state):
+        return acrobot_lqr_controller(state, reference_state, K)
+
+    dynamics = partial(acrobot_dynamics, params=acrobot_params)
+    x0 = reference_state + [params.get("dtheta1", 0.01), 0.0, 0.0, 0.0]
+    with np.errstate(all="ignore"):
+        result = simulate(dynamics, controller, euler_step, x0, dt, T)
+    return closed_loop_metrics(result, reference_state)
+
+
+###############################################################################
+#                               SWEEP ENGINE                                  #
+###############################################################################
+def _run_chunk(experiment, chunk):
+    """ Worker entry point: run one chunk of samples in-process. """
+    return [experiment(params) for params in chunk]
+
+
+def run_sweep(experiment, samples, max_workers=None, chunk_size=None):
+    """
+    Fan closed-loop simulations out over a process pool.
+
+    Samples are grouped into chunks so each task amortizes the pickling and
+    scheduling overhead over many simulations; with the default chunk size
+    every worker gets about four chunks, which keeps all cores busy until
+    the end without per-sample round trips.
+
+    Parameters:
+        experiment: Top-level (picklable) function experiment(params) -> dict
+                    of metrics, e.g. pendulum_swingup_experiment
+        samples: List of parameter dicts (parameter_grid / random_samples)
+        max_workers: Number of worker processes (defaults to os.cpu_count());
+                     1 runs everything in the calling process
+        chunk_size: Samples per work unit
+
+    Returns:
+        SweepResult
+            table: Columnar dict of numpy arrays, one column per parameter
+                   and per metric, one row per sample (in input order)
+            elapsed: Wall-clock time in seconds
+            throughput: Simulations per second
+    """
+    samples = list(samples)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(samples) / (4 * max_workers)))
+    chunks = [samples[i:i + chunk_size] for i in range(0, len(samples), chunk_size)]
+
+    start = time.perf_counter()
+    if max_workers == 1:
+        chunk_metrics = [_run_chunk(experiment, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            chunk_metrics = list(executor.map(partial(_run_chunk, experiment), chunks))
+    elapsed = time.perf_counter() - start
+
+    rows = [dict(params, **metrics)
+            for chunk, metrics in zip(chunks, chunk_metrics)
+            for params, metrics in zip(chunk, metrics)]
+    columns = list(dict.fromkeys(name for row in rows for name in row))
+    table = {name: np.array([row.get(name, np.nan) for row in rows]) for name in columns}
+    return SweepResult(table, elapsed, len(samples) / elapsed if elapsed > 0 else math.inf)
+
+
+if __name__ == "__main__":
+    samples = parameter_grid(Kp=[1.0, 5.0, 10.0, 20.0], Kd=[1.0, 5.0, 10.0], k=[1.0, 10.0])
+    # Long enough horizon for the swing-up to reach the PD region
+    sweep = run_sweep(partial(pendulum_swingup_experiment, T=20.0), samples)
+    print(f"{len(samples)} simulations in {sweep.elapsed:.2f} s "
+          f"({sweep.throughput:.1f} simulations/s)")
+
+    best = np.argmin(sweep.table["settling_time"])
+    print("Fastest settling:", {name: column[best] for name, column in sweep.table.items()})
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from cache import config_fingerprint, fingerprint
+from controllers import configure_lqr_cache, lqr_cache_info, lqr_controller, lqr_solve
+from dynamics import SPRING_PARAMS
+from integrators import rk4_step
+from linear import spring_linear_system, zoh_step
+from models import MassSpring
+from simulation import cached_simulate, configure_simulation_cache, simulation_cache_info
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    configure_simulation_cache()
+    yield
+    configure_simulation_cache()
+
+
+def test_repeated_zoh_step_run_hits():
+    system = spring_linear_system(*SPRING_PARAMS)
+    first = cached_simulate(system, None, zoh_step, [1.0, 0.0], 0.01, 1.0)
+    second = cached_simulate(system, None, zoh_step, [1.0, 0.0], 0.01, 1.0)
+    info = simulation_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    np.testing.assert_array_equal(first.x, second.x)
+
+
+def test_repeated_lqr_run_hits():
+    model = MassSpring()
+    A, B = model.jacobians(np.zeros(2), 0.0)
+    goal = np.zeros(2)
+
+    def controller(t, state):
+        # Reads lqr_solve and with it the module-level LQR cache
+        return lqr_controller(state, goal, lqr_solve(A, B, np.eye(2), np.eye(1))[0])
+
+    for _ in range(2):
+        cached_simulate(model, controller, rk4_step, [1.0, 0.0], 0.01, 1.0)
+    info = simulation_cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_changed_parameters_miss():
+    cached_simulate(MassSpring(), None, rk4_step, [1.0, 0.0], 0.01, 1.0)
+    cached_simulate(MassSpring(k=2.0), None, rk4_step, [1.0, 0.0], 0.01, 1.0)
+    assert simulation_cache_info().misses == 2
+
+
+def test_fingerprint_reads_globals_regardless_of_name():
+    gain_cache = {"K": 1.0}
+
+    def controller(t, state):
+        return -gain_cache["K"] * state[0]
+
+    before = config_fingerprint(controller)
+    assert config_fingerprint(controller) == before
+    gain_cache["K"] = 2.0
+    assert config_fingerprint(controller) != before
+
+
+def test_fingerprint_follows_closure_arrays():
+    gain = np.ones(2)
+
+    def controller(t, state):
+        return -gain @ state
+
+    before = config_fingerprint(controller)
+    gain[0] = 3.0
+    assert config_fingerprint(controller) != before
+
+
+def test_lqr_cache_key_covers_shape_and_content(tmp_path):
+    configure_lqr_cache(directory=tmp_path)
+    try:
+        A = np.array([[0.0, 1.0], [-1.0, 0.0]])
+        B = np.array([[0.0], [1.0]])
+        K, S = lqr_solve(A, B, np.eye(2), np.eye(1))
+        lqr_solve(A.tolist(), B, np.eye(2), np.eye(1))
+        lqr_solve(A, B, 2 * np.eye(2), np.eye(1))
+        info = lqr_cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+        # Same bytes, different shape
+        assert fingerprint(A, B) != fingerprint(A, B.T)
+
+        # A fresh cache on the same directory serves the design from disk
+        configure_lqr_cache(directory=tmp_path)
+        K_disk, S_disk = lqr_solve(A, B, np.eye(2), np.eye(1))
+        assert lqr_cache_info().disk_hits == 1
+        np.testing.assert_array_equal(K_disk, K)
+        np.testing.assert_array_equal(S_disk, S)
+    finally:
+        configure_lqr_cache()
@@ -0,0 +1,45 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from controllers import pendulum_swingup_controller, saturate, switching_controller
+from dynamics import PENDULUM_PARAMS, pendulum_dynamics
+from integrators import euler_step, rk4_step
+from simulation import simulate
+
+m, L, g, _ = PENDULUM_PARAMS
+DYNAMICS = partial(pendulum_dynamics, params=PENDULUM_PARAMS)
+STATES = np.array([[np.pi / 16, 0.0], [np.pi - 0.1, 0.0], [np.pi + 0.15, -0.5],
+                   [np.pi - 0.4, 3.0], [-2.0, 3.0]])
+
+
+def swingup(t, state):
+    return pendulum_swingup_controller(state[..., 0], state[..., 1], m, L, g, m * g * L,
+                                       10.0, 5.0, 10.0)
+
+
+def near_target(t, state):
+    return np.abs(state[..., 0] - np.pi) <= 0.2
+
+
+def stabilize(t, state):
+    return m*g*L*np.sin(state[..., 0]) - 5.0 * (state[..., 0] - np.pi) - 10.0 * state[..., 1]
+
+
+def brake(t, state):
+    return -state[..., 1]
+
+
+def switched(t, state):
+    return saturate(switching_controller(near_target, stabilize, brake)(t, state), 1.0)
+
+
+@pytest.mark.parametrize("integrator", [euler_step, rk4_step])
+@pytest.mark.parametrize("controller", [swingup, switched])
+def test_batch_rows_match_scalar_runs(controller, integrator):
+    batch = simulate(DYNAMICS, controller, integrator, STATES, 0.01, 2.0)
+    for row, x0 in enumerate(STATES):
+        single = simulate(DYNAMICS, controller, integrator, x0, 0.01, 2.0)
+        np.testing.assert_allclose(batch.x[:, row], single.x, rtol=1e-12, atol=1e-12)
+        np.testing.assert_allclose(batch.u[:, row], single.u, rtol=1e-12, atol=1e-12)
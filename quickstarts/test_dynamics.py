@@ -0,0 +1,63 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from dynamics import (ACROBOT_PARAMS, PENDULUM_PARAMS, SPRING_PARAMS, acrobot_dynamics,
+                      acrobot_dynamics_into, acrobot_jacobians, double_integrator_dynamics,
+                      double_integrator_dynamics_into, double_integrator_jacobians, jacobian_error,
+                      pendulum_dynamics, pendulum_dynamics_into, pendulum_jacobians, spring_dynamics,
+                      spring_dynamics_into, spring_jacobians)
+from integrators import EulerWorkspace, RK4Workspace, euler_step, rk4_step
+
+# name -> (dynamics, jacobians, state_dim)
+SYSTEMS = {
+    "pendulum": (partial(pendulum_dynamics, params=PENDULUM_PARAMS),
+                 partial(pendulum_jacobians, params=PENDULUM_PARAMS), 2),
+    "spring": (partial(spring_dynamics, params=SPRING_PARAMS),
+               partial(spring_jacobians, params=SPRING_PARAMS), 2),
+    "double_integrator": (double_integrator_dynamics, double_integrator_jacobians, 2),
+    "acrobot": (partial(acrobot_dynamics, params=ACROBOT_PARAMS),
+                partial(acrobot_jacobians, params=ACROBOT_PARAMS), 4),
+}
+
+# name -> in-place counterpart of SYSTEMS[name] dynamics
+DYNAMICS_INTO = {
+    "pendulum": partial(pendulum_dynamics_into, params=PENDULUM_PARAMS),
+    "spring": partial(spring_dynamics_into, params=SPRING_PARAMS),
+    "double_integrator": double_integrator_dynamics_into,
+    "acrobot": partial(acrobot_dynamics_into, params=ACROBOT_PARAMS),
+}
+
+
+@pytest.mark.parametrize("name", list(SYSTEMS))
+def test_jacobians_match_finite_differences(name):
+    dynamics, jacobians, state_dim = SYSTEMS[name]
+    rng = np.random.default_rng(0)
+    # A batch of states, with torques inside the acrobot's limit
+    states = rng.uniform(-2.0, 2.0, (16, state_dim))
+    u = rng.uniform(-0.5, 0.5, 16)
+    A, B = jacobians(states, u)
+    assert A.shape == (16, state_dim, state_dim) and B.shape == (16, state_dim, 1)
+    error_A, error_B = jacobian_error(dynamics, jacobians, states, u)
+    assert error_A < 1e-8 and error_B < 1e-8
+
+
+@pytest.mark.parametrize("batch", [(), (16,)])
+@pytest.mark.parametrize("name", list(SYSTEMS))
+def test_dynamics_into_matches_allocating_dynamics(name, batch):
+    dynamics, _, state_dim = SYSTEMS[name]
+    dynamics_into = DYNAMICS_INTO[name]
+    rng = np.random.default_rng(1)
+    states = rng.uniform(-2.0, 2.0, batch + (state_dim,))
+    # Beyond the acrobot's torque limit too, so both paths have to clip
+    u = rng.uniform(-2.0, 2.0, batch + (1,))
+    out = np.full_like(states, np.nan)
+    assert dynamics_into(0.0, states, u, out) is out
+    np.testing.assert_allclose(out, dynamics(0.0, states, u), rtol=1e-14, atol=1e-14)
+
+    for Workspace, step in [(EulerWorkspace, euler_step), (RK4Workspace, rk4_step)]:
+        expected = step(dynamics, 0.0, states, u, 0.01)
+        x = states.copy()
+        Workspace(dynamics_into, x.shape).step(x, u, 0.01, x)
+        np.testing.assert_allclose(x, expected, rtol=1e-14, atol=1e-14)
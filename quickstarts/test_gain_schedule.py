@@ -0,0 +1,23 @@
+import numpy as np
+
+from controllers import acrobot_gravity_torque
+from dynamics import ACROBOT_PARAMS
+from gain_schedule import (build_acrobot_gain_schedule, load_gain_schedule, save_gain_schedule,
+                           scheduled_lqr_controller)
+
+Q = np.diag([10.0, 10.0, 1.0, 1.0])
+R = np.array([[1.0]])
+
+
+def test_feedforward_holds_grid_points_at_rest(tmp_path):
+    schedule = build_acrobot_gain_schedule(np.linspace(np.pi - 0.5, np.pi + 0.5, 11),
+                                           np.linspace(-0.5, 0.5, 11), Q, R)
+    save_gain_schedule(tmp_path / "gains.npz", schedule)
+    schedule = load_gain_schedule(tmp_path / "gains.npz")
+
+    _, m2, _, _, _, L2, g, _ = ACROBOT_PARAMS
+    states = np.array([[np.pi + 0.2, -0.3, 0.0, 0.0],
+                       [np.pi - 0.4, 0.5, 0.0, 0.0]])
+    u = scheduled_lqr_controller(states, states, schedule)
+    np.testing.assert_allclose(u[:, 0], acrobot_gravity_torque(states[:, 0], states[:, 1], m2, L2, g),
+                               atol=1e-12)
@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from dynamics import double_integrator_dynamics
+from hybrid import SwitchedController, double_integrator_flow, simulate_hybrid
+
+# Decelerate from q = 0, q_dot = 1: q(t) = t - t**2 / 2 starts on the guard
+# q = 0 and crosses it again at t = 2, where the controller switches to coasting
+STARTS_ON_GUARD = SwitchedController(
+    initial=lambda t, state: 0,
+    control=lambda mode, t, state: -1.0 if mode == 0 else 0.0,
+    guard=lambda mode, t, state: state[0] if mode == 0 else None,
+    transition=lambda mode, i, t, state: 1,
+)
+
+
+@pytest.mark.parametrize("flow", [double_integrator_flow, None])
+def test_crossing_after_starting_on_guard(flow):
+    result = simulate_hybrid(double_integrator_dynamics, STARTS_ON_GUARD, [0.0, 1.0], 4.0,
+                             flow=flow)
+    assert len(result.events) == 1
+    assert result.events[0].t == pytest.approx(2.0, abs=1e-9)
+    np.testing.assert_allclose(result.x[-1], [-2.0, -1.0], atol=1e-8)
@@ -0,0 +1,47 @@
+from functools import partial
+
+import numpy as np
+import pytest
+
+from dynamics import ACROBOT_PARAMS, acrobot_dynamics, double_integrator_dynamics
+from integrator_report import INTEGRATORS, SYSTEMS, energy_drift
+from integrators import euler_step, euler_step_batch, rk4_step, rk4_step_batch, rk45_solve
+
+ACROBOT = partial(acrobot_dynamics, params=ACROBOT_PARAMS)
+
+
+@pytest.mark.parametrize("batch_step, step", [(euler_step_batch, euler_step), (rk4_step_batch, rk4_step)])
+def test_batch_step_matches_row_steps(batch_step, step):
+    rng = np.random.default_rng(0)
+    states = rng.uniform(-1.0, 1.0, (8, 4))
+    controls = rng.uniform(-1.0, 1.0, (8, 1))
+    batch = batch_step(ACROBOT, 0.0, states, controls, 0.01)
+    assert batch.shape == states.shape
+    for row in range(len(states)):
+        np.testing.assert_allclose(batch[row], step(ACROBOT, 0.0, states[row], controls[row], 0.01),
+                                   rtol=1e-12, atol=1e-14)
+
+
+def test_rk45_locates_event_on_dense_output():
+    # Drop from q = 1 under u = -1: q(t) = 1 - t**2 / 2 reaches 0 at t = sqrt(2)
+    t_eval = np.linspace(0.0, 3.0, 31)
+    result = rk45_solve(double_integrator_dynamics, 0.0, [1.0, 0.0], -1.0, 3.0, t_eval=t_eval,
+                        events=lambda t, state: state[0])
+    assert result.event == 0
+    assert result.t_event == pytest.approx(np.sqrt(2), abs=1e-10)
+    np.testing.assert_allclose(result.x_event, [0.0, -np.sqrt(2)], atol=1e-9)
+    np.testing.assert_array_equal(result.t, t_eval[t_eval <= result.t_event])
+    np.testing.assert_allclose(result.x[:, 0], 1 - result.t ** 2 / 2, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", ["leapfrog", "velocity_verlet", "yoshida4"])
+def test_symplectic_energy_error_stays_bounded(name):
+    # Undamped pendulum at dt = 0.1: 8x the run time leaves the error of the
+    # symplectic steps unchanged, while RK4's keeps growing
+    dynamics, energy, x0 = SYSTEMS["pendulum"]
+    _, short = energy_drift(dynamics, energy, INTEGRATORS[name], x0, 0.1, 50.0)
+    _, long = energy_drift(dynamics, energy, INTEGRATORS[name], x0, 0.1, 400.0)
+    assert long < 1.01 * short
+    _, rk4_short = energy_drift(dynamics, energy, rk4_step, x0, 0.1, 50.0)
+    _, rk4_long = energy_drift(dynamics, energy, rk4_step, x0, 0.1, 400.0)
+    assert rk4_long > 4 * rk4_short
@@ -0,0 +1,27 @@
+import numpy as np
+
+from dynamics import SPRING_PARAMS
+from integrators import rk4_step
+from linear import double_integrator_linear_system, spring_linear_system, zoh_rollout, zoh_step
+
+
+def test_zoh_step_matches_fine_rk4():
+    system = spring_linear_system(*SPRING_PARAMS)
+    states = np.array([[1.0, 0.0], [-0.5, 2.0]])
+    u = np.array([[0.3], [-1.0]])
+    fine = states
+    for _ in range(100):
+        fine = rk4_step(system, 0.0, fine, u, 0.001)
+    np.testing.assert_allclose(zoh_step(system, 0.0, states, u, 0.1), fine, rtol=0, atol=1e-13)
+
+
+def test_zoh_is_exact_for_the_double_integrator():
+    system = double_integrator_linear_system()
+    controls = np.array([[1.0], [-2.0], [0.5]])
+    states = zoh_rollout(system.A, system.B, 0.5, [1.0, -1.0], controls)
+    state = np.array([1.0, -1.0])
+    for k, u in enumerate(controls):
+        q, v = state
+        state = np.array([q + 0.5 * v + 0.125 * u[0], v + 0.5 * u[0]])
+        np.testing.assert_allclose(states[k + 1], state, rtol=0, atol=1e-15)
+        np.testing.assert_allclose(zoh_step(system, 0.0, states[k], u, 0.5), state, rtol=0, atol=1e-15)
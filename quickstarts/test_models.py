@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from models import Acrobot, Pendulum
+
+
+@pytest.mark.parametrize("model", [
+    Acrobot.randomized(8, m1=(0.8, 1.2), L2=(0.8, 1.2), torque_limit=(0.5, 2.0), seed=0),
+    Pendulum.randomized(8, m=(0.5, 2.0), L=(0.5, 1.5), b=(0.0, 0.2), seed=0),
+])
+def test_per_env_parameters_match_single_models(model):
+    rng = np.random.default_rng(1)
+    states = rng.uniform(-2.0, 2.0, (8, model.state_dim))
+    u = rng.uniform(-1.5, 1.5, (8, 1))
+    derivatives = model.dynamics(0.0, states, u)
+    out = model.dynamics_into(0.0, states, u, np.empty_like(states))
+    A, B = model.jacobians(states, u[:, 0])
+    for row in range(8):
+        single = model[row]
+        assert single.num_envs is None
+        np.testing.assert_allclose(derivatives[row], single.dynamics(0.0, states[row], u[row]),
+                                   rtol=1e-13, atol=1e-13)
+        np.testing.assert_allclose(out[row], derivatives[row], rtol=1e-13, atol=1e-13)
+        A_row, B_row = single.jacobians(states[row], u[row, 0])
+        np.testing.assert_allclose(A[row], A_row, rtol=1e-13, atol=1e-13)
+        np.testing.assert_allclose(B[row], B_row, rtol=1e-13, atol=1e-13)
+
+
+def test_state_batch_must_match_num_envs():
+    model = Pendulum.randomized(8, m=(0.5, 2.0), seed=0)
+    with pytest.raises(ValueError):
+        model.dynamics(0.0, np.zeros((4, 2)), np.zeros(4))
@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from dynamics import pendulum_dynamics
+from integrators import rk4_step
+from recorder import TrajectoryRecorder, open_recording
+from simulation import simulate
+
+
+@pytest.mark.parametrize("decimation", [1, 3, 4, 7])
+def test_terminal_state_is_recorded(tmp_path, decimation):
+    # 1000 steps: 3 and 7 do not divide the step count
+    recorder = TrajectoryRecorder(str(tmp_path), chunk_size=64, decimation=decimation)
+    result = simulate(pendulum_dynamics, None, rk4_step, [1.0, 0.0], 0.01, 10.0,
+                      recorder=recorder, keep_history=False)
+    recorder.close()
+
+    recording = open_recording(str(tmp_path))
+    assert recording.t[-1] == pytest.approx(10.0)
+    np.testing.assert_array_equal(recording.x[-1], result.x[-1])
+    assert np.isnan(recording.u[-1]).all()
@@ -0,0 +1,248 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# How to draw one system:
+#   setup(ax) creates and returns the tuple of line artists
+#   draw(state, artists) updates them for one state
+#   xlim, ylim are the axis limits
+Scene = namedtuple("Scene", ["setup", "draw", "xlim", "ylim"])
+
+
+###############################################################################
+#                                 SCENES                                      #
+###############################################################################
+def pendulum_scene(L):
+    """ Pendulum with state [theta, omega]. """
+    def setup(ax):
+        bob, = ax.plot([], [], 'bo', markersize=14)  # Bob
+        rod, = ax.plot([], [], 'k-', lw=2)  # Rod
+        return rod, bob
+
+    def draw(state, artists):
+        rod, bob = artists
+        x = L * np.sin(state[0])
+        y = -L * np.cos(state[0])
+        bob.set_data([x], [y])
+        rod.set_data([0, x], [0, y])
+
+    return Scene(setup, draw, (-1.5, 1.5), (-1.5, 1.5))
+
+
+def acrobot_scene(L1, L2):
+    """ Acrobot with state [theta1, theta2, omega1, omega2]. """
+    def setup(ax):
+        ax.set_aspect('equal')
+        joint1, = ax.plot([], [], 'bo', markersize=8)   # First joint
+        joint2, = ax.plot([], [], 'ro', markersize=8)   # Second joint
+        rod1, = ax.plot([], [], 'k-', lw=2)
+        rod2, = ax.plot([], [], 'k-', lw=2)
+        return joint1, joint2, rod1, rod2
+
+    def draw(state, artists):
+        joint1, joint2, rod1, rod2 = artists
+        theta1, theta2 = state[0], state[1]
+
+        # Link endpoints
+        x1 = L1 * np.sin(theta1)
+        y1 = -L1 * np.cos(theta1)
+        x2 = x1 + L2 * np.sin(theta1 + theta2)
+        y2 = y1 - L2 * np.cos(theta1 + theta2)
+
+        if np.isfinite([x1, y1, x2, y2]).all():
+            joint1.set_data([x1], [y1])
+            joint2.set_data([x2], [y2])
+            rod1.set_data([0, x1], [0, y1])
+            rod2.set_data([x1, x2], [y1, y2])
+        else:
+            # If values are invalid, use empty sequences
+            for artist in artists:
+                artist.set_data([], [])
+
+    return Scene(setup, draw, (-1.5, 1.5), (-1.5, 1.5))
+
+
+def slider_scene(xlim, ylim, anchor=None, markersize=14):
+    """
+    1-D body with state [position, velocity] moving along y = 0.
+    If anchor is given, a spring line is drawn from x = anchor to the body.
+    """
+    def setup(ax):
+        body, = ax.plot([], [], 'bo', markersize=markersize)
+        if anchor is None:
+            ax.set_aspect('equal')
+            return body,
+        spring, = ax.plot([], [], 'k-', lw=2)
+        return body, spring
+
+    def draw(state, artists):
+        artists[0].set_data([state[0]], [0])
+        if anchor is not None:
+            artists[1].set_data([anchor, state[0]], [0, 0])
+
+    return Scene(setup, draw, xlim, ylim)
+
+
+###############################################################################
+#                           PLAYBACK AND EXPORT                               #
+###############################################################################
+def display_indices(t, fps, speed=1.0):
+    """
+    Sample indices to show at a fixed display rate.
+
+    Physics runs at its own dt; frame i shows the latest sample at or
+    before t[0] + i * speed / fps, so several physics steps are skipped per
+    frame when dt is small and samples are repeated when dt is large.
+    """
+    display_times = t[0] + np.arange(int((t[-1] - t[0]) * fps / speed) + 1) * speed / fps
+    return np.clip(np.searchsorted(t, display_times, side="right") - 1, 0, len(t) - 1)
+
+
+def _prepare(ax, scene, title):
+    ax.set_xlim(*scene.xlim)
+    ax.set_ylim(*scene.ylim)
+    if title is not None:
+        ax.set_title(title)
+    return scene.setup(ax)
+
+
+def replay(result, scene, title=None, fps=30, speed=1.0, realtime=True, profiler=None):
+    """
+    Replay a SimulationResult on screen at a fixed display rate.
+
+    Parameters:
+        result: SimulationResult returned by simulation.simulate
+        scene: Scene describing how to draw a state
+        title: Optional figure title
+        fps: Display rate, independent of the simulation dt
+        speed: Simulated seconds per wall-clock second
+        realtime: If True, each frame shows the sample for the current wall
+                  clock, so frames are dropped when rendering falls behind;
+                  if False, every display-rate frame is drawn
+        profiler: Optional profiling.Profiler timing each draw as "render"
+
+    Returns:
+        ani: The FuncAnimation, kept alive until the window is closed
+    """
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+
+    fig, ax = plt.subplots()
+    artists = _prepare(ax, scene, title)
+    draw = scene.draw if profiler is None else profiler.wrap("render", scene.draw)
+    t = result.t
+
+    def frames():
+        if not realtime:
+            yield from display_indices(t, fps, speed)
+            return
+        start = time.monotonic()
+        index = 0
+        while index < len(t) - 1:
+            sim_time = t[0] + (time.monotonic() - start) * speed
+            index = min(int(np.searchsorted(t, sim_time, side="right")) - 1, len(t) - 1)
+            yield max(index, 0)
+
+    def init():
+        """ Initialize animation """
+        for artist in artists:
+            artist.set_data([], [])
+        return artists
+
+    def update(index):
+        """ Draw the recorded state for this frame """
+        draw(result.x[index], artists)
+        return artists
+
+    ani = animation.FuncAnimation(
+        fig, update, frames=frames, init_func=init,
+        interval=1000 / fps, blit=True, cache_frame_data=False
+    )
+    plt.show()
+    return ani
+
+
+def export(result, scene, path, title=None, fps=30, speed=1.0, dpi=100):
+    """
+    Render a trajectory offscreen (Agg, no window) at a fixed frame rate.
+
+    Parameters:
+        result: SimulationResult (or recorder.Recording) to render
+        scene: Scene describing how to draw a state
+        path: Output; .mp4 (needs ffmpeg) or .gif (Pillow) writes a video,
+              anything else is a directory of numbered PNG frames
+        title: Optional figure title
+        fps: Frames per second of the output
+        speed: Simulated seconds per second of output
+        dpi: Resolution of the frames
+
+    Returns:
+        path
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    artists = _prepare(ax, scene, title)
+    indices = display_indices(np.asarray(result.t), fps, speed)
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".mp4", ".gif"):
+        from matplotlib import animation
+        writer = animation.FFMpegWriter(fps=fps) if extension == ".mp4" else animation.PillowWriter(fps=fps)
+        with writer.saving(fig, path, dpi):
+            for index in indices:
+                scene.draw(result.x[index], artists)
+                writer.grab_frame()
+    else:
+        os.makedirs(path, exist_ok=True)
+        for frame, index in enumerate(indices):
+            scene.draw(result.x[index], artists)
+            fig.savefig(os.path.join(path, f"frame_{frame:05d}.png"), dpi=dpi)
+    return path
+
+
+def export_async(result, scene, path, **options):
+    """
+    Run export() in a background worker thread.
+
+    The caller keeps simulating (or exits its own loop) while frames are
+    rendered; call .result() on the returned Future to wait for the path.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(export, result, scene, path, **options)
+    executor.shutdown(wait=False)
+    return future
+
+
+###############################################################################
+#                               SHORTCUTS                                     #
+###############################################################################
+def show_pendulum(result, L, title=None, **options):
+    """
+    Replay a pendulum trajectory with state [theta, omega].
+    Extra keyword options are passed on to replay().
+    """
+    return replay(result, pendulum_scene(L), title=title, **options)
+
+
+def show_acrobot(result, L1, L2, title=None, **options):
+    """
+    Replay an acrobot trajectory with state [theta1, theta2, omega1, omega2].
+    Extra keyword options are passed on to replay().
+    """
+    return replay(result, acrobot_scene(L1, L2), title=title, **options)
+
+
+def show_slider(result, xlim, ylim, title=None, anchor=None, markersize=14, **options):
+    """
+    Replay a 1-D body with state [position, velocity] moving along y = 0.
+    If anchor is given, a spring line is drawn from x = anchor to the body.
+    Extra keyword options are passed on to replay().
+    """
+    return replay(result, slider_scene(xlim, ylim, anchor, markersize), title=title, **options)
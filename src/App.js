@@ -5,6 +5,7 @@ import PendulumControls from './components/PendulumControls';
 import PendulumControl from './components/PendulumControl';
 import PendulumControlControls from './components/PendulumControlControls';
 import ModuleSelector from './components/ModuleSelector';
+import RemoteSimulation from './components/RemoteSimulation';
 
 function App() {
   // State to track which module is active
@@ -40,6 +41,9 @@ function App() {
   // Creating a key that changes when parameters change to force remount
   const [paramChangeCounter, setParamChangeCounter] = useState(0);
 
+  // Counts resets so the remote simulation can ask the server to restart
+  const [resetCounter, setResetCounter] = useState(0);
+
   // State to control paused/running simulation
   const [paused, setPaused] = useState(false);
 
@@ -51,7 +55,7 @@ function App() {
         ...prevParams,
         ...newParams
       }));
-    } else if (activeModule === 'pendulum-control') {
+    } else if (activeModule === 'pendulum-control' || activeModule === 'remote') {
       // Update controlled pendulum parameters
       setControlledPendulumParams(prevParams => ({
         ...prevParams,
@@ -80,9 +84,10 @@ function App() {
     // Reset parameters to default values based on active module
     if (activeModule === 'pendulum') {
       setPendulumParams(defaultPendulumParams);
-    } else if (activeModule === 'pendulum-control') {
+    } else if (activeModule === 'pendulum-control' || activeModule === 'remote') {
       setControlledPendulumParams(defaultControlledPendulumParams);
     }
+    setResetCounter(prev => prev + 1);
     
     // Increment the counter to force component to remount
     setParamChangeCounter(prev => prev + 1);
@@ -130,6 +135,23 @@ function App() {
               paused={paused} 
             />
             
+            <PendulumControlControls 
+              params={controlledPendulumParams}
+              onParamChange={handleParamChange}
+              paused={paused}
+              onTogglePause={handleTogglePause}
+              onReset={handleReset}
+            />
+          </>
+        ) : activeModule === 'remote' ? (
+          <>
+            {/* Streamed from quickstarts/server.py; keeps one socket across parameter changes */}
+            <RemoteSimulation 
+              params={controlledPendulumParams} 
+              paused={paused} 
+              resetCounter={resetCounter}
+            />
+            
             <PendulumControlControls 
               params={controlledPendulumParams}
               onParamChange={handleParamChange}
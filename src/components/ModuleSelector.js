@@ -19,6 +19,13 @@ const ModuleSelector = ({ activeModule, onModuleChange }) => {
         >
           Controlled Pendulum
         </button>
+        
+        <button
+          className={`module-button ${activeModule === 'remote' ? 'active' : ''}`}
+          onClick={() => onModuleChange('remote')}
+        >
+          Python Server
+        </button>
       </div>
     </div>
   );
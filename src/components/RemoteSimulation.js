@@ -0,0 +1,169 @@
+import React, { useEffect, useRef, useState } from 'react';
+
+// Header of each binary frame message sent by quickstarts/server.py:
+// uint32 seq, uint16 numFrames, uint16 floatsPerFrame, float64 sendTime
+const HEADER_BYTES = 16;
+
+// Controlled-pendulum UI names -> server parameter names
+const PARAM_NAMES = {
+  length: 'L',
+  mass: 'm',
+  gravity: 'g',
+  damping: 'b',
+  initialAngle: 'theta0',
+  kp: 'Kp',
+  kd: 'Kd',
+  energyGain: 'k',
+  torqueLimit: 'torque_limit'
+};
+
+// Renders the simulation streamed by the Python WebSocket server
+const RemoteSimulation = ({ params, paused, resetCounter, url = 'ws://localhost:8765' }) => {
+  const canvasRef = useRef(null);
+  const socketRef = useRef(null);
+  const requestRef = useRef();
+
+  // Latest frame [t, state..., u] and the number of state variables
+  const frameRef = useRef(null);
+  const [status, setStatus] = useState('connecting');
+
+  // Open the socket once; frames are acknowledged so the server can
+  // measure round-trip latency
+  useEffect(() => {
+    const socket = new WebSocket(url);
+    socket.binaryType = 'arraybuffer';
+    socketRef.current = socket;
+
+    socket.onopen = () => setStatus('connected');
+    socket.onclose = () => setStatus('disconnected');
+    socket.onerror = () => setStatus('error');
+    socket.onmessage = (event) => {
+      if (typeof event.data === 'string') {
+        const message = JSON.parse(event.data);
+        if (message.type === 'error') {
+          console.warn('Simulation server:', message.error);
+        }
+        return;
+      }
+      const view = new DataView(event.data);
+      const seq = view.getUint32(0, true);
+      const numFrames = view.getUint16(4, true);
+      const width = view.getUint16(6, true);
+      const sendTime = view.getFloat64(8, true);
+      const frames = new Float32Array(event.data, HEADER_BYTES, numFrames * width);
+
+      // Only the newest frame of the batch is drawn
+      frameRef.current = frames.slice((numFrames - 1) * width, numFrames * width);
+      socket.send(JSON.stringify({ type: 'ack', seq, send_time: sendTime }));
+    };
+
+    return () => socket.close();
+  }, [url]);
+
+  // Forward parameter changes to a pendulum server
+  useEffect(() => {
+    const socket = socketRef.current;
+    const frame = frameRef.current;
+    if (!socket || socket.readyState !== WebSocket.OPEN || !frame || frame.length !== 4) {
+      return;
+    }
+    const serverParams = {};
+    Object.entries(PARAM_NAMES).forEach(([name, serverName]) => {
+      serverParams[serverName] = params[name];
+    });
+    socket.send(JSON.stringify({ type: 'params', params: serverParams }));
+  }, [params]);
+
+  // Ask the server to restart from its initial state
+  useEffect(() => {
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: 'reset' }));
+    }
+  }, [resetCounter]);
+
+  // Draw the latest received state at the display rate
+  useEffect(() => {
+    const canvas = canvasRef.current;
+    const ctx = canvas.getContext('2d');
+    const width = canvas.width;
+    const height = canvas.height;
+    const centerX = width / 2;
+    const centerY = height / 2;
+    const scale = 100; // pixels per meter
+
+    const drawLink = (x0, y0, x1, y1, color) => {
+      ctx.beginPath();
+      ctx.moveTo(x0, y0);
+      ctx.lineTo(x1, y1);
+      ctx.strokeStyle = '#333';
+      ctx.lineWidth = 2;
+      ctx.stroke();
+      ctx.beginPath();
+      ctx.arc(x1, y1, 8, 0, 2 * Math.PI);
+      ctx.fillStyle = color;
+      ctx.fill();
+    };
+
+    const animate = () => {
+      const frame = frameRef.current;
+      if (!paused && frame) {
+        ctx.clearRect(0, 0, width, height);
+        ctx.beginPath();
+        ctx.arc(centerX, centerY, 5, 0, 2 * Math.PI);
+        ctx.fillStyle = '#555';
+        ctx.fill();
+
+        if (frame.length === 4) {
+          // Pendulum: [t, theta, omega, u]
+          const theta = frame[1];
+          const x = centerX + params.length * scale * Math.sin(theta);
+          const y = centerY + params.length * scale * Math.cos(theta);
+          drawLink(centerX, centerY, x, y, '#c0392b');
+        } else {
+          // Acrobot: [t, theta1, theta2, omega1, omega2, u] with unit links
+          const theta1 = frame[1];
+          const theta2 = frame[2];
+          const x1 = centerX + 0.5 * scale * Math.sin(theta1);
+          const y1 = centerY + 0.5 * scale * Math.cos(theta1);
+          const x2 = x1 + 0.5 * scale * Math.sin(theta1 + theta2);
+          const y2 = y1 + 0.5 * scale * Math.cos(theta1 + theta2);
+          drawLink(centerX, centerY, x1, y1, '#2980b9');
+          drawLink(x1, y1, x2, y2, '#c0392b');
+        }
+
+        ctx.font = '12px Arial';
+        ctx.fillStyle = '#000';
+        ctx.fillText(`Time: ${frame[0].toFixed(2)} s`, 10, 20);
+        ctx.fillText(`Torque: ${frame[frame.length - 1].toFixed(2)} N·m`, 10, 40);
+      }
+      requestRef.current = requestAnimationFrame(animate);
+    };
+
+    requestRef.current = requestAnimationFrame(animate);
+    return () => cancelAnimationFrame(requestRef.current);
+  }, [params, paused]);
+
+  return (
+    <div className="pendulum-container">
+      <canvas
+        ref={canvasRef}
+        width={400}
+        height={400}
+        className="pendulum-canvas"
+        style={{
+          border: '1px solid #ccc',
+          background: '#f9f9f9',
+          display: 'block',
+          margin: '0 auto'
+        }}
+      />
+      <div className="debug-info">
+        <p>Server: {url} ({status})</p>
+        <p>Start it with: python quickstarts/server.py --system pendulum</p>
+      </div>
+    </div>
+  );
+};
+
+export default RemoteSimulation;